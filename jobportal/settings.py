@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.humanize',
     'main',
     'users',
     'jobs',
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'main.instrumentation.RequestMetricsMiddleware',  # off unless REQUEST_METRICS_ENABLED
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,6 +67,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'main.context_processors.fragment_cache',
             ],
         },
     },
@@ -120,6 +123,57 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded files (resumes are stored once per content hash, see main.storage)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+STORED_FILE_GC_GRACE = 3600  # seconds an unreferenced file is kept before collection
+
+# Resume text extraction (users.resume_extraction). With 0 workers the text
+# is extracted in the saving process right after the upload commits, without
+# starting a process pool; local development settings may set that.
+RESUME_EXTRACTION_WORKERS = 2
+RESUME_TEXT_MAX_LENGTH = 100000  # characters kept per resume
+RESUME_EXTRACTION_CHECKPOINT = BASE_DIR / 'var' / 'resume_extraction.json'
+
+# Job listing and search
+JOB_LIST_PAGE_SIZE = 20
+JOB_LIST_MAX_PAGE_SIZE = 100
+JOB_SEARCH_MAX_RESULTS = 1000
+JOB_FUZZY_SEARCH_THRESHOLD = 0.25  # minimum trigram similarity
+JOB_SEARCH_CACHE_TTL = 60  # seconds
+JOB_IMPORT_BATCH_SIZE = 500  # feed rows written per transaction
+JOB_IMPORT_MAX_REPORTED_ERRORS = 200  # rejected rows listed after an upload
+APPLICATION_EXPORT_BATCH_SIZE = 1000  # applications read per query by the CSV export
+
+# Job recommendations (TF-IDF index built by `manage.py rebuild_recommendations`)
+RECOMMENDATIONS_INDEX_PATH = BASE_DIR / 'var' / 'recommendations.npz'
+
+# Location normalization (offline gazetteer of canonical locations)
+LOCATION_GAZETTEER_PATH = BASE_DIR / 'main' / 'data' / 'gazetteer.csv'
+LOCATION_NEAR_RADIUS_KM = 50  # default radius for "near" filters
+
+# Home page stats and recent jobs (cached, refreshed in the background)
+HOME_STATS_TTL = 300  # seconds before a refresh is triggered
+HOME_STATS_STALE_TTL = 3600  # how long stale values may still be served
+HOME_RECENT_JOBS_COUNT = 6
+
+# Template fragments (job cards, dashboard widgets) cached under keys
+# versioned by each job's and employer's updated_at
+FRAGMENT_CACHE_TIMEOUT = 3600  # seconds
+
+# Per-request metrics (see main.instrumentation)
+REQUEST_METRICS_ENABLED = False
+REQUEST_METRICS_PATH = BASE_DIR / 'var' / 'request_metrics.jsonl'
+REQUEST_METRICS_MAX_BYTES = 10 * 1024 * 1024
+REQUEST_METRICS_BACKUP_COUNT = 5
+REQUEST_QUERY_BUDGETS = {
+    'find_jobs': 12,
+    'my_jobs': 8,
+    'employer_applications': 12,
+    'employer_job_applications': 12,
+}
+REQUEST_QUERY_BUDGET_ACTION = 'log'  # or 'raise'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
 
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobs'
+
+    def ready(self):
+        from . import search, signals  # noqa: F401
+        pre_migrate.connect(search.drop_triggers, sender=self)
+        post_migrate.connect(search.install_triggers, sender=self)
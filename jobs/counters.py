@@ -0,0 +1,210 @@
+"""Stored counters on Job and EmployerStats.
+
+Every job and every employer keeps a total application count and one count
+per status, and employers also count their jobs and active jobs, so pages
+never COUNT the Job and Application tables.  Write paths adjust them with
+F() expressions inside the transaction that makes the change;
+``manage.py reconcile_counters`` repairs any drift (raw SQL, crashes
+between statements) in bulk.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from users.models import Employer, EmployerStats
+
+from .models import Application, Job
+
+STATUSES = [status for status, _ in Application.STATUS_CHOICES]
+
+COUNTER_FIELDS = ['application_count'] + [f'{status}_count' for status in STATUSES]
+
+JOB_COUNTER_FIELDS = ['job_count', 'active_job_count']
+
+
+def status_field(status):
+    return f'{status}_count'
+
+
+def adjust_employer(employer_id, deltas):
+    """Add ``deltas`` to an employer's stats row, creating it if missing"""
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if not changes:
+        return
+    if not EmployerStats.objects.filter(employer_id=employer_id).update(**changes):
+        EmployerStats.objects.get_or_create(employer_id=employer_id)
+        EmployerStats.objects.filter(employer_id=employer_id).update(**changes)
+
+
+def adjust(job_id, employer_id, deltas):
+    """Add ``deltas`` ({counter field: change}) to a job and its employer.
+
+    Call inside the transaction that made the change.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    Job.objects.filter(id=job_id).update(**{field: F(field) + delta for field, delta in deltas.items()})
+    adjust_employer(employer_id, deltas)
+
+
+def application_created(application, employer_id):
+    adjust(application.job_id, employer_id, {
+        'application_count': 1,
+        status_field(application.status): 1,
+    })
+
+
+def application_deleted(application, employer_id):
+    adjust(application.job_id, employer_id, {
+        'application_count': -1,
+        status_field(application.status): -1,
+    })
+
+
+def job_changed(old_values, new_values):
+    """Count a created, paused or reactivated job for its employer.
+
+    ``old_values`` are the job's stored field values before the save (None
+    for a new job), ``new_values`` its values after it.
+    """
+    jobs_changed([(old_values, new_values)])
+
+
+def jobs_changed(changes):
+    """``job_changed`` for many ``(old_values, new_values)`` pairs, one update per employer"""
+    deltas = {}
+    for old_values, new_values in changes:
+        if old_values is not None and 'is_active' not in old_values:
+            # Loaded without is_active: the previous state is unknown
+            continue
+        employer_id = (new_values or old_values)['employer_id']
+        employer_deltas = deltas.setdefault(employer_id, Counter())
+        for values, sign in ((old_values, -1), (new_values, 1)):
+            if values is not None:
+                employer_deltas['job_count'] += sign
+                employer_deltas['active_job_count'] += sign * bool(values.get('is_active'))
+    for employer_id, employer_deltas in deltas.items():
+        adjust_employer(employer_id, employer_deltas)
+
+
+def job_deleted(job):
+    """Take a deleted job and its applications out of its employer's counters"""
+    deltas = {field: -getattr(job, field) for field in COUNTER_FIELDS}
+    deltas['job_count'] = -1
+    deltas['active_job_count'] = -int(job.is_active)
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    EmployerStats.objects.filter(employer_id=job.employer_id).update(**changes)
+
+
+def change_status(application, status, employer_id):
+    """Move ``application`` to ``status`` and shift the counters with it.
+
+    The row is only updated if it still has the status we read, so two
+    concurrent changes can't both move the counters from the same status.
+    Returns whether the status changed.
+    """
+    old_status = application.status
+    if status == old_status:
+        return False
+    with transaction.atomic():
+        updated = Application.objects.filter(id=application.id, status=old_status).update(status=status)
+        if updated:
+            adjust(application.job_id, employer_id, {
+                status_field(old_status): -1,
+                status_field(status): 1,
+            })
+    if updated:
+        application.status = status
+    return bool(updated)
+
+
+def change_statuses(applications, status, employer_id):
+    """Move every application in the ``applications`` queryset to ``status``.
+
+    One grouped query counts the matching rows per job and old status, one
+    UPDATE of the same queryset moves them, and the counters are shifted in
+    the same transaction.  ``applications`` must already be limited to
+    ``employer_id``'s jobs.  Returns ``{old status: applications moved}``.
+    """
+    applications = applications.exclude(status=status).order_by()
+    with transaction.atomic():
+        rows = list(applications.values('job_id', 'status').annotate(n=Count('id')))
+        if not rows:
+            return {}
+        applications.update(status=status)
+        moved = Counter()
+        job_deltas = {}
+        for row in rows:
+            moved[row['status']] += row['n']
+            deltas = job_deltas.setdefault(row['job_id'], Counter())
+            deltas[status_field(row['status'])] -= row['n']
+            deltas[status_field(status)] += row['n']
+        for job_id, deltas in job_deltas.items():
+            Job.objects.filter(id=job_id).update(**{
+                field: F(field) + delta for field, delta in deltas.items()
+            })
+        adjust_employer(employer_id, {
+            status_field(old_status): -count for old_status, count in moved.items()
+        } | {status_field(status): sum(moved.values())})
+    return dict(moved)
+
+
+def _count_rows(group_by):
+    """{group id: Counter of counter fields} computed from Application"""
+    counts = {}
+    rows = Application.objects.values(group_by, 'status').annotate(n=Count('id')).order_by()
+    for row in rows:
+        counter = counts.setdefault(row[group_by], Counter())
+        counter['application_count'] += row['n']
+        if row['status'] in STATUSES:
+            counter[status_field(row['status'])] += row['n']
+    return counts
+
+
+def _count_jobs():
+    """{employer id: Counter of job counter fields} computed from Job"""
+    counts = {}
+    rows = Job.objects.values('employer_id', 'is_active').annotate(n=Count('id')).order_by()
+    for row in rows:
+        counter = counts.setdefault(row['employer_id'], Counter())
+        counter['job_count'] += row['n']
+        if row['is_active']:
+            counter['active_job_count'] += row['n']
+    return counts
+
+
+def _repair(queryset, counts, fields, batch_size):
+    """Rewrite the ``fields`` of rows in ``queryset`` that differ from ``counts``"""
+    drifted = []
+    for row in queryset.only('pk', *fields).iterator(chunk_size=batch_size):
+        expected = counts.get(row.pk, Counter())
+        if any(getattr(row, field) != expected[field] for field in fields):
+            for field in fields:
+                setattr(row, field, expected[field])
+            drifted.append(row)
+    queryset.model.objects.bulk_update(drifted, fields, batch_size=batch_size)
+    return len(drifted)
+
+
+def reconcile(batch_size=1000):
+    """Recount everything with three GROUP BY queries and fix drifted rows.
+
+    Returns ``(jobs repaired, employers repaired)``.
+    """
+    with transaction.atomic():
+        missing = Employer.objects.filter(stats__isnull=True).values_list('id', flat=True)
+        EmployerStats.objects.bulk_create(
+            [EmployerStats(employer_id=employer_id) for employer_id in missing],
+            batch_size=batch_size,
+        )
+        jobs = _repair(Job.objects.all(), _count_rows('job_id'), COUNTER_FIELDS, batch_size)
+        employer_counts = _count_rows('job__employer_id')
+        for employer_id, job_counts in _count_jobs().items():
+            employer_counts.setdefault(employer_id, Counter()).update(job_counts)
+        employers = _repair(
+            EmployerStats.objects.all(), employer_counts,
+            JOB_COUNTER_FIELDS + COUNTER_FIELDS, batch_size,
+        )
+    return jobs, employers
@@ -0,0 +1,79 @@
+"""CSV export of an employer's applications.
+
+The export is streamed: applications are read in keyset batches as plain
+value tuples (no model instances), the skills of each batch's applicants
+come from one extra query, and every row is written to the response as soon
+as it is formatted.  Worker memory is bounded by the batch size, not by the
+number of applications.
+"""
+import csv
+
+from django.conf import settings
+
+from users.models import JobSeekerSkill
+from .models import Application
+
+HEADER = [
+    'application_id', 'job_id', 'job_title', 'applicant', 'email', 'phone', 'location',
+    'skills', 'status', 'applied_date', 'match_score',
+]
+
+FIELDS = [
+    'id', 'job_id', 'job__title', 'job_seeker_id', 'job_seeker__full_name',
+    'job_seeker__user__email', 'job_seeker__phone', 'job_seeker__location',
+    'job_seeker__skills', 'status', 'applied_date', 'match_score',
+]
+
+# Spreadsheets run cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """File-like object whose write() returns the line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+def cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def application_rows(applications, batch_size=None):
+    """Yield one CSV row per application of the ``applications`` queryset"""
+    batch_size = batch_size or getattr(settings, 'APPLICATION_EXPORT_BATCH_SIZE', 1000)
+    applications = applications.order_by('id').values_list(*FIELDS)
+    last_id = 0
+    while True:
+        batch = list(applications.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return
+        skills = {}
+        for seeker_id, name in JobSeekerSkill.objects.filter(
+            job_seeker_id__in={row[3] for row in batch}
+        ).order_by('job_seeker_id', 'position').values_list('job_seeker_id', 'skill__name'):
+            skills.setdefault(seeker_id, []).append(name)
+        for (application_id, job_id, title, seeker_id, name, email, phone, location,
+             skills_text, status, applied_date, match_score) in batch:
+            # Like JobSeeker.skills_list: the skills text until it is normalized
+            seeker_skills = skills.get(seeker_id) or [
+                skill.strip() for skill in (skills_text or '').split(',') if skill.strip()
+            ]
+            yield [
+                application_id, job_id, cell(title), cell(name), cell(email), cell(phone),
+                cell(location), cell('; '.join(seeker_skills)), status,
+                applied_date.isoformat(), '' if match_score is None else round(match_score, 4),
+            ]
+        last_id = batch[-1][0]
+
+
+def csv_lines(applications, batch_size=None):
+    """The export as an iterator of CSV lines, header first"""
+    writer = csv.writer(Echo())
+    yield writer.writerow(HEADER)
+    for row in application_rows(applications, batch_size):
+        yield writer.writerow(row)
@@ -0,0 +1,142 @@
+"""Precomputed facet counts for the job listing.
+
+``JobFacetCount`` holds one row per (facet, value) with the number of active
+jobs carrying that value.  Rows are adjusted by +/-1 whenever a job is
+created, edited, toggled or deleted, so the listing reads every facet count
+with a single query instead of a GROUP BY over the Job table per facet.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from main.locations import get_gazetteer
+
+from .models import Job, JobFacetCount
+
+# Locations are counted by their canonical gazetteer code, so "Cochin" and
+# "Ernakulam" are one option; jobs in unrecognized places have no option
+FACETS = (
+    ('job_type', 'Job Type'),
+    ('experience_level', 'Experience'),
+    ('location_code', 'Location'),
+)
+
+FACET_LABELS = {
+    'job_type': dict(Job.JOB_TYPE_CHOICES),
+    'experience_level': dict(Job.EXPERIENCE_LEVEL_CHOICES),
+}
+
+# Location facets can have a long tail; only show the most common values
+MAX_FACET_OPTIONS = 15
+
+
+def facet_value(value):
+    return (value or '').strip()
+
+
+def facet_label(facet, value):
+    if facet == 'location_code':
+        location = get_gazetteer().get(value)
+        return location.name if location else value
+    return FACET_LABELS.get(facet, {}).get(value, value)
+
+
+def job_facets(values):
+    """The (facet, value) pairs an active job contributes to the counts"""
+    if not values or not values.get('is_active'):
+        return []
+    pairs = []
+    for facet, _ in FACETS:
+        value = facet_value(values.get(facet))
+        if value:
+            pairs.append((facet, value))
+    return pairs
+
+
+def apply_job_change(old_values, new_values):
+    """Adjust facet counts for a job moving from ``old_values`` to ``new_values``.
+
+    Either side may be ``None`` for a created or deleted job.
+    """
+    apply_job_changes([(old_values, new_values)])
+
+
+def apply_job_changes(changes):
+    """Adjust facet counts for many ``(old_values, new_values)`` pairs at once"""
+    deltas = Counter()
+    for old_values, new_values in changes:
+        for pair in job_facets(old_values):
+            deltas[pair] -= 1
+        for pair in job_facets(new_values):
+            deltas[pair] += 1
+    changed = [(pair, delta) for pair, delta in deltas.items() if delta]
+    if not changed:
+        return
+    with transaction.atomic():
+        for (facet, value), delta in changed:
+            row, _ = JobFacetCount.objects.get_or_create(facet=facet, value=value)
+            JobFacetCount.objects.filter(pk=row.pk).update(count=F('count') + delta)
+
+
+def rebuild_facet_counts():
+    """Recompute every facet count from the Job table."""
+    active_jobs = Job.objects.filter(is_active=True)
+    counts = Counter()
+    for facet, _ in FACETS:
+        for row in active_jobs.values(facet).annotate(total=Count('id')).order_by():
+            value = facet_value(row[facet])
+            if value:
+                counts[(facet, value)] += row['total']
+    with transaction.atomic():
+        JobFacetCount.objects.all().delete()
+        JobFacetCount.objects.bulk_create([
+            JobFacetCount(facet=facet, value=value, count=count)
+            for (facet, value), count in counts.items()
+        ])
+    return len(counts)
+
+
+def get_facets(params):
+    """All facet options with their counts, for rendering filter links.
+
+    ``params`` is the request's QueryDict; each option carries the query
+    string that selects it (or clears it, if already selected).
+    """
+    options = {facet: [] for facet, _ in FACETS}
+    for row in JobFacetCount.objects.filter(count__gt=0).order_by('-count', 'value'):
+        if row.facet in options:
+            options[row.facet].append(row)
+
+    facets = []
+    for facet, label in FACETS:
+        selected = params.get(facet, '')
+        rows = options[facet][:MAX_FACET_OPTIONS]
+        facets.append({
+            'name': facet,
+            'label': label,
+            'selected': selected,
+            'clear_query_string': _query_string(params, facet, None),
+            'options': [
+                {
+                    'value': row.value,
+                    'label': facet_label(facet, row.value),
+                    'count': row.count,
+                    'selected': row.value == selected,
+                    'query_string': _query_string(
+                        params, facet, None if row.value == selected else row.value
+                    ),
+                }
+                for row in rows
+            ],
+        })
+    return facets
+
+
+def _query_string(params, facet, value):
+    params = params.copy()
+    params.pop('cursor', None)
+    params.pop(facet, None)
+    if value is not None:
+        params[facet] = value
+    return params.urlencode()
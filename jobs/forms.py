@@ -1,5 +1,6 @@
 from django import forms
 from .models import Job
+from .salary import apply_salary
 
 class JobForm(forms.ModelForm):
     class Meta:
@@ -50,4 +51,9 @@ class JobForm(forms.ModelForm):
         self.fields['job_type'].required = True
         self.fields['experience_level'].required = True
         self.fields['description'].required = True
-        self.fields['requirements'].required = True
\ No newline at end of file
+        self.fields['requirements'].required = True
+    
+    def save(self, commit=True):
+        # Keep the structured salary range in step with the salary text
+        apply_salary(self.instance)
+        return super().save(commit)
@@ -0,0 +1,114 @@
+"""Typo-tolerant search via a trigram index over the title vocabulary.
+
+Every distinct word of a job title or company name is a ``SearchTerm``, and
+``SearchTermTrigram`` maps each trigram to the terms containing it.  A
+misspelt query word is corrected by looking up its trigrams' posting lists
+(an index seek per trigram) and ranking the candidate terms by trigram
+similarity; the corrected query is then run through the normal full-text
+search.  The vocabulary is orders of magnitude smaller than the Job table,
+so a lookup touches a few thousand index entries at most.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Cast
+
+from users.models import Employer
+
+from .models import Job, SearchTerm, SearchTermTrigram
+from .search import search_terms
+
+MAX_TERM_LENGTH = 100
+
+
+def trigrams(word):
+    """Trigrams of a word padded like pg_trgm: two spaces before, one after"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _vocabulary(texts):
+    words = set()
+    for text in texts:
+        words.update(word for word in search_terms(text) if len(word) <= MAX_TERM_LENGTH)
+    return words
+
+
+def index_terms(*texts):
+    """Add the words of ``texts`` to the vocabulary (existing words are skipped)"""
+    words = _vocabulary(texts)
+    if not words:
+        return
+    existing = set(SearchTerm.objects.filter(term__in=words).values_list('term', flat=True))
+    _create_terms(words - existing)
+
+
+def _create_terms(words):
+    if not words:
+        return
+    with transaction.atomic():
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(term=word, trigram_count=len(trigrams(word))) for word in words],
+            ignore_conflicts=True,
+        )
+        created = SearchTerm.objects.filter(term__in=words).values_list('id', 'term')
+        SearchTermTrigram.objects.bulk_create(
+            [
+                SearchTermTrigram(trigram=trigram, term_id=term_id)
+                for term_id, term in created
+                for trigram in trigrams(term)
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def rebuild_vocabulary(batch_size=1000):
+    """Rebuild the term vocabulary from all job titles and company names."""
+    titles = Job.objects.values_list('title', flat=True).order_by()
+    companies = Employer.objects.values_list('company_name', flat=True).order_by()
+    words = _vocabulary(titles.iterator(chunk_size=batch_size))
+    words |= _vocabulary(companies.iterator(chunk_size=batch_size))
+    with transaction.atomic():
+        SearchTermTrigram.objects.all().delete()
+        SearchTerm.objects.all().delete()
+        words = sorted(words)
+        for start in range(0, len(words), batch_size):
+            _create_terms(words[start:start + batch_size])
+    return len(words)
+
+
+def similar_terms(word, threshold=None, limit=3):
+    """Vocabulary terms most similar to ``word``, best first"""
+    if threshold is None:
+        threshold = getattr(settings, 'JOB_FUZZY_SEARCH_THRESHOLD', 0.25)
+    grams = trigrams(word)
+    # similarity >= threshold needs at least threshold * |grams| shared trigrams
+    min_shared = max(1, int(threshold * len(grams)))
+    # Ranked by similarity in the query: by shared trigrams alone, long
+    # terms would crowd out short ones that match better
+    candidates = (
+        SearchTermTrigram.objects
+        .filter(trigram__in=grams)
+        .values('term__term', 'term__trigram_count')
+        .annotate(shared=Count('id'))
+        .filter(shared__gte=min_shared)
+        .annotate(score=Cast('shared', FloatField()) / (
+            Value(len(grams)) + F('term__trigram_count') - F('shared')
+        ))
+        .filter(score__gte=threshold)
+        .order_by('-score', 'term__term')[:limit]
+    )
+    return [row['term__term'] for row in candidates]
+
+
+def correct_query(search_query):
+    """Replace each query word by its closest vocabulary term.
+
+    Words with no similar term are kept as typed, so the result equals the
+    normalized query when nothing could be corrected.
+    """
+    corrected = []
+    for word in search_terms(search_query):
+        matches = similar_terms(word, limit=1)
+        corrected.append(matches[0] if matches else word)
+    return ' '.join(corrected)
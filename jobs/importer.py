@@ -0,0 +1,270 @@
+"""Bulk job import from CSV and JSON Lines feeds.
+
+Large employers hand over thousands of postings at once, through
+``manage.py import_jobs`` or the import page.  Feeds are read row by row and
+written in batches, so memory stays flat however long the file is.  Every
+row is validated with the ``JobForm`` rules; a row whose ``external_id`` the
+employer imported before updates that job instead of adding a duplicate.
+
+Bulk inserts and updates skip ``save()`` and the post_save handlers, so
+each batch does their work itself: salary ranges, location codes, facet
+counts, employer job counters, match scores, the search vocabulary, cached
+search results and recommendations.
+"""
+import csv
+import json
+import os
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from main.locations import apply_location
+from . import counters, facets, fuzzy, recommendations
+from .forms import JobForm
+from .matching import JOB_MATCH_FIELDS
+from .models import Application, Job
+from .salary import apply_salary
+from .search_cache import result_cache
+
+FORMAT_EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+# Rewritten on re-imported jobs
+UPDATE_FIELDS = JobForm.Meta.fields + [
+    'salary_min', 'salary_max', 'salary_period', 'location_code', 'is_active', 'updated_at',
+]
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'active', 'open'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'inactive', 'closed'}
+
+EXTERNAL_ID_MAX_LENGTH = Job._meta.get_field('external_id').max_length
+
+
+class FeedError(ValueError):
+    """The feed as a whole cannot be read"""
+
+
+def feed_format(filename, format=None):
+    """``format`` if given, otherwise guessed from the file extension"""
+    if format:
+        if format not in FORMAT_EXTENSIONS.values():
+            raise FeedError(f'Unknown feed format "{format}"; use csv or jsonl.')
+        return format
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension not in FORMAT_EXTENSIONS:
+        raise FeedError('Unknown feed format; use a .csv or .jsonl file.')
+    return FORMAT_EXTENSIONS[extension]
+
+
+def read_feed(stream, format):
+    """Yield ``(row_number, data, error)`` for each record of a text stream.
+
+    Records that cannot be parsed come with ``data=None`` and an error
+    message instead of stopping the import.
+    """
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        reader.fieldnames  # reads the header row
+        # Report the line each record starts on; quoted values may span lines
+        line = reader.line_num
+        for data in reader:
+            yield line + 1, data, None
+            line = reader.line_num
+        return
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f'Invalid JSON: {exc}'
+            continue
+        if not isinstance(data, dict):
+            yield number, None, 'Expected a JSON object.'
+            continue
+        yield number, data, None
+
+
+def parse_active(value):
+    """True, False, or None when the feed leaves the status unchanged"""
+    if value is None or isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if not text:
+        return None
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f'Expected true or false, got "{value}".')
+
+
+class ImportResult:
+    """Row counts of an import and the first ``max_errors`` failed rows"""
+
+    def __init__(self, max_errors):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, row, external_id, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': row, 'external_id': external_id, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+
+class JobImporter:
+    """Validates feed rows and upserts them as jobs of ``employer`` in batches.
+
+    ``on_error(row, external_id, errors)`` is called for every rejected row,
+    e.g. to stream a full error report; ``errors`` maps a field name (or
+    ``__all__``) to its messages.
+    """
+
+    def __init__(self, employer, batch_size=None, max_errors=None, on_error=None):
+        self.employer = employer
+        self.batch_size = batch_size or getattr(settings, 'JOB_IMPORT_BATCH_SIZE', 500)
+        self.on_error = on_error
+        self.result = ImportResult(
+            getattr(settings, 'JOB_IMPORT_MAX_REPORTED_ERRORS', 200) if max_errors is None else max_errors
+        )
+
+    def run(self, records):
+        """Import ``(row_number, data, error)`` records, e.g. from ``read_feed``"""
+        batch = []
+        external_ids = set()
+        for row, data, error in records:
+            values, errors = self.validate(data, error)
+            if errors:
+                self.reject(row, (data or {}).get('external_id') or '', errors)
+                continue
+            external_id = values['external_id']
+            if external_id in external_ids:
+                # The same posting twice in one batch: write the first one
+                # so the second updates it
+                self.write(batch)
+                batch, external_ids = [], set()
+            batch.append(values)
+            if external_id:
+                external_ids.add(external_id)
+            if len(batch) >= self.batch_size:
+                self.write(batch)
+                batch, external_ids = [], set()
+        self.write(batch)
+        return self.result
+
+    def reject(self, row, external_id, errors):
+        self.result.add_error(row, str(external_id), errors)
+        if self.on_error is not None:
+            self.on_error(row, str(external_id), errors)
+
+    def validate(self, data, error=None):
+        """``(values, errors)`` of one feed record; values are None if invalid"""
+        if error:
+            return None, {'__all__': [error]}
+        data = {
+            str(key).strip(): '' if value is None else value
+            for key, value in data.items() if key is not None
+        }
+        form = JobForm(data={field: data.get(field, '') for field in JobForm.Meta.fields})
+        errors = {field: list(messages) for field, messages in form.errors.items()}
+        external_id = str(data.get('external_id', '')).strip()
+        if len(external_id) > EXTERNAL_ID_MAX_LENGTH:
+            errors['external_id'] = [f'Ensure this value has at most {EXTERNAL_ID_MAX_LENGTH} characters.']
+        try:
+            is_active = parse_active(data.get('is_active'))
+        except ValueError as exc:
+            errors['is_active'] = [str(exc)]
+        if errors:
+            return None, errors
+        values = dict(form.cleaned_data)
+        values['external_id'] = external_id
+        values['is_active'] = is_active
+        return values, None
+
+    def update_rows(self, jobs):
+        """Write ``UPDATE_FIELDS`` of ``jobs`` with one prepared statement.
+
+        bulk_update builds a CASE expression per field and row, which costs
+        far more than the UPDATE itself for batches of this size.
+        """
+        if not jobs:
+            return
+        fields = [Job._meta.get_field(name) for name in UPDATE_FIELDS]
+        quote = connection.ops.quote_name
+        sql = 'UPDATE {} SET {} WHERE {} = %s'.format(
+            quote(Job._meta.db_table),
+            ', '.join(f'{quote(field.column)} = %s' for field in fields),
+            quote(Job._meta.pk.column),
+        )
+        params = [
+            [field.get_db_prep_save(getattr(job, field.attname), connection) for field in fields] + [job.pk]
+            for job in jobs
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+    def write(self, batch):
+        """Create or update one batch of validated rows in a single transaction"""
+        if not batch:
+            return
+        existing = {
+            job.external_id: job
+            for job in Job.objects.filter(
+                employer=self.employer,
+                external_id__in=[values['external_id'] for values in batch if values['external_id']],
+            )
+        }
+        now = timezone.now()
+        created, updated = [], []
+        for values in batch:
+            job = existing.get(values['external_id'])
+            if job is None:
+                job = Job(employer=self.employer)
+                created.append(job)
+            else:
+                job.updated_at = now
+                updated.append(job)
+            for field, value in values.items():
+                if field != 'is_active':
+                    setattr(job, field, value)
+            if values['is_active'] is not None:
+                job.is_active = values['is_active']
+            apply_salary(job)
+            apply_location(job)
+
+        changes = [(None, job.current_values()) for job in created]
+        changes += [(job.stored_values, job.current_values()) for job in updated]
+        rematch = [
+            job.pk for job in updated
+            if any(job.stored_values.get(field) != getattr(job, field) for field in JOB_MATCH_FIELDS)
+        ]
+        with transaction.atomic():
+            Job.objects.bulk_create(created)
+            self.update_rows(updated)
+            facets.apply_job_changes(changes)
+            counters.jobs_changed(changes)
+            if rematch:
+                # Applicant match scores were computed against the old text
+                Application.objects.filter(job_id__in=rematch).update(match_score=None)
+            fuzzy.index_terms(*{job.title for job in created + updated})
+
+        for job in updated:
+            job._loaded_values = job.current_values()
+        result_cache.invalidate()
+        # Jobs created without a returned primary key are folded into the
+        # index by id on its next load
+        recommendations.jobs_changed([job for job in created + updated if job.pk is not None])
+        self.result.created += len(created)
+        self.result.updated += len(updated)
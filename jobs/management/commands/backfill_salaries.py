@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+from jobs.salary import apply_salary
+
+
+class Command(BaseCommand):
+    help = 'Parse the salary text of every job into salary_min, salary_max and salary_period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Jobs parsed and updated per query',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        jobs = Job.objects.only('id', 'salary').order_by('id')
+        total = parsed = 0
+        last_id = 0
+        while True:
+            batch = list(jobs.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            for job in batch:
+                apply_salary(job)
+                parsed += job.salary_max is not None
+            Job.objects.bulk_update(batch, ['salary_min', 'salary_max', 'salary_period'])
+            total += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f'Processed {total} jobs...')
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfilled salaries for {total} jobs ({parsed} with a parseable salary).'
+        ))
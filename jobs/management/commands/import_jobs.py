@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.importer import FeedError, JobImporter, feed_format, read_feed
+from users.models import Employer
+
+
+class Command(BaseCommand):
+    help = (
+        'Import jobs for an employer from a CSV or JSON Lines feed, upserting rows by '
+        'external_id and reporting rows that fail validation'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Feed file, or - to read standard input')
+        parser.add_argument(
+            '--employer', required=True,
+            help='Employer ID or the username of its account',
+        )
+        parser.add_argument(
+            '--format', choices=['csv', 'jsonl'],
+            help='Feed format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Rows written per transaction',
+        )
+        parser.add_argument(
+            '--errors',
+            help='Write every rejected row to this CSV file (row, external_id, field, message)',
+        )
+
+    def get_employer(self, value):
+        lookup = {'pk': value} if value.isdigit() else {'user__username': value}
+        try:
+            return Employer.objects.get(**lookup)
+        except Employer.DoesNotExist:
+            raise CommandError(f'Employer "{value}" does not exist.')
+
+    def handle(self, *args, **options):
+        employer = self.get_employer(options['employer'])
+        path = options['path']
+        try:
+            format = feed_format(None if path == '-' else path, options['format'])
+        except FeedError as exc:
+            raise CommandError(exc)
+
+        report_file = report = None
+        if options['errors']:
+            report_file = open(options['errors'], 'w', newline='', encoding='utf-8')
+            report = csv.writer(report_file)
+            report.writerow(['row', 'external_id', 'field', 'message'])
+
+        def on_error(row, external_id, errors):
+            if report is not None:
+                for field, messages in errors.items():
+                    for message in messages:
+                        report.writerow([row, external_id, field, message])
+
+        # The summary lists the first rejected rows; the report file gets all of them
+        importer = JobImporter(employer, batch_size=options['batch_size'], on_error=on_error)
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+        else:
+            stream = open(path, encoding='utf-8-sig', newline='')
+        try:
+            with stream:
+                result = importer.run(read_feed(stream, format))
+        except UnicodeDecodeError:
+            raise CommandError('The feed is not valid UTF-8.')
+        except csv.Error as exc:
+            raise CommandError(f'Malformed CSV: {exc}')
+        finally:
+            if report_file is not None:
+                report_file.close()
+
+        for error in result.errors:
+            self.stderr.write(f'Row {error["row"]}: {json.dumps(error["errors"])}')
+        if result.failed > len(result.errors):
+            self.stderr.write(f'... and {result.failed - len(result.errors)} more rejected rows.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported jobs for {employer}: {result.created} created, {result.updated} updated, '
+            f'{result.failed} rejected.'
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from jobs.facets import rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute job listing facet counts from the Job table'
+
+    def handle(self, *args, **options):
+        count = rebuild_facet_counts()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} facet counts.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import recommendations
+
+
+class Command(BaseCommand):
+    help = 'Refit the TF-IDF job recommendation index over all active jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Jobs fetched from the database per query',
+        )
+
+    def handle(self, *args, **options):
+        if not recommendations.available():
+            raise CommandError('Job recommendations require numpy and scipy.')
+        index = recommendations.build_index(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {len(index.job_ids)} jobs over {len(index.vocabulary)} terms '
+            f'into {recommendations.index_path()}.'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from jobs import fuzzy, search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text job search index and fuzzy-search vocabulary'
+
+    def handle(self, *args, **options):
+        if search.fts_enabled():
+            count = search.rebuild_index()
+            self.stdout.write(self.style.SUCCESS(f'Indexed {count} jobs.'))
+        else:
+            self.stdout.write(self.style.WARNING('Full-text index is only available on SQLite.'))
+        terms = fuzzy.rebuild_vocabulary()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {terms} search terms for fuzzy matching.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs.counters import reconcile
+
+
+class Command(BaseCommand):
+    help = 'Recount stored application counters on jobs and employers and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows updated per query',
+        )
+
+    def handle(self, *args, **options):
+        jobs, employers = reconcile(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Repaired counters on {jobs} jobs and {employers} employers.'
+        ))
@@ -0,0 +1,77 @@
+"""Applicant-to-job match scores for ranking applications.
+
+Each application's ``match_score`` is the cosine similarity between the
+applicant's profile (skills, experience, bio) and the job's text (title,
+requirements, description), over the job's own terms.  Scores are computed
+for all of a job's unscored applications in one sparse matrix product and
+stored, so ordering by match is a plain indexed ORDER BY.  Signals reset a
+score to NULL when the job's text or the applicant's profile changes.
+"""
+from .models import Application, Job
+from .recommendations import available, job_terms, seeker_terms, tfidf_matrix
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+UPDATE_BATCH_SIZE = 500
+
+JOB_MATCH_FIELDS = ('title', 'requirements', 'description')
+SEEKER_MATCH_FIELDS = ('skills', 'experience', 'bio')
+
+
+def score_applications(job):
+    """Compute the missing match scores of ``job``'s applications.
+
+    Returns the number of applications scored.
+    """
+    return _score_pending(Application.objects.filter(job=job), {job.id: job})
+
+
+def score_employer_applications(employer):
+    """Compute the missing match scores across all of ``employer``'s jobs.
+
+    The unscored applications and their jobs are loaded with one query each
+    and the scores written back in one bulk update, however many jobs they
+    belong to.
+    """
+    return _score_pending(Application.objects.filter(job__employer=employer))
+
+
+def _score_pending(applications, jobs=None):
+    """Score the unscored ``applications``; ``jobs`` maps the job IDs already loaded"""
+    if not available():
+        return 0
+    pending = list(
+        applications.filter(match_score__isnull=True)
+        .select_related('job_seeker')
+        .only('id', 'job_id', 'job_seeker__skills', 'job_seeker__experience', 'job_seeker__bio')
+    )
+    if not pending:
+        return 0
+
+    by_job = {}
+    for application in pending:
+        by_job.setdefault(application.job_id, []).append(application)
+    if jobs is None:
+        jobs = Job.objects.only('id', *JOB_MATCH_FIELDS).in_bulk(list(by_job))
+    for job_id, job_applications in by_job.items():
+        _score_job(jobs[job_id], job_applications)
+    Application.objects.bulk_update(pending, ['match_score'], batch_size=UPDATE_BATCH_SIZE)
+    return len(pending)
+
+
+def _score_job(job, applications):
+    """Set ``match_score`` on ``applications``, all made to ``job``"""
+    terms = job_terms(job)
+    vocabulary = {term: column for column, term in enumerate(sorted(terms))}
+    # Plain term frequencies: scores must not depend on who else applied
+    weights = np.ones(len(vocabulary), dtype=np.float32)
+    job_vector = tfidf_matrix([terms], vocabulary, weights)
+    applicants = tfidf_matrix(
+        [seeker_terms(application.job_seeker) for application in applications], vocabulary, weights
+    )
+    scores = (applicants @ job_vector.T).toarray().ravel()
+    for application, score in zip(applications, scores):
+        application.match_score = round(float(score), 4)
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+
+def create_fts_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends fall back to icontains search.
+    # The sync triggers are installed by the jobs app's post_migrate handler.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS jobs_job_fts USING fts5(
+            title, description, requirements, company_name,
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    schema_editor.execute(
+        """
+        INSERT INTO jobs_job_fts (rowid, title, description, requirements, company_name)
+        SELECT j.id, j.title, j.description, j.requirements, e.company_name
+        FROM jobs_job j INNER JOIN users_employer e ON e.id = j.employer_id
+        """
+    )
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for trigger in ('insert', 'update', 'delete', 'company'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS jobs_job_fts_{trigger}')
+    schema_editor.execute('DROP TABLE IF EXISTS jobs_job_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_employer_created_at_jobseeker_created_at_and_more'),
+        ('jobs', '0004_alter_application_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
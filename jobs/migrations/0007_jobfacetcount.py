@@ -0,0 +1,43 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:42
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def populate_facet_counts(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobFacetCount = apps.get_model('jobs', 'JobFacetCount')
+    counts = Counter()
+    for job in Job.objects.filter(is_active=True).values('job_type', 'experience_level', 'location'):
+        for facet, value in job.items():
+            value = (value or '').strip()
+            if value:
+                counts[(facet, value)] += 1
+    JobFacetCount.objects.bulk_create([
+        JobFacetCount(facet=facet, value=value, count=count)
+        for (facet, value), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_job_active_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=30)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+        migrations.RunPython(populate_facet_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:45
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_vocabulary(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Employer = apps.get_model('users', 'Employer')
+    SearchTerm = apps.get_model('jobs', 'SearchTerm')
+    SearchTermTrigram = apps.get_model('jobs', 'SearchTermTrigram')
+
+    def trigrams(word):
+        padded = f'  {word} '
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    words = set()
+    texts = list(Job.objects.values_list('title', flat=True))
+    texts += list(Employer.objects.values_list('company_name', flat=True))
+    for text in texts:
+        words.update(word for word in re.findall(r'\w+', text.lower()) if len(word) <= 100)
+    for word in sorted(words):
+        term = SearchTerm.objects.create(term=word, trigram_count=len(trigrams(word)))
+        SearchTermTrigram.objects.bulk_create(
+            [SearchTermTrigram(trigram=trigram, term=term) for trigram in trigrams(word)]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_employer_created_at_jobseeker_created_at_and_more'),
+        ('jobs', '0007_jobfacetcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100, unique=True)),
+                ('trigram_count', models.PositiveSmallIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchTermTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='jobs.searchterm')),
+            ],
+            options={
+                'unique_together': {('trigram', 'term')},
+            },
+        ),
+        migrations.RunPython(populate_vocabulary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_job_salary_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='location_code',
+            field=models.CharField(blank=True, db_index=True, max_length=50),
+        ),
+    ]
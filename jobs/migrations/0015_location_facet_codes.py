@@ -0,0 +1,43 @@
+# Generated by Django 4.1.13 on 2026-10-18 21:30
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def count_location_codes(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobFacetCount = apps.get_model('jobs', 'JobFacetCount')
+    JobFacetCount.objects.filter(facet='location').delete()
+    rows = Job.objects.filter(is_active=True).exclude(location_code='').values('location_code').annotate(
+        total=Count('id')
+    ).order_by()
+    JobFacetCount.objects.bulk_create([
+        JobFacetCount(facet='location_code', value=row['location_code'], count=row['total'])
+        for row in rows
+    ])
+
+
+def count_locations(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobFacetCount = apps.get_model('jobs', 'JobFacetCount')
+    JobFacetCount.objects.filter(facet='location_code').delete()
+    counts = {}
+    for location in Job.objects.filter(is_active=True).values_list('location', flat=True):
+        location = (location or '').strip()
+        if location:
+            counts[location] = counts.get(location, 0) + 1
+    JobFacetCount.objects.bulk_create([
+        JobFacetCount(facet='location', value=value, count=count)
+        for value, count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_job_external_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_location_codes, count_locations),
+    ]
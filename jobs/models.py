@@ -1,7 +1,9 @@
 from django.contrib.auth.models import User
 from django.db import models
+from main.locations import apply_location
+from main.models import ChangeTrackingModel
 
-class Job(models.Model):
+class Job(ChangeTrackingModel):
     JOB_TYPE_CHOICES = (
         ('full_time', 'Full Time'),
         ('part_time', 'Part Time'),
@@ -16,31 +18,121 @@ class Job(models.Model):
         ('senior', 'Senior Level'),
     )
     
+    SALARY_PERIOD_CHOICES = (
+        ('hour', 'per hour'),
+        ('day', 'per day'),
+        ('week', 'per week'),
+        ('month', 'per month'),
+        ('year', 'per year'),
+    )
+    
     employer = models.ForeignKey('users.Employer', on_delete=models.CASCADE)  # Use string reference
     title = models.CharField(max_length=200)
     department = models.CharField(max_length=100)
     location = models.CharField(max_length=100)
+    # Canonical gazetteer ID for the location text, see main.locations
+    location_code = models.CharField(max_length=50, blank=True, db_index=True)
     job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES)
     experience_level = models.CharField(max_length=20, choices=EXPERIENCE_LEVEL_CHOICES)
     salary = models.CharField(max_length=100, blank=True)
+    # Parsed from salary by jobs.salary.parse_salary
+    salary_min = models.PositiveIntegerField(null=True, blank=True)
+    salary_max = models.PositiveIntegerField(null=True, blank=True)
+    salary_period = models.CharField(max_length=10, choices=SALARY_PERIOD_CHOICES, blank=True)
     description = models.TextField()
     requirements = models.TextField()
     is_active = models.BooleanField(default=True)
+    # The employer's own ID for the posting; re-imported feeds upsert on it
+    external_id = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped by every save(); versions the cached job card fragments
+    updated_at = models.DateTimeField(auto_now=True)
+    # Application counters, maintained by jobs.counters
+    application_count = models.IntegerField(default=0)
+    applied_count = models.IntegerField(default=0)
+    viewed_count = models.IntegerField(default=0)
+    shortlisted_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    hired_count = models.IntegerField(default=0)
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        apply_location(self)
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            # The counters are only written with F() expressions by
+            # jobs.counters; don't put back the values this instance loaded
+            from .counters import COUNTER_FIELDS
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
     def get_applications_count(self):
         """Get total applications for this job"""
-        return self.application_set.count()
+        return self.application_count
     
     def get_pending_applications_count(self):
         """Get pending applications for this job"""
-        return self.application_set.filter(status='applied').count()
+        return self.applied_count
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the public listing
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_created_idx',
+            ),
+            # Salary filters and highest-paid-first listing
+            models.Index(
+                fields=['salary_period', '-salary_max', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_salary_idx',
+            ),
+        ]
+        constraints = [
+            # Also the lookup index for upserts by external ID
+            models.UniqueConstraint(
+                fields=['employer', 'external_id'],
+                condition=~models.Q(external_id=''),
+                name='job_employer_external_id_uniq',
+            ),
+        ]
+
+class JobFacetCount(models.Model):
+    """Number of active jobs per facet value, maintained incrementally"""
+    facet = models.CharField(max_length=30)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.facet}={self.value} ({self.count})"
+    
+    class Meta:
+        unique_together = ['facet', 'value']
+
+class SearchTerm(models.Model):
+    """A word from a job title or company name, for typo-tolerant search"""
+    term = models.CharField(max_length=100, unique=True)
+    trigram_count = models.PositiveSmallIntegerField()
+    
+    def __str__(self):
+        return self.term
+
+class SearchTermTrigram(models.Model):
+    """Inverted index from a trigram to the search terms containing it"""
+    trigram = models.CharField(max_length=3)
+    term = models.ForeignKey(SearchTerm, on_delete=models.CASCADE)
+    
+    def __str__(self):
+        return f"{self.trigram} -> {self.term_id}"
+    
+    class Meta:
+        unique_together = ['trigram', 'term']
 
 class Application(models.Model):
     STATUS_CHOICES = (
@@ -56,6 +148,8 @@ class Application(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='applied')
     applied_date = models.DateTimeField(auto_now_add=True)
     cover_letter = models.TextField(blank=True)
+    # Similarity of the applicant's profile to the job; NULL until computed
+    match_score = models.FloatField(null=True, blank=True)
     
     def __str__(self):
         return f"{self.job_seeker} - {self.job}"
@@ -71,4 +165,7 @@ class Application(models.Model):
     
     class Meta:
         unique_together = ['job_seeker', 'job']
-        ordering = ['-applied_date']
\ No newline at end of file
+        ordering = ['-applied_date']
+        indexes = [
+            models.Index(fields=['job', '-match_score'], name='application_job_match_idx'),
+        ]
\ No newline at end of file
@@ -0,0 +1,194 @@
+"""Cursor pagination for the public job listing.
+
+Pages are addressed by the ordering key of the row at their edge instead of
+an OFFSET, so fetching page 5,000 costs the same index seek as page 1.
+Cursors are opaque URL-safe tokens; a malformed cursor falls back to the
+first page.
+"""
+import base64
+import binascii
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    # Full precision: DjangoJSONEncoder would truncate microseconds and
+    # make cursors skip rows created within the same millisecond
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+def encode_cursor(data):
+    raw = json.dumps(data, default=_encode_value, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor(cursor) from exc
+    if not isinstance(data, dict):
+        raise InvalidCursor(cursor)
+    return data
+
+
+def get_page_size(request):
+    """Page size from ?page_size=, clamped to JOB_LIST_MAX_PAGE_SIZE"""
+    default = getattr(settings, 'JOB_LIST_PAGE_SIZE', 20)
+    maximum = getattr(settings, 'JOB_LIST_MAX_PAGE_SIZE', 100)
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except ValueError:
+        return default
+    return max(1, min(page_size, maximum))
+
+
+class CursorPage:
+    """One page of results plus the cursors of its neighbours"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, total=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking on a unique ordering key.
+
+    ``ordering`` must end with a unique field (normally ``id``) so that every
+    row has a distinct key.
+    """
+
+    def __init__(self, queryset, ordering=('-created_at', '-id'), page_size=20):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.fields = [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+        self.page_size = page_size
+
+    def page(self, cursor=None):
+        try:
+            data = decode_cursor(cursor) if cursor else {}
+            if 'before' in data:
+                return self._page_before(self._load_key(data['before']))
+            if 'after' in data:
+                return self._page_after(self._load_key(data['after']))
+        except (InvalidCursor, TypeError, ValueError, KeyError, ValidationError):
+            pass
+        return self._page_after(None)
+
+    def _page_after(self, key):
+        queryset = self.queryset
+        if key is not None:
+            queryset = queryset.filter(self._seek(key, forward=True))
+        rows = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        return CursorPage(
+            rows,
+            next_cursor=self._cursor('after', rows[-1]) if has_next else None,
+            previous_cursor=self._cursor('before', rows[0]) if key is not None and rows else None,
+        )
+
+    def _page_before(self, key):
+        reverse = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        queryset = self.queryset.filter(self._seek(key, forward=False))
+        rows = list(queryset.order_by(*reverse)[:self.page_size + 1])
+        has_previous = len(rows) > self.page_size
+        rows = rows[:self.page_size][::-1]
+        if not rows:
+            return self._page_after(None)
+        return CursorPage(
+            rows,
+            next_cursor=self._cursor('after', rows[-1]),
+            previous_cursor=self._cursor('before', rows[0]) if has_previous else None,
+        )
+
+    def _seek(self, key, forward):
+        """Rows strictly after (or before) ``key`` in ordering sequence.
+
+        Expands the lexicographic row comparison into an OR of prefix
+        matches, and adds a range on the leading field so the database can
+        seek the index instead of scanning it.
+        """
+        condition = Q()
+        for position, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending == forward else 'gt'
+            clause = Q(**{f'{name}__{lookup}': key[position]})
+            for prefix_position, (prefix_name, _) in enumerate(self.fields[:position]):
+                clause &= Q(**{prefix_name: key[prefix_position]})
+            condition |= clause
+        leading, descending = self.fields[0]
+        bound = 'lte' if descending == forward else 'gte'
+        return Q(**{f'{leading}__{bound}': key[0]}) & condition
+
+    def _cursor(self, direction, row):
+        return encode_cursor({direction: [getattr(row, name) for name, _ in self.fields]})
+
+    def _load_key(self, values):
+        if len(values) != len(self.fields):
+            raise InvalidCursor(values)
+        model = self.queryset.model
+        return [
+            model._meta.get_field(name).to_python(value)
+            for (name, _), value in zip(self.fields, values)
+        ]
+
+
+class RankedIdPaginator:
+    """Paginate an already ranked list of primary keys (e.g. search hits).
+
+    The ranking is computed once; each page then loads only its own rows.
+    """
+
+    def __init__(self, ids, queryset, page_size=20):
+        self.ids = ids
+        self.queryset = queryset
+        self.page_size = page_size
+
+    def page(self, cursor=None):
+        offset = 0
+        if cursor:
+            try:
+                offset = max(0, int(decode_cursor(cursor).get('offset', 0)))
+            except (InvalidCursor, TypeError, ValueError):
+                offset = 0
+        page_ids = self.ids[offset:offset + self.page_size]
+        objects = self.queryset.in_bulk(page_ids)
+        rows = [objects[pk] for pk in page_ids if pk in objects]
+        end = offset + self.page_size
+        return CursorPage(
+            rows,
+            next_cursor=encode_cursor({'offset': end}) if end < len(self.ids) else None,
+            previous_cursor=(
+                encode_cursor({'offset': max(0, offset - self.page_size)}) if offset else None
+            ),
+            total=len(self.ids),
+        )
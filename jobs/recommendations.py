@@ -0,0 +1,299 @@
+"""Skill-to-job recommendations from TF-IDF vectors.
+
+Active jobs (title, requirements, description) are embedded as L2-normalised
+TF-IDF rows of a sparse matrix.  Job seekers (skills, experience, bio) are
+embedded with the same vocabulary, and the best jobs for a whole batch of
+seekers come out of a single sparse matrix product.
+
+``manage.py rebuild_recommendations`` fits the vocabulary and IDF weights and
+saves the index to RECOMMENDATIONS_INDEX_PATH.  Each process loads it lazily,
+reloads it when the file changes, and folds in jobs posted or edited since
+the last rebuild without refitting.
+
+NumPy and SciPy are optional: without them recommendations are simply empty.
+"""
+import math
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+
+from .models import Job
+from .search import search_terms
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - optional dependency
+    np = sparse = None
+
+STOP_WORDS = frozenset('''
+    a about above after all also an and any are as at be been being both but by can could
+    did do does doing for from had has have having he her here his how i if in into is it
+    its just me more most my no nor not of off on once only or other our out over own same
+    she should so some such than that the their them then there these they this those
+    through to too under until up very was we were what when where which while who whom
+    why will with would you your years year work working experience team strong good
+    ability skills knowledge required requirements responsibilities job role
+'''.split())
+
+# Field weights: a term in a job title counts three times as much as in its
+# description, and a listed skill counts three times as much as the bio
+JOB_FIELDS = (('title', 3), ('requirements', 2), ('description', 1))
+SEEKER_FIELDS = (('skills', 3), ('experience', 1), ('bio', 1))
+
+MAX_FEATURES = 50000
+
+# Seekers scored per matrix product; bounds the dense score block in memory
+SCORE_BATCH_SIZE = 64
+
+
+def available():
+    return np is not None
+
+
+def _weighted_terms(obj, fields):
+    counts = Counter()
+    for field, weight in fields:
+        for term in search_terms(getattr(obj, field, '') or ''):
+            if len(term) > 1 and term not in STOP_WORDS and not term.isdigit():
+                counts[term] += weight
+    return counts
+
+
+def job_terms(job):
+    return _weighted_terms(job, JOB_FIELDS)
+
+
+def seeker_terms(job_seeker):
+    return _weighted_terms(job_seeker, SEEKER_FIELDS)
+
+
+def tfidf_matrix(documents, vocabulary, idf):
+    """Sparse L2-normalised TF-IDF matrix, one row per Counter of terms"""
+    indptr, indices, data = [0], [], []
+    for terms in documents:
+        for term, count in terms.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                indices.append(column)
+                # Sublinear tf damps terms repeated many times
+                data.append((1 + math.log(count)) * idf[column])
+        indptr.append(len(indices))
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr)),
+        shape=(len(indptr) - 1, len(vocabulary)),
+    )
+    if not matrix.shape[0]:
+        return matrix
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(matrix).tocsr()
+
+
+class RecommendationIndex:
+    """Vocabulary, IDF weights and the TF-IDF matrix of active jobs"""
+
+    def __init__(self, vocabulary, idf, job_ids, matrix):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.job_ids = job_ids
+        self.matrix = matrix
+        self.active = np.ones(len(job_ids), dtype=bool)
+        self.max_job_id = int(job_ids.max()) if len(job_ids) else 0
+        self._rows = {int(job_id): row for row, job_id in enumerate(job_ids)}
+
+    @classmethod
+    def fit(cls, jobs):
+        """Build an index from an iterable of Job objects."""
+        job_ids, documents, document_frequency = [], [], Counter()
+        for job in jobs:
+            terms = job_terms(job)
+            job_ids.append(job.id)
+            documents.append(terms)
+            document_frequency.update(terms.keys())
+
+        most_common = document_frequency.most_common(MAX_FEATURES)
+        vocabulary = {term: column for column, (term, _) in enumerate(sorted(most_common))}
+        idf = np.zeros(len(vocabulary), dtype=np.float32)
+        for term, frequency in most_common:
+            idf[vocabulary[term]] = math.log((1 + len(documents)) / (1 + frequency)) + 1
+        matrix = tfidf_matrix(documents, vocabulary, idf)
+        return cls(vocabulary, idf, np.array(job_ids, dtype=np.int64), matrix)
+
+    def transform(self, documents):
+        return tfidf_matrix(documents, self.vocabulary, self.idf)
+
+    def update_jobs(self, jobs):
+        """Add, replace or retire jobs without refitting the vocabulary.
+
+        An edited job's old row is masked out and its new vector appended,
+        so updates never rewrite the existing matrix in place.
+        """
+        jobs = list(jobs)
+        for job in jobs:
+            row = self._rows.pop(job.id, None)
+            if row is not None:
+                self.active[row] = False
+        fresh = [job for job in jobs if job.is_active]
+        if fresh:
+            start = len(self.job_ids)
+            self.matrix = sparse.vstack([self.matrix, self.transform(map(job_terms, fresh))]).tocsr()
+            self.job_ids = np.concatenate([self.job_ids, [job.id for job in fresh]])
+            self.active = np.concatenate([self.active, np.ones(len(fresh), dtype=bool)])
+            for offset, job in enumerate(fresh):
+                self._rows[job.id] = start + offset
+        if jobs:
+            self.max_job_id = max(self.max_job_id, max(job.id for job in jobs))
+
+    def recommend(self, seekers, k=10, exclude=None):
+        """Top-``k`` ``(job_id, score)`` pairs per seeker, best first.
+
+        ``exclude`` maps a seeker id to job ids to leave out (e.g. jobs the
+        seeker already applied to).
+        """
+        exclude = exclude or {}
+        seekers = list(seekers)
+        results = {}
+        if not len(self.job_ids):
+            return {seeker.id: [] for seeker in seekers}
+        for start in range(0, len(seekers), SCORE_BATCH_SIZE):
+            batch = seekers[start:start + SCORE_BATCH_SIZE]
+            vectors = self.transform(map(seeker_terms, batch))
+            # Cosine similarity of every seeker in the batch with every job
+            scores = (self.matrix @ vectors.T).T.toarray()
+            scores[:, ~self.active] = 0
+            for row, seeker in enumerate(batch):
+                row_scores = scores[row]
+                skip = [self._rows[job_id] for job_id in exclude.get(seeker.id, ()) if job_id in self._rows]
+                row_scores[skip] = 0
+                count = min(k, len(row_scores))
+                top = np.argpartition(-row_scores, count - 1)[:count]
+                top = top[np.argsort(-row_scores[top])]
+                results[seeker.id] = [
+                    (int(self.job_ids[column]), float(row_scores[column]))
+                    for column in top if row_scores[column] > 0
+                ]
+        return results
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        keep = self.active
+        matrix = self.matrix[keep]
+        tmp_path = f'{path}.tmp.npz'
+        np.savez_compressed(
+            tmp_path,
+            terms=np.array(terms, dtype=str),
+            idf=self.idf,
+            job_ids=self.job_ids[keep],
+            data=matrix.data,
+            indices=matrix.indices,
+            indptr=matrix.indptr,
+            shape=np.array(matrix.shape),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as stored:
+            vocabulary = {str(term): column for column, term in enumerate(stored['terms'])}
+            matrix = sparse.csr_matrix(
+                (stored['data'], stored['indices'], stored['indptr']),
+                shape=tuple(stored['shape']),
+            )
+            return cls(vocabulary, stored['idf'], stored['job_ids'], matrix)
+
+
+def index_path():
+    return str(getattr(
+        settings, 'RECOMMENDATIONS_INDEX_PATH',
+        os.path.join(settings.BASE_DIR, 'var', 'recommendations.npz'),
+    ))
+
+
+def build_index(batch_size=2000):
+    """Fit a fresh index over all active jobs and save it."""
+    jobs = Job.objects.filter(is_active=True).only(
+        'id', 'title', 'requirements', 'description'
+    ).order_by('id').iterator(chunk_size=batch_size)
+    index = RecommendationIndex.fit(jobs)
+    index.save(index_path())
+    return index
+
+
+_lock = threading.Lock()
+_loaded = {'index': None, 'mtime': None}
+
+
+def loaded_index():
+    """The index already loaded in this process, if any"""
+    return _loaded['index']
+
+
+def get_index():
+    """This process's index, reloaded when a rebuild replaced the file.
+
+    Returns None when NumPy/SciPy are missing or no index was built yet.
+    """
+    if not available():
+        return None
+    path = index_path()
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    with _lock:
+        if _loaded['mtime'] != mtime:
+            _loaded['index'] = RecommendationIndex.load(path)
+            _loaded['mtime'] = mtime
+        index = _loaded['index']
+        # Fold in jobs posted (by any process) since the index was built
+        new_jobs = Job.objects.filter(is_active=True, id__gt=index.max_job_id).only(
+            'id', 'title', 'requirements', 'description', 'is_active'
+        )
+        index.update_jobs(new_jobs)
+        return index
+
+
+def job_changed(job):
+    """Keep an already loaded index current after a job is saved"""
+    jobs_changed([job])
+
+
+def jobs_changed(jobs):
+    """Keep an already loaded index current after jobs were saved in bulk"""
+    index = loaded_index()
+    if index is not None:
+        with _lock:
+            index.update_jobs(jobs)
+
+
+def recommend_jobs(job_seekers, k=10):
+    """Top-``k`` recommended active jobs for each seeker.
+
+    Returns ``{seeker_id: [(job, score), ...]}``; jobs the seeker already
+    applied to are skipped.
+    """
+    from .models import Application
+
+    job_seekers = list(job_seekers)
+    index = get_index()
+    if index is None or not job_seekers:
+        return {seeker.id: [] for seeker in job_seekers}
+
+    applied = {}
+    for seeker_id, job_id in Application.objects.filter(
+        job_seeker__in=job_seekers
+    ).values_list('job_seeker_id', 'job_id'):
+        applied.setdefault(seeker_id, set()).add(job_id)
+
+    with _lock:
+        scored = index.recommend(job_seekers, k=k, exclude=applied)
+    job_ids = {job_id for pairs in scored.values() for job_id, _ in pairs}
+    jobs = Job.objects.filter(is_active=True).select_related('employer').in_bulk(job_ids)
+    return {
+        seeker_id: [(jobs[job_id], score) for job_id, score in pairs if job_id in jobs]
+        for seeker_id, pairs in scored.items()
+    }
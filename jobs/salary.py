@@ -0,0 +1,99 @@
+"""Structured salary ranges parsed from the free-text ``Job.salary``.
+
+Employers keep typing salaries the way they like ("$50,000 - $70,000 per
+year", "25/hr", "8-12 LPA"); ``parse_salary`` turns that into numeric
+``salary_min``/``salary_max`` plus a pay period so find_jobs can filter and
+sort on indexed columns.  Amounts are whole units of whatever currency was
+written; anything unparseable leaves the structured fields empty.
+"""
+import re
+
+PERIODS = ('hour', 'day', 'week', 'month', 'year')
+
+# Checked in order: the first keyword found in the text decides the period
+_PERIOD_PATTERNS = (
+    ('hour', re.compile(r'hour|hourly|/\s*h(?:r|rs)?\b|\bph\b|\bhr\b', re.I)),
+    ('day', re.compile(r'\bday\b|daily|/\s*d\b', re.I)),
+    ('week', re.compile(r'week|/\s*wk\b|\bpw\b', re.I)),
+    ('month', re.compile(r'month|/\s*mo\b|\bpm\b|\bp\.m\.', re.I)),
+    ('year', re.compile(r'year|annum|annual|/\s*yr\b|\bpa\b|\bp\.a\.|lpa|\bctc\b', re.I)),
+)
+
+_AMOUNT_RE = re.compile(
+    r'(\d+(?:,\d{3})*(?:\.\d+)?)\s*(k|m|mn|lakhs?|lacs?|lpa|crores?|cr)?\b', re.I
+)
+# A dash or "to", optionally followed by the currency of the upper bound
+_RANGE_SEPARATOR_RE = re.compile(
+    r'^\s*(?:-|–|—|to)\s*(?:[^\w\s]+|rs\.?|inr|usd|eur|gbp)?\s*$', re.I
+)
+
+_MULTIPLIERS = {
+    'k': 1_000, 'm': 1_000_000, 'mn': 1_000_000,
+    'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'lacs': 100_000, 'lpa': 100_000,
+    'crore': 10_000_000, 'crores': 10_000_000, 'cr': 10_000_000,
+}
+
+
+def parse_period(text):
+    for period, pattern in _PERIOD_PATTERNS:
+        if pattern.search(text):
+            return period
+    return ''
+
+
+def parse_salary(text):
+    """``(salary_min, salary_max, period)`` parsed from ``text``.
+
+    A single amount gives a range with equal ends; a missing period defaults
+    to "year" once an amount was found.  Returns ``(None, None, '')`` when no
+    amount can be read.
+    """
+    text = text or ''
+    matches = list(_AMOUNT_RE.finditer(text))
+    if not matches:
+        return None, None, ''
+
+    first = matches[0]
+    amounts = [first]
+    # "50 - 70k": a range shares the unit written after its upper bound
+    if len(matches) > 1 and _RANGE_SEPARATOR_RE.match(text[first.end():matches[1].start()]):
+        amounts.append(matches[1])
+    unit = (amounts[-1].group(2) or '').lower()
+    values = []
+    for match in amounts:
+        number = float(match.group(1).replace(',', ''))
+        multiplier = _MULTIPLIERS.get((match.group(2) or unit).lower(), 1)
+        values.append(int(round(number * multiplier)))
+
+    low, high = min(values), max(values)
+    return low, high, parse_period(text) or 'year'
+
+
+def apply_salary(job):
+    """Fill ``job``'s structured salary fields from its salary text"""
+    job.salary_min, job.salary_max, job.salary_period = parse_salary(job.salary)
+    return job
+
+
+def salary_filters(params, sort=''):
+    """ORM lookups for the salary filters in find_jobs query parameters.
+
+    ``min_salary`` keeps jobs whose range reaches that amount, ``max_salary``
+    those starting at or below it.  Amounts only compare within one pay
+    period, so a salary filter, or ``sort`` when it is the salary sort the
+    view applies, pins ``salary_period`` (default "year").
+    """
+    lookups = {}
+    for param, lookup in (('min_salary', 'salary_max__gte'), ('max_salary', 'salary_min__lte')):
+        value = params.get(param, '').replace(',', '').strip()
+        if value:
+            try:
+                lookups[lookup] = int(float(value))
+            except ValueError:
+                continue
+    period = params.get('salary_period', '').strip()
+    if period in PERIODS:
+        lookups['salary_period'] = period
+    elif lookups or sort == 'salary':
+        lookups['salary_period'] = 'year'
+    return lookups
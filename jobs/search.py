@@ -0,0 +1,143 @@
+"""Full-text job search backed by an SQLite FTS5 index.
+
+The ``jobs_job_fts`` table mirrors each job's title, description and
+requirements together with its employer's company name.  It is kept in sync
+by database triggers, so every write path - views, admin, bulk updates - is
+covered without application code.  SQLite drops a table's triggers whenever a
+migration rebuilds it, and refuses to rebuild ``jobs_job`` while the employer
+trigger refers to it, so they are dropped before and reinstalled after every
+``migrate``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+FTS_TABLE = 'jobs_job_fts'
+
+# Column weights for bm25(): title, description, requirements, company_name
+RANK_WEIGHTS = (10.0, 1.0, 2.0, 5.0)
+
+_TOKEN_RE = re.compile(r'\w+')
+
+_INDEX_ROW_SQL = (
+    f'INSERT INTO {FTS_TABLE} (rowid, title, description, requirements, company_name) '
+    'SELECT NEW.id, NEW.title, NEW.description, NEW.requirements, e.company_name '
+    'FROM users_employer e WHERE e.id = NEW.employer_id;'
+)
+
+TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_job_fts_insert AFTER INSERT ON jobs_job BEGIN
+        {_INDEX_ROW_SQL}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_job_fts_update
+    AFTER UPDATE OF title, description, requirements, employer_id ON jobs_job BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+        {_INDEX_ROW_SQL}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_job_fts_delete AFTER DELETE ON jobs_job BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS jobs_job_fts_company
+    AFTER UPDATE OF company_name ON users_employer BEGIN
+        UPDATE {FTS_TABLE} SET company_name = NEW.company_name
+        WHERE rowid IN (SELECT id FROM jobs_job WHERE employer_id = NEW.id);
+    END
+    """,
+]
+
+
+def fts_enabled():
+    """The FTS5 index only exists on SQLite databases."""
+    return connection.vendor == 'sqlite'
+
+
+def search_terms(search_query):
+    """Lower-cased words of a search query"""
+    return _TOKEN_RE.findall(search_query.lower())
+
+
+def build_match_query(search_query):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so user input can never be
+    parsed as FTS5 syntax and "develop" still matches "developer".
+    """
+    return ' '.join(f'"{term}"*' for term in search_terms(search_query))
+
+
+def search_jobs(queryset, search_query):
+    """Restrict a Job queryset to matches for ``search_query``, best first"""
+    match = build_match_query(search_query)
+    if not match:
+        return queryset
+
+    if not fts_enabled():
+        return queryset.filter(
+            Q(title__icontains=search_query) |
+            Q(description__icontains=search_query) |
+            Q(requirements__icontains=search_query) |
+            Q(employer__company_name__icontains=search_query)
+        )
+
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    return queryset.extra(
+        select={'search_rank': f'bm25({FTS_TABLE}, {weights})'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = jobs_job.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+        order_by=['search_rank'],
+    )
+
+
+def ranked_job_ids(queryset, search_query, limit):
+    """IDs of the best ``limit`` matches for ``search_query``"""
+    return list(search_jobs(queryset, search_query).values_list('id', flat=True)[:limit])
+
+
+TRIGGER_NAMES = ('insert', 'update', 'delete', 'company')
+
+
+def drop_triggers(using='default', **kwargs):
+    """pre_migrate handler: let migrations rebuild the job and employer tables."""
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for name in TRIGGER_NAMES:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}')
+
+
+def install_triggers(using='default', **kwargs):
+    """post_migrate handler: make sure the sync triggers exist."""
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != 'sqlite' or FTS_TABLE not in conn.introspection.table_names():
+        return
+    with conn.cursor() as cursor:
+        for statement in TRIGGERS_SQL:
+            cursor.execute(statement)
+
+
+def rebuild_index():
+    """Repopulate the FTS index from the Job and Employer tables."""
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, description, requirements, company_name) '
+            'SELECT j.id, j.title, j.description, j.requirements, e.company_name '
+            'FROM jobs_job j INNER JOIN users_employer e ON e.id = j.employer_id'
+        )
+        return cursor.rowcount
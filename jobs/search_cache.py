@@ -0,0 +1,111 @@
+"""Shared cache of find_jobs result pages.
+
+Entries hold only job IDs and paging cursors, keyed by the normalized search
+query, facet and salary filters, sort order and page position, and live in
+Django's cache backend, so every worker process serves and invalidates the
+same entries.  They expire after JOB_SEARCH_CACHE_TTL seconds.
+
+Every key also carries a version number.  Saving or deleting a job (or
+renaming an employer) increments it once the transaction commits, which
+retires all earlier entries at once; they are left for the backend to
+expire or evict.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .pagination import CursorPage
+from .search import search_terms
+
+VERSION_KEY = 'jobs:search:version'
+
+
+class SearchResultCache:
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(search_query, filters, cursor, page_size, sort=''):
+        terms = tuple(sorted(set(search_terms(search_query))))
+        return (terms, tuple(sorted(filters.items())), sort, cursor or '', page_size)
+
+    def version(self):
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            # Start from the clock, so a version key the backend evicted is
+            # not recreated with a number that older entries still use
+            cache.add(VERSION_KEY, int(time.time() * 1000), None)
+            version = cache.get(VERSION_KEY)
+        return version
+
+    def cache_key(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return f'jobs:search:{self.version()}:{digest}'
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get_page(self, key, queryset):
+        """The cached ``(page, corrected_query)`` for ``key``, or None"""
+        entry = cache.get(self.cache_key(key))
+        if entry is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        jobs = queryset.in_bulk(entry['ids'])
+        page = CursorPage(
+            [jobs[pk] for pk in entry['ids'] if pk in jobs],
+            next_cursor=entry['next_cursor'],
+            previous_cursor=entry['previous_cursor'],
+            total=entry['total'],
+        )
+        return page, entry['corrected_query']
+
+    def store_page(self, key, page, corrected_query=''):
+        cache.set(self.cache_key(key), {
+            'ids': [job.pk for job in page.object_list],
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+            'total': page.total,
+            'corrected_query': corrected_query,
+        }, self.ttl)
+
+    def invalidate(self):
+        """Retire every entry once the current transaction commits"""
+        transaction.on_commit(self.clear)
+
+    def clear(self):
+        """Retire every entry now"""
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            # No version yet: the next lookup starts one
+            pass
+        self._count('invalidations')
+
+    def stats(self):
+        """This process's hit and miss counts, with the shared version"""
+        version = self.version()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'version': version,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'invalidations': self.invalidations,
+            }
+
+
+result_cache = SearchResultCache(ttl=getattr(settings, 'JOB_SEARCH_CACHE_TTL', 60))
@@ -0,0 +1,93 @@
+import threading
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from users.models import Employer, JobSeeker
+
+from . import counters, facets, fuzzy, recommendations
+from .matching import JOB_MATCH_FIELDS, SEEKER_MATCH_FIELDS
+from .models import Application, Job
+from .search_cache import result_cache
+
+# Jobs this thread is deleting: their applications leave the counters with them
+_deleting = threading.local()
+
+
+def _deleting_job_ids():
+    if not hasattr(_deleting, 'job_ids'):
+        _deleting.job_ids = set()
+    return _deleting.job_ids
+
+
+def _changed(old_values, instance, fields):
+    """Whether any of ``fields`` differs from the stored values"""
+    return old_values is None or any(old_values.get(field) != getattr(instance, field) for field in fields)
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_values = None if created else instance.stored_values
+    new_values = instance.current_values()
+    if _changed(old_values, instance, ['title']):
+        fuzzy.index_terms(instance.title)
+    result_cache.invalidate()
+    recommendations.job_changed(instance)
+    if not created and _changed(old_values, instance, JOB_MATCH_FIELDS):
+        # Applicant match scores were computed against the old text
+        Application.objects.filter(job=instance).update(match_score=None)
+    if not created and old_values is None:
+        # Saved without being loaded first: counts cannot be adjusted safely
+        return
+    facets.apply_job_change(old_values, new_values)
+    counters.job_changed(old_values, new_values)
+
+
+@receiver(pre_delete, sender=Job)
+def job_deleting(sender, instance, origin=None, **kwargs):
+    # Sent before the cascade deletes the job's applications
+    _deleting_job_ids().add(instance.pk)
+    if origin is instance:
+        # job.delete() on an instance loaded earlier: job_deleted must
+        # subtract the current counts, not the ones it was loaded with
+        instance.refresh_from_db(fields=counters.COUNTER_FIELDS)
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    _deleting_job_ids().discard(instance.pk)
+    old_values = instance.stored_values or instance.current_values()
+    result_cache.invalidate()
+    facets.apply_job_change(old_values, None)
+    counters.job_deleted(instance)
+
+
+@receiver(post_delete, sender=Application)
+def application_deleted(sender, instance, **kwargs):
+    # Deleted one by one, or with a job seeker; job_deleted counts the rest
+    if instance.job_id in _deleting_job_ids():
+        return
+    employer_id = Job.objects.filter(pk=instance.job_id).values_list('employer_id', flat=True).first()
+    if employer_id is not None:
+        counters.application_deleted(instance, employer_id)
+
+
+@receiver(post_save, sender=Employer)
+def employer_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_values = None if created else instance.stored_values
+    if _changed(old_values, instance, ['company_name']):
+        fuzzy.index_terms(instance.company_name)
+        if not created:
+            result_cache.invalidate()
+
+
+@receiver(post_save, sender=JobSeeker)
+def job_seeker_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    if _changed(instance.stored_values, instance, SEEKER_MATCH_FIELDS):
+        Application.objects.filter(job_seeker=instance).update(match_score=None)
@@ -0,0 +1,32 @@
+"""Application status breakdowns for list pages and dashboards.
+
+Pages showing applications grouped by status fetch the rows once and
+partition them in memory, and take every per-status count from a single
+conditional aggregate, instead of evaluating one filtered queryset per status.
+"""
+from django.db.models import Count, Q
+
+from .models import Application
+
+STATUSES = [status for status, _ in Application.STATUS_CHOICES]
+
+
+def status_counts(queryset):
+    """``{status: count}`` for every status, from one aggregate query"""
+    return queryset.order_by().aggregate(**{
+        status: Count('id', filter=Q(status=status)) for status in STATUSES
+    })
+
+
+def group_by_status(applications):
+    """Partition already fetched applications into ``{status: [application]}``"""
+    groups = {status: [] for status in STATUSES}
+    for application in applications:
+        groups.setdefault(application.status, []).append(application)
+    return groups
+
+
+def status_filter(request):
+    """The status selected with ?status=, or '' for all applications"""
+    status = request.GET.get('status', '')
+    return status if status in STATUSES else ''
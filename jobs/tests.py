@@ -1,3 +1,771 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import Employer, EmployerStats, JobSeeker
+from . import counters, facets, fuzzy, matching, recommendations
+from .export import HEADER, cell, csv_lines
+from .models import Application, Job, JobFacetCount
+from .pagination import encode_cursor
+from .salary import apply_salary, parse_salary, salary_filters
+from .search_cache import result_cache
+
+
+class MyJobsQueryCountTests(TestCase):
+    """my_jobs must not issue queries per job"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='employer', password='secret')
+        cls.employer = Employer.objects.create(
+            user=cls.user, company_name='Acme', contact_person='Ann',
+            phone='555', company_address='1 Main St',
+        )
+        cls.seekers = [
+            JobSeeker.objects.create(
+                user=User.objects.create_user(username=f'seeker{i}', password='secret'),
+                full_name=f'Seeker {i}', phone='555',
+            )
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def add_jobs(self, count):
+        for i in range(count):
+            job = Job.objects.create(
+                employer=self.employer, title=f'Job {i}', department='Engineering',
+                location='Remote', job_type='full_time', experience_level='mid',
+                description='Description', requirements='Requirements',
+                is_active=i % 2 == 0,
+            )
+            for seeker, status in zip(self.seekers, ['applied', 'applied', 'viewed'][:i % 4]):
+                application = Application.objects.create(job=job, job_seeker=seeker, status=status)
+                counters.application_created(application, self.employer.id)
+
+    def get_my_jobs(self):
+        return self.client.get(reverse('my_jobs'))
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_my_jobs()
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_is_constant(self):
+        self.add_jobs(2)
+        few_jobs = self.count_queries()
+        self.add_jobs(20)
+        self.assertEqual(self.count_queries(), few_jobs)
+
+    def test_totals_match_per_job_counts(self):
+        self.add_jobs(8)
+        response = self.get_my_jobs()
+        jobs = response.context['jobs']
+        self.assertEqual(response.context['total_jobs'], 8)
+        self.assertEqual(response.context['active_jobs'], 4)
+        for job in jobs:
+            self.assertEqual(job.application_count, job.application_set.count())
+            self.assertEqual(job.applied_count, job.application_set.filter(status='applied').count())
+        self.assertEqual(
+            response.context['total_applications'],
+            Application.objects.filter(job__employer=self.employer).count(),
+        )
+        self.assertEqual(
+            response.context['pending_applications'],
+            Application.objects.filter(job__employer=self.employer, status='applied').count(),
+        )
+
+    def test_saving_a_loaded_job_keeps_the_counters(self):
+        self.add_jobs(1)
+        job = Job.objects.get()
+        self.client.force_login(self.seekers[0].user)
+        self.client.post(reverse('apply_job', args=[job.id]), {'cover_letter': 'Hello'})
+        job.title = 'Renamed'
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual(job.title, 'Renamed')
+        self.assertEqual(job.application_count, 1)
+        self.assertEqual(job.applied_count, 1)
+        stats = self.employer.get_stats()
+        with self.assertRaises(ValueError):
+            stats.save()
+        stats.refresh_from_db()
+        self.assertEqual(stats.application_count, 1)
+
+    def test_scoring_query_count_is_constant(self):
+        def score_all():
+            Application.objects.update(match_score=None)
+            with CaptureQueriesContext(connection) as queries:
+                matching.score_employer_applications(self.employer)
+            return len(queries)
+
+        for seeker, skills in zip(self.seekers, ['Requirements', 'Description, Go', 'Go']):
+            JobSeeker.objects.filter(pk=seeker.pk).update(skills=skills)
+        self.add_jobs(3)
+        few_jobs = score_all()
+        self.add_jobs(20)
+        self.assertEqual(score_all(), few_jobs)
+        scores = dict(Application.objects.values_list('id', 'match_score'))
+        self.assertNotIn(None, scores.values())
+        self.assertGreater(len(set(scores.values())), 1)
+        Application.objects.update(match_score=None)
+        for job in Job.objects.all():
+            matching.score_applications(job)
+        self.assertEqual(dict(Application.objects.values_list('id', 'match_score')), scores)
+
+    def test_deletes_update_the_counters(self):
+        self.add_jobs(4)
+        loaded_early = Job.objects.create(
+            employer=self.employer, title='Job 4', department='Engineering', location='Remote',
+            job_type='full_time', experience_level='mid', description='Description',
+            requirements='Requirements',
+        )
+        application = Application.objects.create(job=loaded_early, job_seeker=self.seekers[2])
+        counters.application_created(application, self.employer.id)
+        loaded_early.delete()
+        self.seekers[0].delete()
+        Application.objects.get(job__title='Job 3', job_seeker=self.seekers[1]).delete()
+        Job.objects.filter(title='Job 2').delete()
+        for job in Job.objects.all():
+            self.assertEqual(job.application_count, job.application_set.count())
+            self.assertEqual(job.applied_count, job.application_set.filter(status='applied').count())
+        stats = self.employer.get_stats()
+        stats.refresh_from_db()
+        self.assertEqual(stats.application_count, Application.objects.count())
+        self.assertEqual(stats.viewed_count, Application.objects.filter(status='viewed').count())
+        self.assertEqual(stats.job_count, 3)
+        self.assertEqual(stats.application_count, 1)
+        self.assertEqual(counters.reconcile(), (0, 0))
+        self.user.delete()
+        self.assertFalse(EmployerStats.objects.exists())
+
+
+class ApplicationStatusTests(TestCase):
+    """Application lists and their per-status counts"""
+
+    STATUSES = ['applied', 'applied', 'viewed', 'shortlisted', 'rejected', 'hired']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='employer', password='secret')
+        cls.employer = Employer.objects.create(
+            user=cls.user, company_name='Acme', contact_person='Ann',
+            phone='555', company_address='1 Main St',
+        )
+        cls.seekers = [
+            JobSeeker.objects.create(
+                user=User.objects.create_user(username=f'seeker{i}', password='secret'),
+                full_name=f'Seeker {i}', phone='555',
+            )
+            for i in range(len(cls.STATUSES))
+        ]
+        cls.jobs = [
+            Job.objects.create(
+                employer=cls.employer, title=f'Job {i}', department='Engineering',
+                location='Remote', job_type='full_time', experience_level='mid',
+                description='Description', requirements='Requirements',
+            )
+            for i in range(2)
+        ]
+        for job in cls.jobs:
+            for seeker, status in zip(cls.seekers, cls.STATUSES):
+                application = Application.objects.create(job=job, job_seeker=seeker, status=status)
+                counters.application_created(application, cls.employer.id)
+
+    def expected_counts(self, applications):
+        return {status: applications.filter(status=status).count() for status, _ in Application.STATUS_CHOICES}
+
+    def test_employer_applications_are_bucketed(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('employer_applications'))
+        self.assertEqual(response.context['status_counts'], self.expected_counts(Application.objects.all()))
+        self.assertEqual(response.context['total_applications'], 12)
+        for status, applications in response.context['applications_by_status'].items():
+            self.assertTrue(all(application.status == status for application in applications))
+        self.assertEqual(len(response.context['applications_by_status']['applied']), 4)
+
+        response = self.client.get(reverse('employer_job_applications', args=[self.jobs[0].id]), {'status': 'hired'})
+        self.assertEqual(response.context['status_counts']['applied'], 2)
+        self.assertEqual(response.context['selected_status'], 'hired')
+        self.assertEqual([application.status for application in response.context['applications']], ['hired'])
+        response = self.client.get(reverse('employer_applications'), {'status': 'bogus'})
+        self.assertEqual(response.context['selected_status'], '')
+        self.assertEqual(len(response.context['applications']), 12)
+
+    def test_applied_jobs_are_bucketed(self):
+        seeker = self.seekers[3]
+        self.client.force_login(seeker.user)
+        response = self.client.get(reverse('applied_jobs'))
+        self.assertEqual(
+            response.context['status_counts'],
+            self.expected_counts(Application.objects.filter(job_seeker=seeker)),
+        )
+        self.assertEqual(len(response.context['applications_by_status']['shortlisted']), 2)
+        self.assertEqual(response.context['total_applications'], 2)
+
+    def test_list_query_counts_are_constant(self):
+        def count_queries(user, url):
+            self.client.force_login(user)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(url).status_code, 200)
+            return len(queries)
+
+        url = reverse('employer_applications')
+        before = count_queries(self.user, url), count_queries(self.seekers[0].user, reverse('applied_jobs'))
+        for i in range(3):
+            job = Job.objects.create(
+                employer=self.employer, title=f'More {i}', department='Engineering',
+                location='Remote', job_type='full_time', experience_level='mid',
+                description='Description', requirements='Requirements',
+            )
+            for seeker, status in zip(self.seekers, self.STATUSES):
+                Application.objects.create(job=job, job_seeker=seeker, status=status)
+        after = count_queries(self.user, url), count_queries(self.seekers[0].user, reverse('applied_jobs'))
+        self.assertEqual(after, before)
+
+
+    def bulk_update(self, user=None, **data):
+        self.client.force_login(user or self.user)
+        return self.client.post(
+            reverse('bulk_update_application_status'), data, HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+
+    def test_bulk_update_by_job_and_status(self):
+        job = self.jobs[0]
+        response = self.bulk_update(status='rejected', job_id=job.id, from_status='applied')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['updated'], data['previous_statuses']), (2, {'applied': 2}))
+        self.assertEqual(data['status_counts'], self.expected_counts(job.application_set.all()))
+        self.assertEqual(data['status_counts']['rejected'], 3)
+        self.assertEqual(self.jobs[1].application_set.filter(status='applied').count(), 2)
+        self.assertEqual(counters.reconcile(), (0, 0))
+
+    def test_bulk_update_by_ids_is_limited_to_own_jobs(self):
+        other = Employer.objects.create(
+            user=User.objects.create_user(username='other', password='secret'),
+            company_name='Other', contact_person='Bob', phone='555', company_address='2 Main St',
+        )
+        their_job = Job.objects.create(
+            employer=other, title='Theirs', department='Engineering', location='Remote',
+            job_type='full_time', experience_level='mid', description='Description',
+            requirements='Requirements',
+        )
+        theirs = Application.objects.create(job=their_job, job_seeker=self.seekers[0])
+        counters.application_created(theirs, other.id)
+        ours = list(self.jobs[1].application_set.exclude(status='hired').values_list('id', flat=True))
+        ids = ','.join(str(pk) for pk in ours + [theirs.id])
+        data = self.bulk_update(status='hired', application_ids=ids).json()
+        self.assertEqual(data['updated'], 5)
+        self.assertEqual(data['status_counts'], self.expected_counts(Application.objects.filter(job__employer=self.employer)))
+        theirs.refresh_from_db()
+        self.assertEqual(theirs.status, 'applied')
+        self.assertEqual(counters.reconcile(), (0, 0))
+
+        # Already in the target status: nothing moves
+        self.assertEqual(self.bulk_update(status='hired', application_ids=ids).json()['updated'], 0)
+
+    def test_bulk_update_query_count_is_constant(self):
+        statuses = dict(Application.objects.values_list('id', 'status'))
+
+        def count_queries(ids):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(
+                    reverse('bulk_update_application_status'),
+                    {'status': 'viewed', 'application_ids': ','.join(map(str, ids))},
+                )
+            for pk in ids:
+                Application.objects.filter(pk=pk).update(status=statuses[pk])
+            counters.reconcile()
+            return len(queries)
+
+        self.client.force_login(self.user)
+        # The counters take one UPDATE per job, so compare within one job
+        applications = sorted(self.jobs[0].application_set.values_list('id', flat=True))
+        self.assertEqual(count_queries(applications[:1]), count_queries(applications))
+
+    def test_bulk_update_rejects_bad_requests(self):
+        self.assertEqual(self.bulk_update(status='bogus', job_id=self.jobs[0].id).status_code, 400)
+        self.assertEqual(self.bulk_update(status='hired').status_code, 400)
+        self.assertEqual(self.bulk_update(status='hired', application_ids='1,x').status_code, 400)
+        self.assertEqual(self.bulk_update(self.seekers[0].user, status='hired', job_id=self.jobs[0].id).status_code, 403)
+        self.assertEqual(self.expected_counts(Application.objects.all())['hired'], 2)
+
+
+class ExportApplicationsTests(TestCase):
+    """The applications export is streamed in batches and safe to open in a spreadsheet"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='employer', password='secret')
+        cls.employer = Employer.objects.create(
+            user=cls.user, company_name='Acme', contact_person='Ann',
+            phone='555', company_address='1 Main St',
+        )
+        cls.jobs = [
+            Job.objects.create(
+                employer=cls.employer, title=title, department='Engineering',
+                location='Remote', job_type='full_time', experience_level='mid',
+                description='Description', requirements='Requirements',
+            )
+            for title in ('Developer', '-Tester')
+        ]
+        cls.seeker = JobSeeker.objects.create(
+            user=User.objects.create_user(username='seeker', password='secret', email='seeker@example.com'),
+            full_name='=HYPERLINK("http://evil")', phone='+1 555', skills='Python, @Go',
+        )
+        for job in cls.jobs:
+            Application.objects.create(job=job, job_seeker=cls.seeker)
+
+    def export(self, **params):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('export_applications'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        return response, list(csv.reader(io.StringIO(content)))
+
+    def test_cell_escapes_formulas(self):
+        for value in ('=1+1', '+1 555', '-Tester', '@Go', '\tx', '\rx'):
+            self.assertEqual(cell(value), f"'{value}")
+        self.assertEqual(cell('Developer'), 'Developer')
+        self.assertEqual(cell(None), '')
+        self.assertEqual(cell(-1), -1)
+
+    def test_export_rows(self):
+        response, rows = self.export()
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="applications.csv"')
+        self.assertEqual(rows[0], HEADER)
+        self.assertEqual(len(rows), 3)
+        row = dict(zip(HEADER, rows[2]))
+        self.assertEqual(row['job_title'], "'-Tester")
+        self.assertEqual(row['applicant'], '\'=HYPERLINK("http://evil")')
+        self.assertEqual((row['email'], row['phone']), ('seeker@example.com', "'+1 555"))
+        self.assertEqual((row['skills'], row['status'], row['match_score']), ('Python; @Go', 'applied', ''))
+
+        response, rows = self.export(job_id=self.jobs[0].id, status='applied')
+        self.assertEqual(response['Content-Disposition'], f'attachment; filename="applications-job-{self.jobs[0].id}-applied.csv"')
+        self.assertEqual([row[2] for row in rows[1:]], ['Developer'])
+
+    def test_skills_text_is_used_until_normalized(self):
+        self.seeker.seeker_skills.all().delete()
+        JobSeeker.objects.filter(pk=self.seeker.pk).update(skills=' =SUM(A1), Go ')
+        _, rows = self.export()
+        self.assertEqual(rows[1][HEADER.index('skills')], "'=SUM(A1); Go")
+
+    def test_other_employers_applications_are_not_exported(self):
+        other = Employer.objects.create(
+            user=User.objects.create_user(username='other', password='secret'),
+            company_name='Other', contact_person='Bob', phone='555', company_address='2 Main St',
+        )
+        job = Job.objects.create(
+            employer=other, title='Theirs', department='Engineering', location='Remote',
+            job_type='full_time', experience_level='mid', description='Description',
+            requirements='Requirements',
+        )
+        Application.objects.create(job=job, job_seeker=self.seeker)
+        _, rows = self.export()
+        self.assertEqual([row[2] for row in rows[1:]], ['Developer', "'-Tester"])
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('export_applications'), {'job_id': job.id}).status_code, 404)
+
+    def test_batches_take_a_constant_number_of_queries(self):
+        def export_queries():
+            with CaptureQueriesContext(connection) as queries:
+                lines = list(csv_lines(Application.objects.all(), batch_size=3))
+            return len(lines), len(queries)
+
+        self.assertEqual(export_queries(), (3, 3))
+        for i in range(4):
+            seeker = JobSeeker.objects.create(
+                user=User.objects.create_user(username=f'more{i}', password='secret'),
+                full_name=f'More {i}', phone='555', skills='Go',
+            )
+            for job in self.jobs:
+                Application.objects.create(job=job, job_seeker=seeker)
+        # Ten applications: four batches of up to three, each with its skills query,
+        # and the empty read that ends the export
+        lines, queries = export_queries()
+        self.assertEqual((lines, queries), (11, 9))
+        ids = [int(line.split(',')[0]) for line in list(csv_lines(Application.objects.all(), batch_size=3))[1:]]
+        self.assertEqual(ids, sorted(Application.objects.values_list('id', flat=True)))
+
+
+class FuzzySearchTests(TestCase):
+    """Typo correction ranks vocabulary terms by trigram similarity"""
+
+    def test_short_close_term_is_not_crowded_out(self):
+        # Each long term shares more trigrams with the query than "developer"
+        # does, but is less similar to it
+        fuzzy.index_terms('developer', *(f'developers{x}{y}z' for x in 'abcdefgh' for y in 'abcdefgh'))
+        self.assertEqual(fuzzy.similar_terms('developers', limit=1), ['developer'])
+
+    def test_unknown_words_are_kept(self):
+        fuzzy.index_terms('engineer')
+        self.assertEqual(fuzzy.correct_query('enginer xyzzy'), 'engineer xyzzy')
+
+
+class FindJobsTests(TestCase):
+    """find_jobs filters, sorts and pages the active jobs"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(
+            user=User.objects.create_user(username='employer', password='secret'),
+            company_name='Acme', contact_person='Ann', phone='555', company_address='1 Main St',
+        )
+
+    def setUp(self):
+        cache.clear()
+        result_cache.clear()
+
+    def add_job(self, title, **fields):
+        fields = {
+            'department': 'Sales', 'location': 'Remote', 'job_type': 'full_time',
+            'experience_level': 'mid', 'description': 'Description',
+            'requirements': 'Requirements', **fields,
+        }
+        job = apply_salary(Job(employer=self.employer, title=title, **fields))
+        job.save()
+        return job
+
+    def find_jobs(self, **params):
+        response = self.client.get(reverse('find_jobs'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def job_ids(self, **params):
+        return {job.id for job in self.find_jobs(**params).context['jobs']}
+
+    def test_salary_sort_ignored_by_search_does_not_filter(self):
+        yearly = self.add_job('Sales lead', salary='50,000 per year')
+        hourly = self.add_job('Sales assistant', salary='20 per hour')
+        self.assertEqual(self.job_ids(search='sales', sort='salary'), {yearly.id, hourly.id})
+        self.assertEqual(self.job_ids(sort='salary'), {yearly.id})
+
+    def walk(self, direction, cursor=None, **params):
+        """Titles of every page reached by following ``direction`` cursors"""
+        pages = []
+        while True:
+            page = self.find_jobs(page_size=2, **params, **({'cursor': cursor} if cursor else {})).context['page']
+            pages.append([job.title for job in page])
+            cursor = getattr(page, f'{direction}_cursor')
+            if cursor is None:
+                return pages, page
+
+    def test_cursors_visit_every_job_once(self):
+        for i in range(5):
+            self.add_job(f'Job {i}', salary=f'{i % 2} per year')
+        # Ties on created_at are broken by id
+        Job.objects.update(created_at=Job.objects.first().created_at)
+        pages, last_page = self.walk('next')
+        self.assertEqual(pages, [['Job 4', 'Job 3'], ['Job 2', 'Job 1'], ['Job 0']])
+        pages, _ = self.walk('previous', last_page.previous_cursor)
+        self.assertEqual(pages, [['Job 2', 'Job 1'], ['Job 4', 'Job 3']])
+        pages, _ = self.walk('next', sort='salary')
+        self.assertEqual(pages, [['Job 3', 'Job 1'], ['Job 4', 'Job 2'], ['Job 0']])
+
+    def test_tampered_cursors_show_the_first_page(self):
+        for i in range(3):
+            self.add_job(f'Job {i}')
+        for cursor in [
+            'not base64!', encode_cursor(['after']), encode_cursor({'after': ['2024-01-01']}),
+            encode_cursor({'after': ['yesterday', 1]}), encode_cursor({'after': [None, None]}),
+            encode_cursor({'before': ['2024-01-01T00:00:00', 'one']}), encode_cursor({'before': None}),
+        ]:
+            page = self.find_jobs(page_size=2, cursor=cursor).context['page']
+            self.assertEqual([job.title for job in page], ['Job 2', 'Job 1'], cursor)
+            self.assertIsNone(page.previous_cursor)
+        page = self.find_jobs(search='job', page_size=2, cursor=encode_cursor({'offset': 'x'})).context['page']
+        self.assertEqual(len(page), 2)
+        self.assertIsNone(page.previous_cursor)
+
+    def facet_counts(self, facet):
+        facet_list = self.find_jobs().context['facets']
+        options = next(entry for entry in facet_list if entry['name'] == facet)['options']
+        return {option['label']: option['count'] for option in options}
+
+    def test_location_facet_counts_places(self):
+        cochin = self.add_job('Sales lead', location='Cochin')
+        ernakulam = self.add_job('Sales assistant', location='Ernakulam, Kerala')
+        self.add_job('Sales manager', location='Remote')
+        self.add_job('Sales intern', location='Atlantis')
+        self.assertEqual(self.facet_counts('location_code'), {'Kochi': 2, 'Remote': 1})
+        self.assertEqual(self.job_ids(location_code='in-kl-kochi'), {cochin.id, ernakulam.id})
+
+    def test_facet_counts_follow_writes(self):
+        lead = self.add_job('Sales lead', location='Cochin')
+        assistant = self.add_job('Sales assistant', location='Cochin', job_type='part_time')
+        lead.location = 'Remote'
+        lead.save()
+        assistant.is_active = False
+        assistant.save()
+        self.assertEqual(self.facet_counts('location_code'), {'Remote': 1})
+        self.assertEqual(self.facet_counts('job_type'), {'Full Time': 1})
+        assistant.is_active = True
+        assistant.save()
+        lead.delete()
+        self.assertEqual(self.facet_counts('location_code'), {'Kochi': 1})
+        self.assertEqual(self.facet_counts('job_type'), {'Part Time': 1})
+        incremental = list(JobFacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'))
+        facets.rebuild_facet_counts()
+        self.assertCountEqual(JobFacetCount.objects.values_list('facet', 'value', 'count'), incremental)
+
+    @override_settings(JOB_SEARCH_MAX_RESULTS=2)
+    def test_capped_search_count_is_a_lower_bound(self):
+        for title in ('Sales lead', 'Sales assistant', 'Sales manager'):
+            self.add_job(title)
+        self.assertContains(self.find_jobs(search='sales'), 'Found 2+ jobs')
+        self.assertContains(self.find_jobs(search='lead'), 'Found 1 job<')
+
+    def test_jobs_near_a_place(self):
+        kochi = self.add_job('Sales lead', location='Infopark, Kakkanad')
+        trivandrum = self.add_job('Sales assistant', location='Technopark, Trivandrum')
+        self.add_job('Sales manager', location='Brooklyn, NY')
+        self.assertEqual(kochi.location_code, 'in-kl-kochi')
+        self.assertEqual(self.job_ids(near='Cochin', radius='0'), {kochi.id})
+        self.assertEqual(self.job_ids(near='Cochin', radius='250'), {kochi.id, trivandrum.id})
+        self.assertEqual(self.job_ids(near='Kerala'), {kochi.id, trivandrum.id})
+        response = self.find_jobs(near='Atlantis')
+        self.assertEqual(len(response.context['jobs']), 3)
+        self.assertIsNone(response.context['near_location'])
+
+    def test_salary_range_filters(self):
+        mid = self.add_job('Sales lead', salary='$50,000 - $70,000 per year')
+        high = self.add_job('Sales head', salary='90k - 120k')
+        self.add_job('Sales assistant', salary='25/hr')
+        self.add_job('Sales intern', salary='Competitive')
+        self.assertEqual(self.job_ids(min_salary='60000'), {mid.id, high.id})
+        self.assertEqual(self.job_ids(min_salary='60000', max_salary='80,000'), {mid.id})
+        self.assertEqual(
+            [job.id for job in self.find_jobs(sort='salary').context['jobs']], [high.id, mid.id],
+        )
+
+    def test_job_cards_are_cached_until_the_job_or_employer_changes(self):
+        job = self.add_job('Sales lead')
+        self.assertContains(self.find_jobs(), 'Sales lead')
+        # Not a save: updated_at stays, so the cached card is still shown
+        Job.objects.filter(pk=job.pk).update(title='Sales head')
+        self.assertContains(self.find_jobs(), 'Sales lead')
+        job.refresh_from_db()
+        job.title = 'Sales director'
+        job.save()
+        self.assertContains(self.find_jobs(), 'Sales director')
+        self.employer.company_name = 'Globex'
+        self.employer.save()
+        self.assertContains(self.find_jobs(), 'Globex')
+
+    def test_job_writes_retire_cached_pages(self):
+        lead = self.add_job('Sales lead')
+        self.assertEqual(self.job_ids(search='sales'), {lead.id})
+        hits = result_cache.hits
+        self.assertEqual(self.job_ids(search='sales'), {lead.id})
+        self.assertEqual(result_cache.hits, hits + 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            assistant = self.add_job('Sales assistant')
+        self.assertEqual(self.job_ids(search='sales'), {lead.id, assistant.id})
+        with self.captureOnCommitCallbacks(execute=True):
+            lead.delete()
+        self.assertEqual(self.job_ids(search='sales'), {assistant.id})
+
+
+class ImportJobsTests(TestCase):
+    """Job feeds are validated row by row and upserted by external_id"""
+
+    HEADER = ['external_id', 'title', 'department', 'location', 'job_type',
+              'experience_level', 'salary', 'description', 'requirements']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='employer', password='secret')
+        cls.employer = Employer.objects.create(
+            user=cls.user, company_name='Acme', contact_person='Ann',
+            phone='555', company_address='1 Main St',
+        )
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.directory = directory
+
+    def row(self, external_id, title, **fields):
+        return {
+            'external_id': external_id, 'title': title, 'department': 'Sales',
+            'location': 'Remote', 'job_type': 'full_time', 'experience_level': 'mid',
+            'salary': '', 'description': 'Description', 'requirements': 'Requirements', **fields,
+        }
+
+    def import_csv(self, rows, batch_size=500):
+        path = os.path.join(self.directory, 'feed.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as feed:
+            writer = csv.DictWriter(feed, self.HEADER)
+            writer.writeheader()
+            writer.writerows(rows)
+        errors = os.path.join(self.directory, 'errors.csv')
+        call_command(
+            'import_jobs', path, employer='employer', batch_size=batch_size, errors=errors,
+            stdout=io.StringIO(), stderr=io.StringIO(),
+        )
+        with open(errors, newline='', encoding='utf-8') as report:
+            return list(csv.reader(report))[1:]
+
+    def upload_jsonl(self, rows):
+        self.client.force_login(self.user)
+        feed = '\n'.join(json.dumps(row) for row in rows).encode()
+        response = self.client.post(
+            reverse('import_jobs'), {'feed': SimpleUploadedFile('feed.jsonl', feed)},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assert_counts_consistent(self):
+        stats = self.employer.get_stats()
+        stats.refresh_from_db()
+        self.assertEqual(stats.job_count, Job.objects.count())
+        self.assertEqual(stats.active_job_count, Job.objects.filter(is_active=True).count())
+        self.assertEqual(counters.reconcile(), (0, 0))
+        incremental = list(JobFacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'))
+        facets.rebuild_facet_counts()
+        self.assertCountEqual(JobFacetCount.objects.values_list('facet', 'value', 'count'), incremental)
+
+    def test_reimport_updates_instead_of_duplicating(self):
+        errors = self.import_csv([
+            self.row('a-1', 'Sales lead', salary='$50,000 - $70,000 per year'),
+            self.row('a-2', 'Sales assistant', job_type='bogus'),
+            self.row('a-3', 'Sales manager', location='Cochin'),
+        ], batch_size=2)
+        self.assertEqual([error[:3] for error in errors], [['3', 'a-2', 'job_type']])
+        self.assertEqual(set(Job.objects.values_list('external_id', flat=True)), {'a-1', 'a-3'})
+        lead = Job.objects.get(external_id='a-1')
+        self.assertEqual((lead.salary_min, lead.salary_max, lead.salary_period), (50000, 70000, 'year'))
+        self.assertEqual(Job.objects.get(external_id='a-3').location_code, 'in-kl-kochi')
+        self.assert_counts_consistent()
+
+        result = self.upload_jsonl([
+            self.row('a-1', 'Sales lead', location='Ernakulam', salary='25/hr'),
+            self.row('a-2', 'Sales assistant', job_type='part_time', is_active='no'),
+            self.row('a-1', 'Senior sales lead'),
+            {'title': 'No external id'},
+        ])
+        self.assertEqual((result['created'], result['updated'], result['failed']), (1, 2, 1))
+        self.assertEqual(result['errors'][0]['row'], 4)
+        self.assertEqual(Job.objects.count(), 3)
+        self.assertEqual(Job.objects.get(external_id='a-1').pk, lead.pk)
+        lead.refresh_from_db()
+        self.assertEqual((lead.title, lead.location_code, lead.salary_period), ('Senior sales lead', 'remote', ''))
+        self.assertFalse(Job.objects.get(external_id='a-2').is_active)
+        self.assert_counts_consistent()
+
+    def test_external_ids_are_per_employer(self):
+        other = Employer.objects.create(
+            user=User.objects.create_user(username='other', password='secret'),
+            company_name='Other', contact_person='Bob', phone='555', company_address='2 Main St',
+        )
+        Job.objects.create(
+            employer=other, external_id='a-1', title='Theirs', department='Sales', location='Remote',
+            job_type='full_time', experience_level='mid', description='Description',
+            requirements='Requirements',
+        )
+        self.import_csv([self.row('a-1', 'Ours')])
+        self.assertEqual(
+            sorted(Job.objects.values_list('employer__company_name', 'title')),
+            [('Acme', 'Ours'), ('Other', 'Theirs')],
+        )
+
+
+class SalaryTests(TestCase):
+    """Free-text salaries become ranges that find_jobs filters on"""
+
+    def test_parse_salary(self):
+        for text, expected in [
+            ('$50,000 - $70,000 per year', (50000, 70000, 'year')),
+            ('25/hr', (25, 25, 'hour')),
+            ('8-12 LPA', (800000, 1200000, 'year')),
+            ('Rs. 15,000 to 20,000 per month', (15000, 20000, 'month')),
+            ('50 - 70k', (50000, 70000, 'year')),
+            ('1.5 crore CTC', (15000000, 15000000, 'year')),
+            ('500 daily', (500, 500, 'day')),
+            ('Competitive', (None, None, '')),
+            ('', (None, None, '')),
+        ]:
+            self.assertEqual(parse_salary(text), expected, text)
+
+    def test_salary_filters(self):
+        self.assertEqual(salary_filters({}), {})
+        self.assertEqual(
+            salary_filters({'min_salary': '40,000', 'max_salary': 'lots'}),
+            {'salary_max__gte': 40000, 'salary_period': 'year'},
+        )
+        self.assertEqual(
+            salary_filters({'max_salary': '30', 'salary_period': 'hour'}),
+            {'salary_min__lte': 30, 'salary_period': 'hour'},
+        )
+        self.assertEqual(salary_filters({'salary_period': 'fortnight'}), {})
+        self.assertEqual(salary_filters({'sort': 'salary'}), {})
+        self.assertEqual(salary_filters({'sort': 'salary'}, 'salary'), {'salary_period': 'year'})
+
+
+class RecommendationTests(TestCase):
+    """Seekers are recommended the active jobs closest to their profile"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(
+            user=User.objects.create_user(username='employer', password='secret'),
+            company_name='Acme', contact_person='Ann', phone='555', company_address='1 Main St',
+        )
+        cls.seeker = JobSeeker.objects.create(
+            user=User.objects.create_user(username='seeker', password='secret'),
+            full_name='Seeker', phone='555', skills='Python, Django',
+        )
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        index_path = override_settings(RECOMMENDATIONS_INDEX_PATH=os.path.join(directory, 'index.npz'))
+        index_path.enable()
+        self.addCleanup(index_path.disable)
+        self.addCleanup(recommendations._loaded.update, {'index': None, 'mtime': None})
+
+    def add_job(self, title, requirements):
+        return Job.objects.create(
+            employer=self.employer, title=title, department='Engineering', location='Remote',
+            job_type='full_time', experience_level='mid', description='Description',
+            requirements=requirements,
+        )
+
+    def recommended(self):
+        return [job.title for job, _ in recommendations.recommend_jobs([self.seeker], k=3)[self.seeker.id]]
+
+    def test_recommendations_follow_jobs_and_applications(self):
+        django_job = self.add_job('Django developer', 'Python and Django')
+        self.add_job('Go developer', 'Go and Python')
+        self.add_job('Accountant', 'Tally and GST filing')
+        self.assertEqual(self.recommended(), [])
+        recommendations.build_index()
+        self.assertEqual(self.recommended(), ['Django developer', 'Go developer'])
+        # Posted after the rebuild: folded into the loaded index
+        self.add_job('Python engineer', 'Python')
+        self.assertEqual(self.recommended(), ['Django developer', 'Python engineer', 'Go developer'])
+        Application.objects.create(job=django_job, job_seeker=self.seeker)
+        self.assertNotIn('Django developer', self.recommended())
+        Job.objects.filter(title='Python engineer').get().delete()
+        go_job = Job.objects.get(title='Go developer')
+        go_job.is_active = False
+        go_job.save()
+        self.assertEqual(self.recommended(), [])
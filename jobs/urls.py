@@ -5,6 +5,7 @@ urlpatterns = [
     # Job search and browsing
     path('find-jobs/', views.find_jobs, name='find_jobs'),
     path('job/<int:job_id>/', views.job_detail, name='job_detail'),
+    path('search-cache/stats/', views.search_cache_stats, name='search_cache_stats'),
     
     # Job application functionality
     path('apply-job/<int:job_id>/', views.apply_job, name='apply_job'),
@@ -14,9 +15,12 @@ urlpatterns = [
     path('applications/', views.employer_applications, name='employer_applications'),
     path('applications/job/<int:job_id>/', views.employer_applications, name='employer_job_applications'),
     path('application/<int:application_id>/update/<str:status>/', views.update_application_status, name='update_application_status'),
+    path('applications/update/', views.bulk_update_application_status, name='bulk_update_application_status'),
+    path('applications/export/', views.export_applications, name='export_applications'),
     
     # Job posting and management
     path('post-job/', views.post_job, name='post_job'),
+    path('import-jobs/', views.import_jobs, name='import_jobs'),
     path('my-jobs/', views.my_jobs, name='my_jobs'),
     path('edit-job/<int:job_id>/', views.edit_job, name='edit_job'),
     path('toggle-job/<int:job_id>/', views.toggle_job_status, name='toggle_job_status'),
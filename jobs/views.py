@@ -1,37 +1,131 @@
+import csv
+import io
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Prefetch
 from .models import Job, Application
 from .forms import JobForm
+from .export import csv_lines
+from .importer import FeedError, JobImporter, feed_format, read_feed
+from . import counters
+from .matching import score_applications, score_employer_applications
+from .facets import FACETS, get_facets
+from .pagination import KeysetPaginator, RankedIdPaginator, get_page_size
+from .fuzzy import correct_query
+from .search import ranked_job_ids, search_terms
+from .salary import salary_filters
+from .search_cache import result_cache
+from .stats import group_by_status, status_counts, status_filter
+from main.locations import get_gazetteer
+from users.models import JobSeekerSkill
+from users.resume_extraction import matching_job_seeker_ids
 
 def find_jobs(request):
     # Get all active jobs
-    jobs = Job.objects.filter(is_active=True)
-    
-    # Simple search functionality
+    jobs = Job.objects.filter(is_active=True).select_related('employer')
+    
+    # Facet filters (job type, experience level, location)
+    filters = {}
+    for facet, _ in FACETS:
+        value = request.GET.get(facet, '').strip()
+        if value:
+            filters[facet] = value
+    # Search results stay ranked by relevance; browsing can sort by salary
     search_query = request.GET.get('search', '')
-    if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(employer__company_name__icontains=search_query)
-        )
+    sort = 'salary' if request.GET.get('sort') == 'salary' and not search_query else ''
+    # Salary range filters on the parsed salary columns
+    filters.update(salary_filters(request.GET, sort))
+    
+    # Jobs in or near a place, matched on the canonical location codes
+    near = request.GET.get('near', '').strip()
+    near_location = None
+    if near:
+        gazetteer = get_gazetteer()
+        near_location = gazetteer.get(gazetteer.normalize(near))
+        if near_location is not None:
+            try:
+                radius = max(0, int(request.GET.get('radius', '')))
+            except ValueError:
+                radius = getattr(settings, 'LOCATION_NEAR_RADIUS_KM', 50)
+            filters['location_code__in'] = tuple(gazetteer.nearby(near_location.id, radius))
+    if filters:
+        jobs = jobs.filter(**filters)
+    
+    # Full-text search, ranked by relevance
+    cursor = request.GET.get('cursor')
+    page_size = get_page_size(request)
+    max_results = getattr(settings, 'JOB_SEARCH_MAX_RESULTS', 1000)
+    
+    # Popular queries are served from the result cache
+    cache_key = result_cache.make_key(search_query, filters, cursor, page_size, sort)
+    cached = result_cache.get_page(cache_key, jobs)
+    if cached is not None:
+        page, corrected_query = cached
+    else:
+        corrected_query = ''
+        if search_query:
+            # Rank once, then page through the ranked ids
+            job_ids = ranked_job_ids(jobs, search_query, max_results)
+            if not job_ids:
+                # Nothing matched exactly: retry with typos corrected
+                corrected_query = correct_query(search_query)
+                if corrected_query and corrected_query != ' '.join(search_terms(search_query)):
+                    job_ids = ranked_job_ids(jobs, corrected_query, max_results)
+                else:
+                    corrected_query = ''
+            page = RankedIdPaginator(job_ids, jobs, page_size).page(cursor)
+        elif sort == 'salary':
+            # Highest paid first, paged by (salary_max, id) cursors
+            page = KeysetPaginator(jobs, ('-salary_max', '-id'), page_size).page(cursor)
+        else:
+            # Newest first, paged by (created_at, id) cursors
+            page = KeysetPaginator(jobs, ('-created_at', '-id'), page_size).page(cursor)
+        result_cache.store_page(cache_key, page, corrected_query)
     
-    # Check if user has applied to each job (for job seekers)
+    # Check if user has applied to the jobs on this page (for job seekers)
     user_has_applied = {}
     if request.user.is_authenticated and hasattr(request.user, 'jobseeker'):
         applied_job_ids = Application.objects.filter(
-            job_seeker=request.user.jobseeker
+            job_seeker=request.user.jobseeker,
+            job_id__in=[job.id for job in page]
         ).values_list('job_id', flat=True)
         user_has_applied = {job_id: True for job_id in applied_job_ids}
     
+    # Preserve search parameters in the pagination links
+    query_params = request.GET.copy()
+    query_params.pop('cursor', None)
+    
     return render(request, 'jobs/find_jobs.html', {
-        'jobs': jobs,
+        'jobs': page.object_list,
+        'page': page,
+        'query_string': query_params.urlencode(),
         'search_query': search_query,
+        'corrected_query': corrected_query,
+        # Ranking stops at max_results, so the count is a lower bound
+        'results_capped': bool(search_query) and page.total is not None and page.total >= max_results,
+        'sort': sort,
+        'min_salary': request.GET.get('min_salary', ''),
+        'max_salary': request.GET.get('max_salary', ''),
+        'salary_period': filters.get('salary_period', ''),
+        'salary_periods': Job.SALARY_PERIOD_CHOICES,
+        'near': near,
+        'near_location': near_location,
+        'facets': get_facets(request.GET),
         'user_has_applied': user_has_applied
     })
 
+@staff_member_required
+def search_cache_stats(request):
+    """Hit/miss counters of the search result cache in this worker"""
+    return JsonResponse(result_cache.stats())
+
 def job_detail(request, job_id):
     job = get_object_or_404(Job, id=job_id)
     
@@ -68,13 +162,15 @@ def apply_job(request, job_id):
     if request.method == 'POST':
         cover_letter = request.POST.get('cover_letter', '')
         
-        # Create application
-        Application.objects.create(
-            job=job,
-            job_seeker=job_seeker,
-            cover_letter=cover_letter,
-            status='applied'
-        )
+        # Create application and count it in the same transaction
+        with transaction.atomic():
+            application = Application.objects.create(
+                job=job,
+                job_seeker=job_seeker,
+                cover_letter=cover_letter,
+                status='applied'
+            )
+            counters.application_created(application, job.employer_id)
         
         messages.success(request, 'Application submitted successfully!')
         return redirect('job_detail', job_id=job_id)
@@ -88,22 +184,20 @@ def applied_jobs(request):
         messages.error(request, 'Only job seekers can view applied jobs.')
         return redirect('dashboard')
     
-    applications = Application.objects.filter(
-        job_seeker=request.user.jobseeker
-    ).select_related('job', 'job__employer').order_by('-applied_date')
-    
-    # Group applications by status for better organization
-    applications_by_status = {
-        'applied': applications.filter(status='applied'),
-        'viewed': applications.filter(status='viewed'),
-        'shortlisted': applications.filter(status='shortlisted'),
-        'rejected': applications.filter(status='rejected'),
-        'hired': applications.filter(status='hired'),
-    }
+    job_seeker = request.user.jobseeker
+    counts = job_seeker.get_status_counts()
+    
+    # One fetch, grouped by status in memory for better organization
+    applications = list(
+        Application.objects.filter(job_seeker=job_seeker)
+        .select_related('job', 'job__employer').order_by('-applied_date')
+    )
     
     return render(request, 'jobs/applied_jobs.html', {
         'applications': applications,
-        'applications_by_status': applications_by_status
+        'applications_by_status': group_by_status(applications),
+        'status_counts': counts,
+        'total_applications': sum(counts.values()),
     })
 
 @login_required
@@ -115,31 +209,56 @@ def employer_applications(request, job_id=None):
     
     employer = request.user.employer
     
+    sort = request.GET.get('sort', '')
+    
     if job_id:
         # View applications for a specific job
         job = get_object_or_404(Job, id=job_id, employer=employer)
-        applications = Application.objects.filter(job=job).select_related('job_seeker')
+        if sort == 'match':
+            score_applications(job)
+        applications = Application.objects.filter(job=job).select_related('job_seeker__user')
         template = 'jobs/job_applications.html'
     else:
         # View all applications across all jobs
+        if sort == 'match':
+            score_employer_applications(employer)
         applications = Application.objects.filter(
             job__employer=employer
-        ).select_related('job_seeker', 'job').order_by('-applied_date')
+        ).select_related('job_seeker__user', 'job').order_by('-applied_date')
         template = 'jobs/all_applications.html'
     
-    # Group applications by status
-    applications_by_status = {
-        'applied': applications.filter(status='applied'),
-        'viewed': applications.filter(status='viewed'),
-        'shortlisted': applications.filter(status='shortlisted'),
-        'rejected': applications.filter(status='rejected'),
-        'hired': applications.filter(status='hired'),
-    }
+    # Best skill match first; scores are stored, so this is a plain ORDER BY
+    if sort == 'match':
+        applications = applications.order_by(
+            F('match_score').desc(nulls_last=True), '-applied_date'
+        )
+    
+    # Applicants whose resume text matches ?q=
+    resume_query = request.GET.get('q', '').strip()
+    if search_terms(resume_query):
+        applications = applications.filter(job_seeker_id__in=matching_job_seeker_ids(resume_query))
+    
+    # Counts for every status, then one fetch of the listed applications
+    counts = status_counts(applications)
+    status = status_filter(request)
+    if status:
+        applications = applications.filter(status=status)
+    
+    # Skill chips come from the normalized skills, one query for the page
+    applications = list(applications.prefetch_related(Prefetch(
+        'job_seeker__seeker_skills',
+        queryset=JobSeekerSkill.objects.select_related('skill'),
+    )))
     
     return render(request, template, {
         'applications': applications,
-        'applications_by_status': applications_by_status,
-        'job': job if job_id else None
+        'applications_by_status': group_by_status(applications),
+        'status_counts': counts,
+        'total_applications': sum(counts.values()),
+        'selected_status': status,
+        'job': job if job_id else None,
+        'sort': sort,
+        'resume_query': resume_query,
     })
 
 @login_required
@@ -161,10 +280,9 @@ def update_application_status(request, application_id, status):
         messages.error(request, 'Invalid status.')
         return redirect('employer_applications')
     
-    # Update status
+    # Update status and move the stored counters with it
     old_status = application.status
-    application.status = status
-    application.save()
+    counters.change_status(application, status, request.user.employer.id)
     
     messages.success(
         request, 
@@ -176,6 +294,111 @@ def update_application_status(request, application_id, status):
         return redirect('employer_applications', job_id=request.GET.get('job_id'))
     return redirect('employer_applications')
 
+@login_required
+@require_POST
+def bulk_update_application_status(request):
+    """Move many applications to one status in a single update.
+
+    Applications are picked by ``application_ids`` and/or a filter on
+    ``job_id`` and ``from_status`` (e.g. every applied application of a job),
+    always limited to the employer's own jobs.
+    """
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+    
+    def fail(message, code=400):
+        if is_ajax:
+            return JsonResponse({'success': False, 'message': message}, status=code)
+        messages.error(request, message)
+        return redirect('employer_applications')
+    
+    if not hasattr(request.user, 'employer'):
+        return fail('Only employers can update application status.', code=403)
+    employer = request.user.employer
+    
+    status = request.POST.get('status', '')
+    if status not in dict(Application.STATUS_CHOICES):
+        return fail('Invalid status.')
+    
+    # Ownership check: only applications to this employer's jobs
+    applications = Application.objects.filter(job__employer=employer)
+    selected = False
+    ids = [value for values in request.POST.getlist('application_ids') for value in values.split(',') if value.strip()]
+    job_id = request.POST.get('job_id', '')
+    from_status = request.POST.get('from_status', '')
+    job = None
+    try:
+        if ids:
+            applications = applications.filter(id__in=[int(value) for value in ids])
+            selected = True
+        if job_id:
+            job = Job.objects.filter(id=int(job_id), employer=employer).first()
+            if job is None:
+                return fail('Job not found.', code=404)
+            applications = applications.filter(job=job)
+            selected = True
+    except ValueError:
+        return fail('Invalid application or job ID.')
+    if from_status:
+        if from_status not in dict(Application.STATUS_CHOICES):
+            return fail('Invalid status.')
+        applications = applications.filter(status=from_status)
+        selected = True
+    if not selected:
+        return fail('Select applications by ID, job or current status.')
+    
+    moved = counters.change_statuses(applications, status, employer.id)
+    updated = sum(moved.values())
+    
+    # Per-status counts after the change, from the job's or employer's stored counters
+    if job is not None:
+        job.refresh_from_db(fields=counters.COUNTER_FIELDS)
+    stored = job or employer.get_stats()
+    counts = {name: getattr(stored, counters.status_field(name)) for name in counters.STATUSES}
+    
+    if is_ajax:
+        return JsonResponse({
+            'success': True,
+            'status': status,
+            'updated': updated,
+            'previous_statuses': moved,
+            'status_counts': counts,
+        })
+    messages.success(request, f'Moved {updated} application{"" if updated == 1 else "s"} to {status}.')
+    if job is not None:
+        return redirect('employer_job_applications', job_id=job.id)
+    return redirect('employer_applications')
+
+@login_required
+def export_applications(request):
+    """Download the employer's applications as CSV, optionally for one job or status.
+
+    The file is streamed row by row, so exporting a large account does not
+    load its applications into memory.
+    """
+    if not hasattr(request.user, 'employer'):
+        messages.error(request, 'Only employers can export applications.')
+        return redirect('dashboard')
+    
+    employer = request.user.employer
+    applications = Application.objects.filter(job__employer=employer)
+    filename = 'applications'
+    job_id = request.GET.get('job_id', '')
+    if job_id:
+        if not job_id.isdigit():
+            messages.error(request, 'Invalid job ID.')
+            return redirect('employer_applications')
+        job = get_object_or_404(Job, id=job_id, employer=employer)
+        applications = applications.filter(job=job)
+        filename += f'-job-{job.id}'
+    status = status_filter(request)
+    if status:
+        applications = applications.filter(status=status)
+        filename += f'-{status}'
+    
+    response = StreamingHttpResponse(csv_lines(applications), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
 @login_required
 def post_job(request):
     """View for employers to post new jobs"""
@@ -200,6 +423,40 @@ def post_job(request):
     
     return render(request, 'jobs/post_job.html', {'form': form})
 
+@login_required
+def import_jobs(request):
+    """View for employers to upload a CSV or JSON Lines feed of jobs"""
+    if not hasattr(request.user, 'employer'):
+        messages.error(request, 'Only employers can import jobs.')
+        return redirect('dashboard')
+    
+    result = None
+    if request.method == 'POST' and request.FILES.get('feed'):
+        feed = request.FILES['feed']
+        try:
+            format = feed_format(feed.name, request.POST.get('format'))
+            # Decode the upload as a stream and import it row by row
+            stream = io.TextIOWrapper(feed.file, encoding='utf-8-sig', newline='')
+            result = JobImporter(request.user.employer).run(read_feed(stream, format))
+        except FeedError as exc:
+            messages.error(request, str(exc))
+        except UnicodeDecodeError:
+            messages.error(request, 'The feed is not valid UTF-8.')
+        except csv.Error as exc:
+            messages.error(request, f'Malformed CSV: {exc}')
+        else:
+            if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                return JsonResponse(result.as_dict())
+            messages.success(
+                request,
+                f'Imported {result.created + result.updated} jobs '
+                f'({result.created} new, {result.updated} updated).'
+            )
+    elif request.method == 'POST':
+        messages.error(request, 'Please choose a feed file to upload.')
+    
+    return render(request, 'jobs/import_jobs.html', {'result': result})
+
 @login_required
 def my_jobs(request):
     """View for employers to see their posted jobs"""
@@ -208,22 +465,18 @@ def my_jobs(request):
         messages.error(request, 'Only employers can view their jobs.')
         return redirect('dashboard')
     
-    jobs = Job.objects.filter(employer=request.user.employer).order_by('-created_at')
-    
-    # Calculate statistics
-    total_jobs = jobs.count()
-    active_jobs = jobs.filter(is_active=True).count()
-    
-    total_applications = 0
-    pending_applications = 0
+    # One query: every job with its stored application counters
+    jobs = list(
+        Job.objects.filter(employer=request.user.employer)
+        .select_related('employer')
+        .order_by('-created_at')
+    )
     
-    # Add application counts to each job and calculate totals
-    for job in jobs:
-        job.application_count = Application.objects.filter(job=job).count()
-        job.pending_count = Application.objects.filter(job=job, status='applied').count()
-        
-        total_applications += job.application_count
-        pending_applications += job.pending_count
+    # Page totals come from the same rows
+    total_jobs = len(jobs)
+    active_jobs = sum(job.is_active for job in jobs)
+    total_applications = sum(job.application_count for job in jobs)
+    pending_applications = sum(job.applied_count for job in jobs)
     
     context = {
         'jobs': jobs,
@@ -0,0 +1,230 @@
+"""Load benchmark that replays a weighted route mix through the WSGI app.
+
+Requests are built as WSGI environs and passed straight to the project's
+WSGI application, so the full middleware stack runs without a server or
+network in between. Logged-in routes use sessions of randomly picked job
+seekers and employers. ``manage.py run_benchmark`` prints throughput and
+latency percentiles per route and can save them as JSON for comparison
+with a later run.
+"""
+import io
+import random
+import string
+import subprocess
+import threading
+import time
+from importlib import import_module
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from jobs.models import Job
+from users.models import Employer, JobSeeker
+from .instrumentation import PERCENTILES, percentile
+
+# Route name -> relative weight in the default mix
+DEFAULT_MIX = {
+    'find_jobs': 40,
+    'job_detail': 25,
+    'apply_job': 5,
+    'my_jobs': 10,
+    'employer_dashboard': 10,
+    'job_seeker_dashboard': 10,
+}
+
+SEARCH_WORDS = ['developer', 'engineer', 'data', 'python', 'manager', 'designer', 'sales', 'analyst']
+
+
+def parse_mix(text):
+    """``'find_jobs=50,job_detail=20'`` -> ``{'find_jobs': 50, 'job_detail': 20}``"""
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(','))):
+        name, _, weight = part.partition('=')
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Unknown route {name!r}; choose from {", ".join(DEFAULT_MIX)}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+class Session:
+    """Session and CSRF cookies of one logged-in user"""
+
+    def __init__(self, user):
+        store = import_module(settings.SESSION_ENGINE).SessionStore()
+        store[SESSION_KEY] = str(user.pk)
+        store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        store.create()
+        self.session_key = store.session_key
+        # An unmasked secret is accepted both as the cookie and as the form token
+        self.csrf_token = get_random_string(32, string.ascii_letters + string.digits)
+
+    @property
+    def cookie(self):
+        return (
+            f'{settings.SESSION_COOKIE_NAME}={self.session_key}; '
+            f'{settings.CSRF_COOKIE_NAME}={self.csrf_token}'
+        )
+
+
+class Benchmark:
+    """Runs ``requests`` weighted requests over ``concurrency`` threads"""
+
+    def __init__(self, mix=None, requests=1000, concurrency=1, warmup=50, users=20,
+                 seed=None, host='localhost'):
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.requests = requests
+        self.concurrency = concurrency
+        self.warmup = warmup
+        self.host = host
+        self.random = random.Random(seed)
+        self.application = get_wsgi_application()
+        self._lock = threading.Lock()
+
+        self.job_ids = list(Job.objects.filter(is_active=True).values_list('id', flat=True))
+        seekers = list(JobSeeker.objects.select_related('user').order_by('?')[:users])
+        employers = list(Employer.objects.select_related('user').order_by('?')[:users])
+        self.seeker_sessions = [Session(seeker.user) for seeker in seekers]
+        self.employer_sessions = [Session(employer.user) for employer in employers]
+        if not self.job_ids:
+            raise ValueError('No active jobs to benchmark; run generate_data first.')
+        if not self.seeker_sessions or not self.employer_sessions:
+            raise ValueError('Both job seekers and employers are needed; run generate_data first.')
+
+    def next_request(self, rng):
+        """``(route, method, path, query, body, session)`` of one random request"""
+        route = rng.choices(list(self.mix), list(self.mix.values()))[0]
+        if route == 'find_jobs':
+            params = {}
+            if rng.random() < 0.5:
+                params['search'] = rng.choice(SEARCH_WORDS)
+            return route, 'GET', reverse('find_jobs'), urlencode(params), b'', None
+        if route == 'job_detail':
+            path = reverse('job_detail', args=[rng.choice(self.job_ids)])
+            return route, 'GET', path, '', b'', rng.choice(self.seeker_sessions)
+        if route == 'apply_job':
+            session = rng.choice(self.seeker_sessions)
+            body = urlencode({
+                'cover_letter': 'I would like to apply.',
+                'csrfmiddlewaretoken': session.csrf_token,
+            }).encode()
+            path = reverse('apply_job', args=[rng.choice(self.job_ids)])
+            return route, 'POST', path, '', body, session
+        if route == 'job_seeker_dashboard':
+            return route, 'GET', reverse(route), '', b'', rng.choice(self.seeker_sessions)
+        return route, 'GET', reverse(route), '', b'', rng.choice(self.employer_sessions)
+
+    def environ(self, method, path, query, body, session):
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SCRIPT_NAME': '',
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': self.host,
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.multithread': self.concurrency > 1,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        if method == 'POST':
+            environ['CONTENT_TYPE'] = 'application/x-www-form-urlencoded'
+        if session is not None:
+            environ['HTTP_COOKIE'] = session.cookie
+        return environ
+
+    def call(self, method, path, query, body, session):
+        """Status code and wall time (ms) of one request, body fully consumed"""
+        status = []
+        started = time.perf_counter()
+        response = self.application(
+            self.environ(method, path, query, body, session),
+            lambda status_line, headers, exc_info=None: status.append(status_line),
+        )
+        try:
+            for _ in response:
+                pass
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        return int(status[0].split()[0]), (time.perf_counter() - started) * 1000
+
+    def _worker(self, count, seed, results):
+        rng = random.Random(seed)
+        try:
+            for _ in range(count):
+                route, *request = self.next_request(rng)
+                status, elapsed = self.call(*request)
+                with self._lock:
+                    results.append((route, status, elapsed))
+        finally:
+            connection.close()
+
+    def _run(self, count):
+        results = []
+        threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(count // self.concurrency + (i < count % self.concurrency),
+                      self.random.random(), results),
+            )
+            for i in range(self.concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.perf_counter() - started
+
+    def run(self):
+        """Warm up, then measure; returns the report dict"""
+        if self.warmup:
+            self._run(self.warmup)
+        results, elapsed = self._run(self.requests)
+        return report(results, elapsed, self.concurrency)
+
+
+def report(results, elapsed, concurrency=1):
+    """Throughput, error count and latency percentiles, per route and overall"""
+    by_route = {}
+    for route, status, elapsed_ms in results:
+        by_route.setdefault(route, []).append((status, elapsed_ms))
+    by_route['(all)'] = [(status, elapsed_ms) for _, status, elapsed_ms in results]
+    routes = {}
+    for route, rows in sorted(by_route.items()):
+        latencies = sorted(elapsed_ms for _, elapsed_ms in rows)
+        routes[route] = {
+            'requests': len(rows),
+            'errors': sum(status >= 400 for status, _ in rows),
+            'throughput': round(len(rows) / elapsed, 2) if elapsed else None,
+            **{f'p{pct}': round(percentile(latencies, pct), 2) for pct in PERCENTILES},
+        }
+    return {
+        'revision': git_revision(),
+        'concurrency': concurrency,
+        'elapsed': round(elapsed, 3),
+        'routes': routes,
+    }
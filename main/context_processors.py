@@ -0,0 +1,11 @@
+from django.conf import settings
+
+
+def fragment_cache(request):
+    """Timeout of the cached template fragments.
+
+    Fragment cache keys include the ``updated_at`` of the job and employer
+    they show, so an edit switches to a new key instead of waiting out the
+    timeout; the timeout only bounds how long unused fragments stay around.
+    """
+    return {'fragment_cache_timeout': getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 3600)}
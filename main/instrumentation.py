@@ -0,0 +1,172 @@
+"""Opt-in per-request metrics and query budgets.
+
+With REQUEST_METRICS_ENABLED, ``RequestMetricsMiddleware`` records for every
+request the URL name, wall time, number of database queries, time spent in
+the database and response size.  Records are appended as JSON lines to
+REQUEST_METRICS_PATH, rotated at REQUEST_METRICS_MAX_BYTES.
+``manage.py request_metrics`` and the staff-only ``request_metrics`` view
+aggregate them into percentiles per URL name.
+
+REQUEST_QUERY_BUDGETS maps URL names to the most queries a request may run;
+exceeding a budget logs a warning, or raises QueryBudgetExceeded when
+REQUEST_QUERY_BUDGET_ACTION is 'raise' (useful in tests and development).
+"""
+import glob
+import json
+import logging
+import time
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Records go through their own logger so rotation is handled by logging
+records_logger = logging.getLogger('jobportal.request_metrics')
+
+PERCENTILES = (50, 95, 99)
+
+METRICS = ('wall_ms', 'queries', 'db_ms', 'bytes')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def metrics_path():
+    return str(getattr(
+        settings, 'REQUEST_METRICS_PATH',
+        Path(settings.BASE_DIR) / 'var' / 'request_metrics.jsonl',
+    ))
+
+
+def _configure_records_logger():
+    path = metrics_path()
+    for handler in records_logger.handlers:
+        if getattr(handler, 'baseFilename', None) == str(Path(path).resolve()):
+            return
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=getattr(settings, 'REQUEST_METRICS_MAX_BYTES', 10 * 1024 * 1024),
+        backupCount=getattr(settings, 'REQUEST_METRICS_BACKUP_COUNT', 5),
+        encoding='utf-8',
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    records_logger.addHandler(handler)
+    records_logger.setLevel(logging.INFO)
+    records_logger.propagate = False
+
+
+class QueryRecorder:
+    """Database execute wrapper counting queries and their total time"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - start
+
+
+class RequestMetricsMiddleware:
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.budgets = getattr(settings, 'REQUEST_QUERY_BUDGETS', {})
+        self.budget_action = getattr(settings, 'REQUEST_QUERY_BUDGET_ACTION', 'log')
+        _configure_records_logger()
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        wall_seconds = time.perf_counter() - start
+
+        match = request.resolver_match
+        url_name = match.view_name if match is not None else ''
+        record = {
+            'time': timezone.now().isoformat(),
+            'url_name': url_name,
+            'method': request.method,
+            'status': response.status_code,
+            'wall_ms': round(wall_seconds * 1000, 2),
+            'queries': recorder.queries,
+            'db_ms': round(recorder.seconds * 1000, 2),
+            'bytes': None if response.streaming else len(response.content),
+        }
+        records_logger.info(json.dumps(record, separators=(',', ':')))
+        self.check_budget(url_name, recorder.queries)
+        return response
+
+    def check_budget(self, url_name, queries):
+        budget = self.budgets.get(url_name)
+        if budget is None or queries <= budget:
+            return
+        message = f'{url_name} ran {queries} queries, over its budget of {budget}'
+        if self.budget_action == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+def read_records(path=None):
+    """Records from the metrics file and its rotated backups, oldest first"""
+    path = path or metrics_path()
+    backups = [name for name in glob.glob(f'{glob.escape(path)}.*') if name.rsplit('.', 1)[1].isdigit()]
+    # RotatingFileHandler numbers backups from newest (.1) to oldest
+    files = sorted(backups, key=lambda name: -int(name.rsplit('.', 1)[1]))
+    for name in files + [path]:
+        try:
+            with open(name, encoding='utf-8') as records_file:
+                for line in records_file:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(records, url_name=None):
+    """``{url_name: {'requests': n, metric: {'p50': .., 'p95': .., 'p99': ..}}}``"""
+    values = {}
+    for record in records:
+        name = record.get('url_name') or '(unresolved)'
+        if url_name and name != url_name:
+            continue
+        per_metric = values.setdefault(name, {metric: [] for metric in METRICS})
+        for metric in METRICS:
+            if record.get(metric) is not None:
+                per_metric[metric].append(record[metric])
+    summary = {}
+    for name, per_metric in sorted(values.items()):
+        summary[name] = {'requests': len(per_metric['wall_ms'])}
+        for metric, metric_values in per_metric.items():
+            metric_values.sort()
+            summary[name][metric] = {
+                f'p{pct}': percentile(metric_values, pct) for pct in PERCENTILES
+            }
+    return summary
@@ -0,0 +1,197 @@
+"""Location normalization backed by an offline gazetteer.
+
+``Job.location`` and ``JobSeeker.location`` stay free text ("New York, NY",
+"NYC", "Remote - India").  ``normalize_location`` maps that text to a
+canonical gazetteer ID such as ``us-ny-new-york``, which is stored in the
+indexed ``location_code`` column so listings can filter by a place, a
+region containing it, or everything within a radius, without substring scans.
+
+The gazetteer is a CSV file (LOCATION_GAZETTEER_PATH) of cities, states and
+countries with their parent region, coordinates and aliases.  It is loaded
+once per process.
+"""
+import csv
+import math
+import os
+import re
+import threading
+from collections import namedtuple
+
+from django.conf import settings
+
+EARTH_RADIUS_KM = 6371.0
+
+# Aliases this short ("ca", "ny") only count when they make up a whole
+# comma-separated part, never as a word inside free text
+MIN_INLINE_ALIAS_LENGTH = 3
+
+MAX_ALIAS_WORDS = 4
+
+_PART_SEPARATOR_RE = re.compile(r'[,;/|()]|\s[-–—]\s')
+_WORD_RE = re.compile(r'\w+')
+
+Location = namedtuple('Location', 'id name kind parent latitude longitude')
+
+
+def clean_text(text):
+    """Lower-case words without punctuation: "Washington, D.C." -> "washington dc\""""
+    return ' '.join(_WORD_RE.findall((text or '').replace('.', '').lower()))
+
+
+def distance_km(first, second):
+    """Great-circle distance between two locations with coordinates"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (
+        first.latitude, first.longitude, second.latitude, second.longitude,
+    ))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class Gazetteer:
+    """Canonical locations, their hierarchy and the aliases that name them"""
+
+    def __init__(self, locations, aliases):
+        self.locations = {location.id: location for location in locations}
+        self.aliases = {}
+        self.children = {}
+        for location in locations:
+            if location.parent:
+                self.children.setdefault(location.parent, []).append(location.id)
+        for location_id, names in aliases.items():
+            for name in names:
+                ids = self.aliases.setdefault(clean_text(name), [])
+                if location_id not in ids:
+                    ids.append(location_id)
+
+    @classmethod
+    def load(cls, path):
+        locations, aliases = [], {}
+        with open(path, newline='', encoding='utf-8') as gazetteer_file:
+            for row in csv.DictReader(gazetteer_file):
+                latitude, longitude = row['latitude'], row['longitude']
+                location = Location(
+                    id=row['id'],
+                    name=row['name'],
+                    kind=row['kind'],
+                    parent=row['parent'] or None,
+                    latitude=float(latitude) if latitude else None,
+                    longitude=float(longitude) if longitude else None,
+                )
+                locations.append(location)
+                aliases[location.id] = [location.name] + [
+                    alias for alias in row['aliases'].split('|') if alias
+                ]
+        return cls(locations, aliases)
+
+    def get(self, location_id):
+        return self.locations.get(location_id)
+
+    def ancestors(self, location_id):
+        ancestors = []
+        location = self.locations.get(location_id)
+        while location is not None and location.parent:
+            ancestors.append(location.parent)
+            location = self.locations.get(location.parent)
+        return ancestors
+
+    def descendants(self, location_id):
+        found, pending = [], [location_id]
+        while pending:
+            for child in self.children.get(pending.pop(), ()):
+                found.append(child)
+                pending.append(child)
+        return found
+
+    def normalize(self, text):
+        """Canonical ID for free-text ``text``, or '' when nothing matched.
+
+        Every comma-separated part is matched whole, then by its longest
+        known word sequences.  Among all candidates, one whose parent region
+        was also mentioned wins ("Portland, OR"), then the most specific one.
+        """
+        candidates = []
+        for part in _PART_SEPARATOR_RE.split(text or ''):
+            words = clean_text(part).split()
+            if not words:
+                continue
+            whole = ' '.join(words)
+            if whole in self.aliases:
+                candidates.extend(self.aliases[whole])
+            else:
+                candidates.extend(self._scan(words))
+        if not candidates:
+            return ''
+        mentioned = set(candidates)
+
+        def preference(item):
+            position, location_id = item
+            ancestors = self.ancestors(location_id)
+            confirmed = sum(ancestor in mentioned for ancestor in ancestors)
+            return (confirmed, len(ancestors), -position)
+
+        return max(enumerate(candidates), key=preference)[1]
+
+    def _scan(self, words):
+        """Location IDs named by word sequences inside a part, longest first"""
+        found = []
+        used = [False] * len(words)
+        for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                if any(used[start:start + size]):
+                    continue
+                phrase = ' '.join(words[start:start + size])
+                if len(phrase) < MIN_INLINE_ALIAS_LENGTH or phrase not in self.aliases:
+                    continue
+                found.extend(self.aliases[phrase])
+                used[start:start + size] = [True] * size
+        return found
+
+    def nearby(self, location_id, radius_km=0):
+        """IDs of ``location_id``, the places inside it and, for a city,
+        every other city within ``radius_km``"""
+        location = self.locations.get(location_id)
+        if location is None:
+            return []
+        nearby = {location_id, *self.descendants(location_id)}
+        if radius_km and location.kind == 'city' and location.latitude is not None:
+            for other in self.locations.values():
+                if (other.kind == 'city' and other.latitude is not None
+                        and distance_km(location, other) <= radius_km):
+                    nearby.add(other.id)
+        return sorted(nearby)
+
+
+def gazetteer_path():
+    return str(getattr(
+        settings, 'LOCATION_GAZETTEER_PATH',
+        os.path.join(os.path.dirname(__file__), 'data', 'gazetteer.csv'),
+    ))
+
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+def get_gazetteer():
+    """The gazetteer, loaded on first use in each process"""
+    path = gazetteer_path()
+    with _lock:
+        if path not in _loaded:
+            _loaded[path] = Gazetteer.load(path)
+        return _loaded[path]
+
+
+def normalize_location(text):
+    return get_gazetteer().normalize(text)
+
+
+def apply_location(instance):
+    """Set ``instance.location_code`` from its location text, unless deferred"""
+    if 'location' not in instance.get_deferred_fields():
+        instance.location_code = normalize_location(instance.location)
+    return instance
+
+
+def nearby_locations(location_id, radius_km=0):
+    return get_gazetteer().nearby(location_id, radius_km)
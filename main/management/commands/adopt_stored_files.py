@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from main.storage import adopt_legacy_files
+
+
+class Command(BaseCommand):
+    help = (
+        'Move files uploaded before content-addressed storage (e.g. old resumes) '
+        'to their content names and count their references'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report what would be moved without moving it',
+        )
+
+    def handle(self, *args, **options):
+        moved, updated, missing = adopt_legacy_files(dry_run=options['dry_run'])
+        if missing:
+            self.stdout.write(self.style.WARNING(f'{missing} referenced files are missing on disk.'))
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {moved} files; {updated} records updated.'))
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+from main.locations import apply_location
+from users.models import JobSeeker
+
+
+class Command(BaseCommand):
+    help = 'Normalize the location text of every job and job seeker into location codes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows normalized and updated per query',
+        )
+
+    def handle(self, *args, **options):
+        for model in (Job, JobSeeker):
+            total, matched = self.backfill(model, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Normalized {total} {model._meta.verbose_name_plural} '
+                f'({matched} matched a known location).'
+            ))
+
+    def backfill(self, model, batch_size):
+        rows = model.objects.only('id', 'location').order_by('id')
+        total = matched = 0
+        last_id = 0
+        while True:
+            batch = list(rows.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            for row in batch:
+                apply_location(row)
+                matched += bool(row.location_code)
+            model.objects.bulk_update(batch, ['location_code'])
+            total += len(batch)
+            last_id = batch[-1].id
+        return total, matched
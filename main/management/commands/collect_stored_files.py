@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from main.storage import collect_garbage, recount_references
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete content-addressed files (e.g. resumes) that no record has referenced '
+        'for the grace period, and files left behind by failed uploads'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int,
+            help='Seconds an unreferenced file is kept (default: STORED_FILE_GC_GRACE)',
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Recount references from the file fields first, e.g. after loading fixtures',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report what would be deleted without deleting it',
+        )
+
+    def handle(self, *args, **options):
+        if options['recount'] and options['dry_run']:
+            raise CommandError('--recount writes the corrected counts; run it without --dry-run.')
+        if options['recount']:
+            changed = recount_references()
+            self.stdout.write(f'Corrected {changed} reference counts.')
+        files, size = collect_garbage(grace=options['grace'], dry_run=options['dry_run'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {files} files ({filesizeformat(size)}).'))
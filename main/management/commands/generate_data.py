@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.synthetic import Generator
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic employers, jobs, job seekers and applications '
+        'for load testing (e.g. --employers 10000 --jobs 200000 --seekers 1000000 '
+        '--applications 5000000)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employers', type=int, default=100)
+        parser.add_argument('--jobs', type=int, default=2000)
+        parser.add_argument('--seekers', type=int, default=10000)
+        parser.add_argument('--applications', type=int, default=50000)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows inserted per query',
+        )
+        parser.add_argument('--seed', type=int, help='Random seed, for reproducible datasets')
+        parser.add_argument(
+            '--tag', default='synthetic',
+            help='Prefix of the generated usernames',
+        )
+        parser.add_argument(
+            '--password', default='password',
+            help='Password of every generated user',
+        )
+
+    def handle(self, *args, **options):
+        if options['jobs'] and not options['employers']:
+            raise CommandError('Jobs need at least one employer.')
+        if options['applications'] and not (options['jobs'] and options['seekers']):
+            raise CommandError('Applications need at least one job and one job seeker.')
+
+        generator = Generator(
+            tag=options['tag'], batch_size=options['batch_size'], seed=options['seed'],
+            password=options['password'], log=self.stdout.write,
+        )
+        started = time.perf_counter()
+        employer_ids = generator.employers(options['employers'])
+        job_ids = generator.jobs(options['jobs'], employer_ids)
+        seeker_ids = generator.job_seekers(options['seekers'])
+        applications = generator.applications(options['applications'], job_ids, seeker_ids)
+        self.stdout.write('Rebuilding counters, facets, search vocabulary and recommendations...')
+        generator.rebuild_derived()
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(employer_ids)} employers, {len(job_ids)} jobs, {len(seeker_ids)} job seekers '
+            f'and {applications} applications in {time.perf_counter() - started:.1f}s.'
+        ))
@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from main.instrumentation import METRICS, PERCENTILES, read_records, summarize
+
+
+class Command(BaseCommand):
+    help = 'Show latency, query count and response size percentiles per URL name'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url-name', help='Only show this URL name')
+        parser.add_argument('--path', help='Metrics file (default: REQUEST_METRICS_PATH)')
+        parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+
+    def handle(self, *args, **options):
+        summary = summarize(read_records(options['path']), url_name=options['url_name'])
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        if not summary:
+            self.stdout.write('No request metrics recorded.')
+            return
+        columns = [f'{metric} p{pct}' for metric in METRICS for pct in PERCENTILES]
+        self.stdout.write('\t'.join(['url_name', 'requests'] + columns))
+        for url_name, row in summary.items():
+            cells = [
+                '' if row[metric][f'p{pct}'] is None else str(row[metric][f'p{pct}'])
+                for metric in METRICS for pct in PERCENTILES
+            ]
+            self.stdout.write('\t'.join([url_name, str(row['requests'])] + cells))
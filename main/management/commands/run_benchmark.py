@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.benchmark import DEFAULT_MIX, Benchmark, parse_mix
+
+COLUMNS = ('requests', 'errors', 'throughput', 'p50', 'p95', 'p99')
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a weighted mix of requests through the WSGI app and report throughput '
+        'and p50/p95/p99 latency per route. Writes to the database (apply_job), so '
+        'run it against a generated dataset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Measured requests')
+        parser.add_argument('--warmup', type=int, default=50, help='Unmeasured requests run first')
+        parser.add_argument('--concurrency', type=int, default=1, help='Client threads')
+        parser.add_argument(
+            '--mix', default='',
+            help='Route weights, e.g. "find_jobs=50,job_detail=30" '
+                 f'(default: {",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items())})',
+        )
+        parser.add_argument('--users', type=int, default=20, help='Sessions per role')
+        parser.add_argument('--seed', type=int, help='Random seed for the request sequence')
+        parser.add_argument('--host', default='localhost', help='Host header; must be allowed')
+        parser.add_argument('--output', help='Save the report as JSON to this file')
+        parser.add_argument('--compare', help='A saved report to show latency changes against')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix']) if options['mix'] else None
+            benchmark = Benchmark(
+                mix=mix, requests=options['requests'], concurrency=max(1, options['concurrency']),
+                warmup=options['warmup'], users=options['users'], seed=options['seed'],
+                host=options['host'],
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        result = benchmark.run()
+        baseline = None
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+
+        self.stdout.write(
+            f'Revision {result["revision"] or "unknown"}, {result["concurrency"]} thread(s), '
+            f'{result["elapsed"]}s'
+        )
+        self.stdout.write('\t'.join(('route',) + COLUMNS))
+        for route, row in result['routes'].items():
+            cells = [str(row[column]) for column in COLUMNS]
+            base = baseline and baseline['routes'].get(route)
+            if base:
+                # Relative change of each latency percentile against the baseline
+                cells += [
+                    f'{column} {(row[column] - base[column]) / base[column]:+.0%}'
+                    for column in ('p50', 'p95', 'p99') if base[column]
+                ]
+            self.stdout.write('\t'.join([route] + cells))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output_file:
+                json.dump(result, output_file, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Saved report to {options["output"]}.'))
@@ -1,3 +1,47 @@
 from django.db import models
 
-# Create your models here.
+
+class ChangeTrackingModel(models.Model):
+    """Remembers the field values last loaded from or saved to the database.
+
+    Signal handlers compare ``stored_values`` with ``current_values()`` to
+    apply incremental updates (counters, caches) without re-reading the row.
+    """
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = self.current_values()
+    
+    @property
+    def stored_values(self):
+        """Values as last seen in the database, or None for unsaved objects"""
+        return getattr(self, '_loaded_values', None)
+    
+    def current_values(self):
+        return {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+
+
+class StoredFile(models.Model):
+    """A file kept once by content hash, see main.storage"""
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    # File fields currently pointing at this file
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last change of the count; unreferenced files are kept for a grace period
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [models.Index(fields=['references', 'updated_at'], name='storedfile_gc_idx')]
+    
+    def __str__(self):
+        return self.name
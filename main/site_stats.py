@@ -0,0 +1,108 @@
+"""Site-wide numbers and recent jobs for the anonymous home page.
+
+The home page is the most hit page and must not run COUNT(*) queries per
+request, so its data lives in Django's cache with a soft TTL:
+
+* fresh (younger than HOME_STATS_TTL): served as is;
+* stale: still served immediately, while one background thread recomputes
+  it - the recompute lock is taken with ``cache.add``, so only one worker at
+  a time (one per process with the default local-memory cache, one overall
+  with a shared backend such as Redis or Memcached) does the work;
+* missing: computed inline by whoever gets the lock; others render the page
+  without stats rather than piling onto the database.
+
+Entries are dropped for good after HOME_STATS_TTL + HOME_STATS_STALE_TTL.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'main:home_data'
+LOCK_KEY = 'main:home_data:lock'
+
+# A recompute that takes longer than this is assumed dead and may be retried
+LOCK_TIMEOUT = 60
+
+EMPTY_DATA = {
+    'stats': None,
+    'recent_jobs': [],
+}
+
+
+def _ttl():
+    return getattr(settings, 'HOME_STATS_TTL', 300)
+
+
+def _stale_ttl():
+    return getattr(settings, 'HOME_STATS_STALE_TTL', 3600)
+
+
+def compute_home_data():
+    """Current site stats and the newest active jobs, as plain data"""
+    from jobs.models import Job
+    from users.models import Employer, JobSeeker
+
+    recent_count = getattr(settings, 'HOME_RECENT_JOBS_COUNT', 6)
+    recent_jobs = [
+        {
+            'id': job.id,
+            'title': job.title,
+            'company_name': job.employer.company_name,
+            'location': job.location,
+            'job_type': job.get_job_type_display(),
+            'created_at': job.created_at,
+        }
+        for job in Job.objects.filter(is_active=True)
+        .select_related('employer').order_by('-created_at', '-id')[:recent_count]
+    ]
+    return {
+        'stats': {
+            'active_jobs': Job.objects.filter(is_active=True).count(),
+            'companies': Employer.objects.count(),
+            'candidates': JobSeeker.objects.count(),
+        },
+        'recent_jobs': recent_jobs,
+    }
+
+
+def refresh_home_data():
+    """Recompute and store the home page data; the caller holds the lock"""
+    try:
+        data = compute_home_data()
+        cache.set(
+            CACHE_KEY,
+            {'data': data, 'fresh_until': time.time() + _ttl()},
+            _ttl() + _stale_ttl(),
+        )
+        return data
+    finally:
+        cache.delete(LOCK_KEY)
+
+
+def _refresh_in_background():
+    try:
+        refresh_home_data()
+    except Exception:
+        logger.exception('Refreshing the home page stats failed')
+    finally:
+        # Threads get their own database connection; don't leak it
+        connection.close()
+
+
+def get_home_data():
+    """Home page stats and recent jobs, from the cache whenever possible"""
+    entry = cache.get(CACHE_KEY)
+    if entry is not None:
+        if entry['fresh_until'] <= time.time() and cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+            threading.Thread(target=_refresh_in_background, daemon=True).start()
+        return entry['data']
+    if cache.add(LOCK_KEY, True, LOCK_TIMEOUT):
+        return refresh_home_data()
+    # Another worker is computing the first entry right now
+    return EMPTY_DATA
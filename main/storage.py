@@ -0,0 +1,265 @@
+"""Content-addressed file storage with reference counting.
+
+``ContentAddressedStorage`` streams each upload to disk in chunks while
+hashing it, and files it under its SHA-256 digest
+(``resumes/3f/3f9c...e1.pdf``).  Uploading a file that is already stored
+keeps the existing copy, so disk usage and backups grow with the number of
+distinct files, not uploads.
+
+A ``StoredFile`` row counts the model fields pointing at each file; the
+save and delete signals call ``file_changed``.  A file whose count drops to
+zero stays on disk for ``STORED_FILE_GC_GRACE`` seconds and is then removed
+by ``manage.py collect_stored_files``.  Files uploaded under their own
+names before a field used this storage are moved over by ``manage.py
+adopt_stored_files``.
+"""
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+# <prefix>/<first two hex digits>/<sha256>[.<extension>]
+CONTENT_NAME = re.compile(r'(?:^|/)([0-9a-f]{2})/(\1[0-9a-f]{62})(\.[a-z0-9]{1,10})?$')
+EXTENSION = re.compile(r'\.[a-z0-9]{1,10}$')
+
+TEMP_PREFIX = '.upload-'
+
+
+def is_content_name(name):
+    return bool(name) and CONTENT_NAME.search(name) is not None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that keeps one copy of each distinct file"""
+
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content; _save() picks it
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        if not EXTENSION.match(extension):
+            extension = ''
+        os.makedirs(self.path(directory or '.'), exist_ok=True)
+
+        # Hash while copying, into a temporary file on the same file system
+        # so the finished file can be renamed into place
+        digest = hashlib.sha256()
+        descriptor, temp_path = tempfile.mkstemp(dir=self.path(directory or '.'), prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(descriptor, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            key = digest.hexdigest()
+            name = posixpath.join(directory, key[:2], key + extension)
+            path = self.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                # Already stored; a fresh mtime keeps the garbage collector off it
+                os.utime(path)
+            except FileNotFoundError:
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                os.replace(temp_path, path)
+                temp_path = None
+        finally:
+            if temp_path is not None:
+                os.remove(temp_path)
+        return name
+
+
+content_storage = ContentAddressedStorage()
+
+
+def content_fields():
+    """``(model, field)`` for every file field kept in ``content_storage``"""
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField) and field.storage is content_storage
+    ]
+
+
+def file_name(value):
+    """The stored name of a FieldFile, a name string or None"""
+    return getattr(value, 'name', value) or ''
+
+
+def retain(name):
+    from .models import StoredFile
+    with transaction.atomic():
+        stored, _ = StoredFile.objects.get_or_create(
+            name=name, defaults={'size': content_storage.size(name)}
+        )
+        StoredFile.objects.filter(pk=stored.pk).update(
+            references=F('references') + 1, updated_at=timezone.now()
+        )
+
+
+def release(name):
+    from .models import StoredFile
+    StoredFile.objects.filter(name=name, references__gt=0).update(
+        references=F('references') - 1, updated_at=timezone.now()
+    )
+
+
+def file_changed(old, new):
+    """Move a reference from the file ``old`` to ``new`` (either may be empty)"""
+    old, new = file_name(old), file_name(new)
+    if old == new:
+        return
+    if is_content_name(new):
+        retain(new)
+    if is_content_name(old):
+        release(old)
+
+
+def recount_references():
+    """Reset every reference count from the file fields; returns the rows changed"""
+    from .models import StoredFile
+    counts = Counter()
+    for model, field in content_fields():
+        names = model._default_manager.exclude(**{f'{field.attname}__isnull': True}).exclude(
+            **{field.attname: ''}
+        ).values_list(field.attname, flat=True)
+        counts.update(name for name in names.iterator() if is_content_name(name))
+
+    changed = 0
+    now = timezone.now()
+    with transaction.atomic():
+        for stored in StoredFile.objects.select_for_update().iterator():
+            references = counts.pop(stored.name, 0)
+            if stored.references != references:
+                StoredFile.objects.filter(pk=stored.pk).update(references=references, updated_at=now)
+                changed += 1
+        for name, references in counts.items():
+            if content_storage.exists(name):
+                StoredFile.objects.create(name=name, size=content_storage.size(name), references=references)
+                changed += 1
+    return changed
+
+
+def adopt_legacy_files(dry_run=False):
+    """Move files saved under their upload names to content-addressed names.
+
+    Files uploaded before a field used ``content_storage`` keep names like
+    ``resumes/cv.pdf`` and have no ``StoredFile`` row.  Each such file is
+    stored under its digest, every row pointing at it is updated, the old
+    file is removed, and the reference counts are recounted.  Returns
+    ``(files moved, rows updated, names missing on disk)``.
+    """
+    moved = updated = missing = 0
+    adopted = {}
+    for model, field in content_fields():
+        rows = model._default_manager.exclude(**{f'{field.attname}__isnull': True}).exclude(**{field.attname: ''})
+        names = rows.values_list(field.attname, flat=True).order_by().distinct()
+        for name in [name for name in names.iterator() if not is_content_name(name)]:
+            if name not in adopted:
+                if not content_storage.exists(name):
+                    adopted[name] = None
+                    missing += 1
+                    continue
+                if dry_run:
+                    adopted[name] = name
+                else:
+                    with content_storage.open(name) as legacy:
+                        adopted[name] = content_storage.save(name, legacy)
+                moved += 1
+            if adopted[name] is None:
+                continue
+            matching = model._default_manager.filter(**{field.attname: name})
+            updated += matching.count() if dry_run else matching.update(**{field.attname: adopted[name]})
+    if not dry_run:
+        for name, new_name in adopted.items():
+            if new_name is not None:
+                content_storage.delete(name)
+        recount_references()
+    return moved, updated, missing
+
+
+def is_referenced(name):
+    return any(
+        model._default_manager.filter(**{field.attname: name}).exists()
+        for model, field in content_fields()
+    )
+
+
+def _remove(path, cutoff):
+    """Delete ``path`` unless it was written or re-uploaded after ``cutoff``"""
+    try:
+        if os.path.getmtime(path) >= cutoff:
+            return False
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def collect_garbage(grace=None, dry_run=False):
+    """Delete stored files that nothing has referenced for ``grace`` seconds.
+
+    Covers files whose count dropped to zero and files on disk without a
+    row (e.g. an upload whose model save failed).  Returns ``(files,
+    bytes)`` deleted, or that would be deleted with ``dry_run``.
+    """
+    from .models import StoredFile
+    if grace is None:
+        grace = getattr(settings, 'STORED_FILE_GC_GRACE', 3600)
+    cutoff = time.time() - grace
+    files = size = 0
+
+    unreferenced = StoredFile.objects.filter(
+        references=0, updated_at__lt=timezone.now() - timedelta(seconds=grace)
+    )
+    for stored in unreferenced.iterator():
+        # The counts are maintained by signals; check the fields before deleting
+        if is_referenced(stored.name):
+            continue
+        path = content_storage.path(stored.name)
+        if dry_run:
+            if os.path.exists(path) and os.path.getmtime(path) < cutoff:
+                files, size = files + 1, size + stored.size
+            continue
+        deleted, _ = StoredFile.objects.filter(pk=stored.pk, references=0).delete()
+        if deleted and _remove(path, cutoff):
+            files, size = files + 1, size + stored.size
+
+    for directory, _, filenames in os.walk(content_storage.location):
+        names = {}
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            if filename.startswith(TEMP_PREFIX):
+                # Left behind by an interrupted upload
+                names[path] = None
+                continue
+            name = os.path.relpath(path, content_storage.location).replace(os.sep, '/')
+            if is_content_name(name):
+                names[path] = name
+        known = set(StoredFile.objects.filter(
+            name__in=[name for name in names.values() if name]
+        ).values_list('name', flat=True))
+        for path, name in names.items():
+            if name in known or (name and is_referenced(name)):
+                continue
+            file_size = os.path.getsize(path)
+            if dry_run:
+                if os.path.getmtime(path) < cutoff:
+                    files, size = files + 1, size + file_size
+            elif _remove(path, cutoff):
+                files, size = files + 1, size + file_size
+    return files, size
@@ -0,0 +1,243 @@
+"""Synthetic data for load testing.
+
+``manage.py generate_data`` fills the database with realistic-looking
+employers, jobs, job seekers and applications using batched bulk inserts.
+bulk_create skips ``save()`` and the post_save handlers, so each batch
+applies the per-row work itself (salary parsing, location codes, skill
+mappings). The derived tables (counters, facet counts, search vocabulary,
+recommendation index) are rebuilt once at the end.
+"""
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from jobs import counters, facets, fuzzy, recommendations
+from jobs.models import Application, Job
+from jobs.salary import apply_salary
+from main.locations import apply_location
+from users.models import Employer, EmployerStats, JobSeeker
+from users.skills import sync_skills
+
+COMPANY_PREFIXES = [
+    'Blue', 'North', 'Bright', 'Summit', 'Silver', 'Green', 'Rapid', 'Prime', 'Nova', 'Apex',
+    'Urban', 'Global', 'Pacific', 'Quantum', 'Iron', 'Cedar', 'Vertex', 'Harbor', 'Solar', 'Crystal',
+]
+COMPANY_SUFFIXES = [
+    'Labs', 'Systems', 'Technologies', 'Solutions', 'Health', 'Logistics', 'Analytics',
+    'Software', 'Networks', 'Retail', 'Finance', 'Media', 'Energy', 'Dynamics', 'Works',
+]
+FIRST_NAMES = [
+    'Aarav', 'Maya', 'Liam', 'Priya', 'Noah', 'Ananya', 'Emma', 'Rohan', 'Olivia', 'Arjun',
+    'Sofia', 'Vikram', 'Isla', 'Kavya', 'Ethan', 'Meera', 'Lucas', 'Diya', 'Amelia', 'Karan',
+]
+LAST_NAMES = [
+    'Sharma', 'Smith', 'Nair', 'Johnson', 'Patel', 'Garcia', 'Menon', 'Brown', 'Iyer', 'Wilson',
+    'Reddy', 'Taylor', 'Das', 'Martin', 'Kumar', 'Lee', 'Pillai', 'Walker', 'Singh', 'Clark',
+]
+LOCATIONS = [
+    'Bangalore', 'Mumbai', 'Delhi', 'Hyderabad', 'Chennai', 'Pune', 'Kochi', 'Kolkata',
+    'London', 'New York', 'San Francisco', 'Berlin', 'Singapore', 'Toronto', 'Remote',
+]
+DEPARTMENTS = {
+    'Engineering': [
+        'Software Engineer', 'Backend Developer', 'Frontend Developer', 'DevOps Engineer',
+        'Data Engineer', 'Mobile Developer', 'QA Engineer', 'Site Reliability Engineer',
+    ],
+    'Data': ['Data Analyst', 'Data Scientist', 'Machine Learning Engineer', 'BI Developer'],
+    'Design': ['Product Designer', 'UX Researcher', 'UI Designer', 'Graphic Designer'],
+    'Sales': ['Account Executive', 'Sales Manager', 'Business Development Representative'],
+    'Marketing': ['Marketing Manager', 'Content Writer', 'SEO Specialist', 'Growth Marketer'],
+    'Operations': ['Operations Manager', 'Project Manager', 'Office Administrator'],
+    'Finance': ['Accountant', 'Financial Analyst', 'Payroll Specialist'],
+    'Support': ['Customer Support Specialist', 'Technical Support Engineer'],
+}
+SKILLS = {
+    'Engineering': ['Python', 'Django', 'Java', 'Go', 'JavaScript', 'React', 'Docker', 'Kubernetes', 'AWS', 'SQL', 'Git'],
+    'Data': ['Python', 'SQL', 'Pandas', 'Spark', 'Tableau', 'Statistics', 'Machine Learning', 'Excel'],
+    'Design': ['Figma', 'Sketch', 'Prototyping', 'User Research', 'Illustrator', 'Photoshop'],
+    'Sales': ['Negotiation', 'CRM', 'Salesforce', 'Lead Generation', 'Communication'],
+    'Marketing': ['SEO', 'Copywriting', 'Google Analytics', 'Social Media', 'Email Marketing'],
+    'Operations': ['Project Management', 'Scheduling', 'Budgeting', 'Excel', 'Communication'],
+    'Finance': ['Accounting', 'Excel', 'Tally', 'Financial Modelling', 'Taxation'],
+    'Support': ['Communication', 'Zendesk', 'Troubleshooting', 'CRM', 'Customer Service'],
+}
+SENIORITY = {'entry': 'Junior', 'mid': '', 'senior': 'Senior'}
+# (template, low, high) per salary period; amounts in whole currency units
+SALARY_RANGES = [
+    ('${low}k - ${high}k', 40, 180),
+    ('₹{low} - ₹{high} LPA', 3, 45),
+    ('${low} - ${high} per hour', 15, 120),
+    ('${low},000 - ${high},000 per month', 2, 15),
+    ('', 0, 0),
+]
+STATUS_WEIGHTS = [('applied', 50), ('viewed', 25), ('shortlisted', 12), ('rejected', 10), ('hired', 3)]
+
+
+class Generator:
+    """Creates synthetic rows in batches; ``tag`` keeps usernames unique per run"""
+
+    def __init__(self, tag='synthetic', batch_size=5000, seed=None, password='password', log=None):
+        self.tag = tag
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        # Hashing is deliberately slow, so every generated user shares one hash
+        self.password = make_password(password)
+        self.log = log or (lambda message: None)
+
+    def _batches(self, count):
+        for start in range(0, count, self.batch_size):
+            yield start, min(self.batch_size, count - start)
+
+    def _create_users(self, kind, start, count, names):
+        users = [
+            User(
+                username=f'{self.tag}-{kind}{start + i}',
+                email=f'{self.tag}-{kind}{start + i}@example.com',
+                first_name=names[i],
+                password=self.password,
+            )
+            for i in range(count)
+        ]
+        User.objects.bulk_create(users)
+        # Not every backend returns primary keys from a bulk insert
+        ids = dict(User.objects.filter(
+            username__in=[user.username for user in users]
+        ).values_list('username', 'id'))
+        return [ids[user.username] for user in users]
+
+    def _next_index(self, kind):
+        return User.objects.filter(username__startswith=f'{self.tag}-{kind}').count()
+
+    def _person_name(self):
+        return f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}'
+
+    def employers(self, count):
+        """Create ``count`` employers with their stats rows; returns their ids"""
+        first = self._next_index('employer')
+        employer_ids = []
+        for start, size in self._batches(count):
+            names = [
+                f'{self.random.choice(COMPANY_PREFIXES)} {self.random.choice(COMPANY_SUFFIXES)}'
+                for _ in range(size)
+            ]
+            with transaction.atomic():
+                user_ids = self._create_users('employer', first + start, size, names)
+                Employer.objects.bulk_create([
+                    Employer(
+                        user_id=user_id, company_name=name, contact_person=self._person_name(),
+                        phone=f'98{self.random.randrange(10 ** 8):08d}',
+                        company_address=f'{self.random.randint(1, 500)} {self.random.choice(LOCATIONS)} Road',
+                        is_verified=self.random.random() < 0.6,
+                    )
+                    for user_id, name in zip(user_ids, names)
+                ])
+                batch_ids = list(Employer.objects.filter(user_id__in=user_ids).values_list('id', flat=True))
+                EmployerStats.objects.bulk_create([EmployerStats(employer_id=pk) for pk in batch_ids])
+            employer_ids += batch_ids
+            self.log(f'Created {start + size} employers...')
+        return employer_ids
+
+    def _salary(self):
+        template, low, high = self.random.choice(SALARY_RANGES)
+        if not template:
+            return ''
+        bottom = self.random.randint(low, (low + high) // 2)
+        return template.format(low=bottom, high=self.random.randint(bottom + 1, high))
+
+    def jobs(self, count, employer_ids):
+        """Create ``count`` jobs spread over ``employer_ids``; returns their ids"""
+        last_id = Job.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        for start, size in self._batches(count):
+            jobs = []
+            for _ in range(size):
+                department = self.random.choice(list(DEPARTMENTS))
+                level = self.random.choice(list(SENIORITY))
+                title = ' '.join(filter(None, [
+                    SENIORITY[level], self.random.choice(DEPARTMENTS[department]),
+                ]))
+                skills = self.random.sample(SKILLS[department], 3)
+                job = Job(
+                    employer_id=self.random.choice(employer_ids),
+                    title=title, department=department,
+                    location=self.random.choice(LOCATIONS),
+                    job_type=self.random.choice(Job.JOB_TYPE_CHOICES)[0],
+                    experience_level=level, salary=self._salary(),
+                    description=f'We are hiring a {title} to join our {department} team. '
+                                f'You will work with {", ".join(skills)} every day.',
+                    requirements=f'Experience with {", ".join(skills)}.',
+                    is_active=self.random.random() < 0.85,
+                )
+                apply_salary(job)
+                apply_location(job)
+                jobs.append(job)
+            with transaction.atomic():
+                Job.objects.bulk_create(jobs)
+            self.log(f'Created {start + size} jobs...')
+        return list(Job.objects.filter(id__gt=last_id).values_list('id', flat=True))
+
+    def job_seekers(self, count):
+        """Create ``count`` job seekers with their skill mappings; returns their ids"""
+        first = self._next_index('seeker')
+        seeker_ids = []
+        for start, size in self._batches(count):
+            names = [self._person_name() for _ in range(size)]
+            with transaction.atomic():
+                user_ids = self._create_users('seeker', first + start, size, names)
+                seekers = []
+                for user_id, name in zip(user_ids, names):
+                    department = self.random.choice(list(DEPARTMENTS))
+                    years = self.random.randint(0, 15)
+                    seeker = JobSeeker(
+                        user_id=user_id, full_name=name,
+                        phone=f'99{self.random.randrange(10 ** 8):08d}',
+                        location=self.random.choice(LOCATIONS),
+                        skills=', '.join(self.random.sample(SKILLS[department], 4)),
+                        experience=f'{years} years as a {self.random.choice(DEPARTMENTS[department])}',
+                        education=self.random.choice(['B.Tech', 'B.Sc', 'MBA', 'M.Tech', 'B.Com', 'BA']),
+                        bio=f'{department} professional looking for new opportunities.',
+                    )
+                    apply_location(seeker)
+                    seekers.append(seeker)
+                JobSeeker.objects.bulk_create(seekers)
+                batch = list(JobSeeker.objects.filter(user_id__in=user_ids).only('id', 'skills'))
+                sync_skills(batch)
+            seeker_ids += [seeker.id for seeker in batch]
+            self.log(f'Created {start + size} job seekers...')
+        return seeker_ids
+
+    def applications(self, count, job_ids, seeker_ids):
+        """Create up to ``count`` applications of random seekers to random jobs.
+
+        Pairs that already exist are skipped, so fewer rows may be created
+        when ``count`` approaches the number of possible pairs.
+        """
+        statuses, weights = zip(*STATUS_WEIGHTS)
+        before = Application.objects.count()
+        for start, size in self._batches(count):
+            pairs = {
+                (self.random.choice(seeker_ids), self.random.choice(job_ids))
+                for _ in range(size)
+            }
+            with transaction.atomic():
+                Application.objects.bulk_create(
+                    [
+                        Application(
+                            job_seeker_id=seeker_id, job_id=job_id,
+                            status=self.random.choices(statuses, weights)[0],
+                        )
+                        for seeker_id, job_id in pairs
+                    ],
+                    ignore_conflicts=True,
+                )
+            self.log(f'Inserted {start + size} applications...')
+        return Application.objects.count() - before
+
+    def rebuild_derived(self):
+        """Recompute what the skipped save hooks would have maintained"""
+        counters.reconcile(batch_size=self.batch_size)
+        facets.rebuild_facet_counts()
+        fuzzy.rebuild_vocabulary(batch_size=self.batch_size)
+        if recommendations.available():
+            recommendations.build_index(batch_size=self.batch_size)
@@ -1,3 +1,375 @@
-from django.test import TestCase
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+import jobs.urls
+import main.urls
+import users.urls
+from jobs import counters, facets, recommendations
+from jobs.models import Application, Job, JobFacetCount
+from jobs.search_cache import result_cache
+from main import instrumentation, site_stats
+from main.locations import get_gazetteer
+from users.models import Employer, JobSeeker, JobSeekerSkill
+
+# URL modules covered by the query count harness
+URL_MODULES = (jobs.urls, users.urls, main.urls)
+
+# Extra query strings for routes whose work depends on them
+ROUTE_QUERIES = {
+    'find_jobs': ['', '?search=python', '?sort=salary', '?location_code=remote&job_type=full_time'],
+    'employer_applications': ['', '?sort=match', '?status=applied'],
+    'employer_job_applications': ['', '?sort=match', '?status=applied'],
+}
+
+# Routes that render templates the project does not ship yet; their query
+# counts are still compared, but a server error is expected
+MISSING_TEMPLATES = {'register', 'edit_company_profile'}
+
+ROLES = ('anonymous', 'job_seeker', 'employer', 'staff')
+
+SKILLS = ['Python', 'Django', 'SQL', 'JavaScript', 'React', 'AWS', 'Docker']
+
+
+def route_names():
+    for module in URL_MODULES:
+        for pattern in module.urlpatterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                yield pattern.name, sorted(pattern.pattern.converters)
+
+
+class QueryCountHarnessTests(TestCase):
+    """No route may issue more queries as the number of rows grows.
+
+    Every named route of jobs, users and main is requested as each role with
+    N rows seeded, then again with 10N; the query counts must match.
+    """
+
+    N = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.index_dir = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.index_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='staff', password='secret', is_staff=True)
+        cls.employer = cls.create_employer('employer')
+        cls.other_employer = cls.create_employer('other')
+        cls.job_seeker = cls.create_job_seeker('seeker')
+        cls.seeded = 0
+        cls.target_job = None
+
+    @classmethod
+    def create_employer(cls, username):
+        return Employer.objects.create(
+            user=User.objects.create_user(username=username, password='secret', email=f'{username}@example.com'),
+            company_name=f'{username.title()} Ltd', contact_person='Ann', phone='555',
+            company_address='1 Main St',
+        )
+
+    @classmethod
+    def create_job_seeker(cls, username, number=0):
+        return JobSeeker.objects.create(
+            user=User.objects.create_user(username=username, password='secret', email=f'{username}@example.com'),
+            full_name=f'Seeker {username}', phone='555', location='Remote',
+            skills=', '.join(SKILLS[number % len(SKILLS):] + SKILLS[:number % len(SKILLS)][:2]),
+            experience='Python developer', bio='Builds web applications',
+        )
+
+    def setUp(self):
+        self.client.raise_request_exception = False
+        self.settings_override = override_settings(
+            RECOMMENDATIONS_INDEX_PATH=f'{self.index_dir}/recommendations.npz',
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def seed(self, count):
+        """Add ``count`` jobs per employer, each with a fresh applicant"""
+        for employer in (self.employer, self.other_employer):
+            for _ in range(count):
+                number = self.seeded
+                self.seeded += 1
+                job = Job.objects.create(
+                    employer=employer, title=f'Python Developer {number}', department='Engineering',
+                    location='Remote', job_type='full_time', experience_level='mid',
+                    salary=f'${50 + number}k - ${80 + number}k', description='Build Django apps',
+                    requirements='Python, Django, SQL', is_active=number % 3 != 1,
+                )
+                applicant = self.create_job_seeker(f'applicant{number}', number)
+                applications = [(job, applicant)]
+                if employer == self.employer:
+                    # The job whose applications page is measured grows too
+                    self.target_job = self.target_job or job
+                    applications.append((job, self.job_seeker))
+                    if job != self.target_job:
+                        applications.append((self.target_job, applicant))
+                for position, (applied_job, seeker) in enumerate(applications):
+                    application = Application.objects.create(
+                        job=applied_job, job_seeker=seeker,
+                        status=Application.STATUS_CHOICES[(number + position) % 5][0],
+                    )
+                    counters.application_created(application, employer.id)
+        if recommendations.available():
+            recommendations.build_index()
+
+    def url_kwargs(self):
+        return {
+            'job_id': self.target_job.id,
+            'application_id': Application.objects.filter(job=self.target_job).order_by('id').first().id,
+            'status': 'viewed',
+        }
+
+    def login(self, role):
+        self.client.logout()
+        user = {
+            'job_seeker': self.job_seeker.user,
+            'employer': self.employer.user,
+            'staff': self.staff,
+        }.get(role)
+        if user is not None:
+            self.client.force_login(user)
+
+    def count_queries(self, role, url, name):
+        """Queries of one cold-cache request, after a warm-up request"""
+        self.login(role)
+        self.client.get(url)
+        self.login(role)
+        cache.clear()
+        result_cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        if name not in MISSING_TEMPLATES:
+            self.assertLess(response.status_code, 500, f'{role} {url}')
+        return len(queries)
+
+    def measure(self):
+        kwargs = self.url_kwargs()
+        counts = {}
+        for name, converters in route_names():
+            path = reverse(name, kwargs={key: kwargs[key] for key in converters})
+            for query in ROUTE_QUERIES.get(name, ['']):
+                for role in ROLES:
+                    counts[(role, path + query)] = self.count_queries(role, path + query, name)
+        return counts
+
+    def test_query_counts_do_not_grow_with_rows(self):
+        self.seed(self.N)
+        few_rows = self.measure()
+        self.seed(self.N * 9)
+        many_rows = self.measure()
+        grown = {
+            f'{role} {url}': (few_rows[role, url], count)
+            for (role, url), count in many_rows.items()
+            if count > few_rows[role, url]
+        }
+        self.assertEqual(grown, {}, 'Query count grew with the number of rows')
+
+
+class GazetteerTests(TestCase):
+    """Free-text locations map to canonical gazetteer IDs"""
+
+    def setUp(self):
+        self.gazetteer = get_gazetteer()
+
+    def test_normalize(self):
+        for text, expected in [
+            ('New York, NY', 'us-ny-new-york'),
+            ('NYC', 'us-ny-new-york'),
+            ('Software engineer in Brooklyn', 'us-ny-new-york'),
+            ('Washington, D.C.', 'us-dc-washington'),
+            ('Cochin', 'in-kl-kochi'),
+            ('Ernakulam, Kerala', 'in-kl-kochi'),
+            ('Trivandrum, Kerala', 'in-kl-thiruvananthapuram'),
+            ('Kerala', 'in-kl'),
+            ('Portland, OR', 'us-or-portland'),
+            ('Remote - India', 'remote'),
+            ('CA', 'us-ca'),
+            # Short aliases only count as a whole part
+            ('Oracle DBA', ''),
+            ('Atlantis', ''),
+            ('', ''),
+        ]:
+            self.assertEqual(self.gazetteer.normalize(text), expected, text)
+
+    def test_hierarchy_and_radius(self):
+        self.assertEqual(self.gazetteer.ancestors('in-kl-kochi'), ['in-kl', 'in'])
+        self.assertIn('in-kl-kochi', self.gazetteer.nearby('in'))
+        self.assertEqual(self.gazetteer.nearby('in-kl-kochi'), ['in-kl-kochi'])
+        nearby = self.gazetteer.nearby('in-kl-kochi', 250)
+        self.assertIn('in-kl-thiruvananthapuram', nearby)
+        self.assertNotIn('us-ny-new-york', nearby)
+        self.assertEqual(self.gazetteer.nearby('atlantis'), [])
+
+
+class SiteStatsTests(TestCase):
+    """Home page stats come from the cache; one worker recomputes them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Employer.objects.create(
+            user=User.objects.create_user(username='employer', password='secret'),
+            company_name='Acme', contact_person='Ann', phone='555', company_address='1 Main St',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        thread = mock.patch.object(site_stats.threading, 'Thread')
+        self.thread = thread.start()
+        self.addCleanup(thread.stop)
+
+    def store(self, fresh_until):
+        cache.set(site_stats.CACHE_KEY, {'data': {'stats': 'cached', 'recent_jobs': []}, 'fresh_until': fresh_until})
+
+    def test_missing_entry_is_computed_inline(self):
+        data = site_stats.get_home_data()
+        self.assertEqual(data['stats'], {'active_jobs': 0, 'companies': 1, 'candidates': 0})
+        self.assertIsNone(cache.get(site_stats.LOCK_KEY))
+        with self.assertNumQueries(0):
+            self.assertEqual(site_stats.get_home_data(), data)
+
+    def test_missing_entry_while_locked_renders_without_stats(self):
+        cache.add(site_stats.LOCK_KEY, True)
+        with self.assertNumQueries(0):
+            self.assertEqual(site_stats.get_home_data(), site_stats.EMPTY_DATA)
+        self.assertEqual(self.client.get(reverse('home')).status_code, 200)
+
+    def test_stale_entry_is_served_while_one_thread_refreshes(self):
+        self.store(time.time() - 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(site_stats.get_home_data()['stats'], 'cached')
+            self.assertEqual(site_stats.get_home_data()['stats'], 'cached')
+        # The second request found the lock taken
+        self.assertEqual(self.thread.call_count, 1)
+        self.thread.return_value.start.assert_called_once_with()
+
+    def test_fresh_entry_is_served(self):
+        self.store(time.time() + 60)
+        with self.assertNumQueries(0):
+            self.assertEqual(site_stats.get_home_data()['stats'], 'cached')
+        self.thread.assert_not_called()
+
+
+class RequestMetricsTests(TestCase):
+    """Requests are recorded with their query counts and checked against budgets"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'metrics.jsonl')
+        metrics = override_settings(
+            REQUEST_METRICS_ENABLED=True, REQUEST_METRICS_PATH=self.path,
+            REQUEST_QUERY_BUDGETS={'find_jobs': 100}, REQUEST_QUERY_BUDGET_ACTION='log',
+        )
+        metrics.enable()
+        self.addCleanup(metrics.disable)
+        self.addCleanup(self.remove_handlers)
+
+    def remove_handlers(self):
+        for handler in list(instrumentation.records_logger.handlers):
+            if getattr(handler, 'baseFilename', '') == os.path.realpath(self.path):
+                instrumentation.records_logger.removeHandler(handler)
+                handler.close()
+
+    def test_requests_are_recorded(self):
+        self.client.get(reverse('find_jobs'))
+        self.client.get(reverse('find_jobs'), {'search': 'python'})
+        self.client.get('/no-such-page/')
+        records = list(instrumentation.read_records(self.path))
+        self.assertEqual(
+            [(record['url_name'], record['status']) for record in records],
+            [('find_jobs', 200), ('find_jobs', 200), ('', 404)],
+        )
+        self.assertGreater(records[0]['queries'], 0)
+        summary = instrumentation.summarize(records)
+        self.assertEqual(summary['find_jobs']['requests'], 2)
+        self.assertEqual(summary['(unresolved)']['requests'], 1)
+        self.assertEqual(set(instrumentation.summarize(records, 'find_jobs')), {'find_jobs'})
+
+    def test_query_budgets(self):
+        with self.settings(REQUEST_QUERY_BUDGETS={'find_jobs': 0}):
+            with self.assertLogs('main.instrumentation', logging.WARNING):
+                self.assertEqual(self.client.get(reverse('find_jobs')).status_code, 200)
+        with self.settings(REQUEST_QUERY_BUDGETS={'find_jobs': 0}, REQUEST_QUERY_BUDGET_ACTION='raise'):
+            # The middleware reads its settings when it is loaded
+            self.client.handler.load_middleware()
+            with self.assertRaises(instrumentation.QueryBudgetExceeded):
+                self.client.get(reverse('find_jobs'))
+
+    def test_rotated_records_are_read_oldest_first(self):
+        for suffix, url_name in (('.2', 'oldest'), ('.1', 'older'), ('', 'newest')):
+            with open(self.path + suffix, 'w', encoding='utf-8') as records_file:
+                records_file.write(json.dumps({'url_name': url_name, 'wall_ms': 1}) + '\nnot json\n')
+        self.assertEqual(
+            [record['url_name'] for record in instrumentation.read_records(self.path)],
+            ['oldest', 'older', 'newest'],
+        )
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual([instrumentation.percentile(values, pct) for pct in (50, 95, 99)], [50, 95, 99])
+        self.assertEqual(instrumentation.percentile([7], 99), 7)
+        self.assertIsNone(instrumentation.percentile([], 50))
+
+
+class GenerateDataTests(TestCase):
+    """generate_data bulk inserts rows and rebuilds everything derived from them"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        index_path = override_settings(RECOMMENDATIONS_INDEX_PATH=os.path.join(directory, 'index.npz'))
+        index_path.enable()
+        self.addCleanup(index_path.disable)
+        self.addCleanup(recommendations._loaded.update, {'index': None, 'mtime': None})
+
+    def generate(self, **options):
+        options = {'employers': 3, 'jobs': 20, 'seekers': 10, 'applications': 40,
+                   'batch_size': 7, 'seed': 1, **options}
+        call_command('generate_data', stdout=io.StringIO(), **options)
+
+    def test_generated_data_is_consistent(self):
+        self.generate()
+        self.assertEqual(Employer.objects.filter(stats__isnull=False).count(), 3)
+        self.assertEqual(Job.objects.count(), 20)
+        self.assertEqual(JobSeeker.objects.count(), 10)
+        self.assertTrue(0 < Application.objects.count() <= 40)
+        self.assertEqual(JobSeekerSkill.objects.count(), 40)
+        self.assertFalse(Job.objects.filter(location_code='').exists())
+        # Counters and facet counts already match a full recount
+        self.assertEqual(counters.reconcile(), (0, 0))
+        generated = list(JobFacetCount.objects.filter(count__gt=0).values_list('facet', 'value', 'count'))
+        facets.rebuild_facet_counts()
+        self.assertCountEqual(JobFacetCount.objects.values_list('facet', 'value', 'count'), generated)
+
+        # A second run continues the usernames instead of colliding
+        self.generate(employers=2, jobs=0, seekers=1, applications=0)
+        self.assertEqual(Employer.objects.count(), 5)
+        self.assertTrue(User.objects.filter(username='synthetic-employer4').exists())
+
+    def test_rows_need_their_parents(self):
+        with self.assertRaises(CommandError):
+            self.generate(employers=0)
+        with self.assertRaises(CommandError):
+            self.generate(seekers=0)
@@ -4,5 +4,6 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('metrics/requests/', views.request_metrics, name='request_metrics'),
     
 ]
\ No newline at end of file
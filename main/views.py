@@ -1,22 +1,25 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+from .instrumentation import read_records, summarize
+from .site_stats import get_home_data
 
 def home(request):
-    # For now, use dummy data since the database might not be ready
-    stats = {
-        'active_jobs': 0,
-        'companies': 0,
-        'candidates': 0,
-    }
-    
-    recent_jobs = []
+    # Cached site stats and newest jobs, refreshed in the background
+    data = get_home_data()
     
     return render(request, 'main/home.html', {
-        'stats': stats,
-        'recent_jobs': recent_jobs
+        'stats': data['stats'],
+        'recent_jobs': data['recent_jobs']
     })
 
+@staff_member_required
+def request_metrics(request):
+    """Latency, query count and response size percentiles per URL name"""
+    return JsonResponse(summarize(read_records(), url_name=request.GET.get('url_name')))
+
 @login_required
 def dashboard(request):
     # Simple dashboard view for now
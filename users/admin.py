@@ -1,7 +1,7 @@
 # your_app/admin.py
 
 from django.contrib import admin
-from .models import JobSeeker, Employer
+from .models import JobSeeker, Employer, EmployerStats
 
 @admin.register(JobSeeker)
 class JobSeekerAdmin(admin.ModelAdmin):
@@ -12,3 +12,18 @@ class JobSeekerAdmin(admin.ModelAdmin):
 class EmployerAdmin(admin.ModelAdmin):
     list_display = ('company_name', 'contact_person', 'phone', 'is_verified', 'created_at')
     search_fields = ('company_name', 'contact_person')
+
+@admin.register(EmployerStats)
+class EmployerStatsAdmin(admin.ModelAdmin):
+    """Read-only: the counters are maintained by jobs.counters"""
+    list_display = ('employer', 'job_count', 'active_job_count', 'application_count', 'applied_count')
+    search_fields = ('employer__company_name',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
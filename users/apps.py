@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate, pre_migrate
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import resume_extraction, signals  # noqa: F401
+        pre_migrate.connect(resume_extraction.drop_triggers, sender=self)
+        post_migrate.connect(resume_extraction.install_triggers, sender=self)
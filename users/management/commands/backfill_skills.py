@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from users.models import JobSeeker
+from users.skills import sync_skills
+
+
+class Command(BaseCommand):
+    help = 'Build the normalized skill mappings from every job seeker\'s skills text'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Job seekers processed per transaction',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        seekers = JobSeeker.objects.only('id', 'skills').order_by('id')
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(seekers.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            sync_skills(batch)
+            total += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f'Processed {total} job seekers...')
+        self.stdout.write(self.style.SUCCESS(f'Backfilled skills for {total} job seekers.'))
@@ -0,0 +1,95 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.resume_extraction import backfill, pending_job_seekers
+from users.resume_parsers import supported_extensions
+
+
+class Command(BaseCommand):
+    help = (
+        'Extract the text of every resume that has none yet, in parallel worker '
+        'processes; an interrupted run continues from its checkpoint'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Extraction processes (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Resumes extracted and stored per batch',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-extract every resume, not only those without current text',
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Also retry resumes that failed before, e.g. PDFs before pypdf was installed',
+        )
+        parser.add_argument(
+            '--checkpoint', default=str(getattr(settings, 'RESUME_EXTRACTION_CHECKPOINT', '')),
+            help='File recording the last processed job seeker (default: RESUME_EXTRACTION_CHECKPOINT)',
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore an existing checkpoint and start from the first job seeker',
+        )
+
+    def read_checkpoint(self, path):
+        try:
+            with open(path, encoding='utf-8') as checkpoint_file:
+                return json.load(checkpoint_file)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            raise CommandError(f'Checkpoint {path} is corrupt; rerun with --restart.')
+
+    def write_checkpoint(self, path, state):
+        # Write then rename, so an interrupted run never leaves half a file
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+        os.replace(temp_path, path)
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1.')
+        path = options['checkpoint']
+        state = {'last_id': 0, 'stored': 0, 'failed': 0}
+        if path and not options['restart']:
+            saved = self.read_checkpoint(path)
+            if saved:
+                state.update(saved)
+                self.stdout.write(f'Resuming after job seeker {state["last_id"]}.')
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        def on_batch(last_id, stored, failed):
+            state['last_id'] = last_id
+            state['stored'] += stored
+            state['failed'] += failed
+            if path:
+                self.write_checkpoint(path, state)
+            self.stdout.write(f'Processed {state["stored"]} resumes ({state["failed"]} failed)...')
+
+        job_seekers = pending_job_seekers(everything=options['all'], retry_failed=options['retry_failed'])
+        if '.pdf' not in supported_extensions():
+            # Left pending, so a run after installing pypdf picks them up
+            self.stdout.write(self.style.WARNING(
+                'PDF support is missing (pip install pypdf); PDF resumes are skipped.'
+            ))
+            job_seekers = job_seekers.exclude(resume__iendswith='.pdf')
+        backfill(
+            job_seekers, workers=options['workers'], batch_size=options['batch_size'],
+            after_id=state['last_id'], on_batch=on_batch,
+        )
+        if path and os.path.exists(path):
+            os.remove(path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {state["stored"]} resumes; {state["failed"]} could not be read.'
+        ))
@@ -0,0 +1,47 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_employer_created_at_jobseeker_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('normalized_name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobSeekerSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('job_seeker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seeker_skills', to='users.jobseeker')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.skill')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='skill_set',
+            field=models.ManyToManyField(blank=True, related_name='job_seekers', through='users.JobSeekerSkill', to='users.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='jobseekerskill',
+            index=models.Index(fields=['skill', 'job_seeker'], name='seekerskill_skill_seeker_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobseekerskill',
+            unique_together={('job_seeker', 'skill')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_skill_jobseekerskill'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobseeker',
+            name='location_code',
+            field=models.CharField(blank=True, db_index=True, max_length=50),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.1.13 on 2026-10-18 19:58
+
+from collections import Counter
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+STATUSES = ('applied', 'viewed', 'shortlisted', 'rejected', 'hired')
+
+
+def populate_counters(apps, schema_editor):
+    Application = apps.get_model('jobs', 'Application')
+    Job = apps.get_model('jobs', 'Job')
+    Employer = apps.get_model('users', 'Employer')
+    EmployerStats = apps.get_model('users', 'EmployerStats')
+    job_counts, employer_counts = {}, {}
+    rows = Application.objects.values('job_id', 'job__employer_id', 'status').annotate(
+        n=models.Count('id')
+    ).order_by()
+    for row in rows:
+        for counts, key in ((job_counts, row['job_id']), (employer_counts, row['job__employer_id'])):
+            counter = counts.setdefault(key, Counter())
+            counter['application_count'] += row['n']
+            if row['status'] in STATUSES:
+                counter[f"{row['status']}_count"] += row['n']
+    fields = ['application_count'] + [f'{status}_count' for status in STATUSES]
+    jobs = list(Job.objects.filter(id__in=job_counts).only('id'))
+    for job in jobs:
+        for field in fields:
+            setattr(job, field, job_counts[job.id][field])
+    Job.objects.bulk_update(jobs, fields, batch_size=500)
+    EmployerStats.objects.bulk_create([
+        EmployerStats(employer_id=employer_id, **{
+            field: employer_counts.get(employer_id, Counter())[field] for field in fields
+        })
+        for employer_id in Employer.objects.values_list('id', flat=True)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_location_code'),
+        ('jobs', '0012_job_application_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployerStats',
+            fields=[
+                ('employer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='users.employer')),
+                ('application_count', models.IntegerField(default=0)),
+                ('applied_count', models.IntegerField(default=0)),
+                ('viewed_count', models.IntegerField(default=0)),
+                ('shortlisted_count', models.IntegerField(default=0)),
+                ('rejected_count', models.IntegerField(default=0)),
+                ('hired_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'employer stats',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
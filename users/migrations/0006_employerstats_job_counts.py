@@ -0,0 +1,39 @@
+# Generated by Django 4.1.13 on 2026-10-18 20:00
+
+from django.db import migrations, models
+
+
+def populate_job_counts(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    EmployerStats = apps.get_model('users', 'EmployerStats')
+    counts = {}
+    rows = Job.objects.values('employer_id', 'is_active').annotate(n=models.Count('id')).order_by()
+    for row in rows:
+        total, active = counts.get(row['employer_id'], (0, 0))
+        counts[row['employer_id']] = (total + row['n'], active + (row['n'] if row['is_active'] else 0))
+    stats = list(EmployerStats.objects.filter(employer_id__in=counts))
+    for row in stats:
+        row.job_count, row.active_job_count = counts[row.employer_id]
+    EmployerStats.objects.bulk_update(stats, ['job_count', 'active_job_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_employerstats'),
+        ('jobs', '0012_job_application_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employerstats',
+            name='active_job_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='employerstats',
+            name='job_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_job_counts, migrations.RunPython.noop),
+    ]
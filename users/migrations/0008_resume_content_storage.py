@@ -0,0 +1,19 @@
+# Generated by Django 4.1.13 on 2026-10-18 20:22
+
+from django.db import migrations, models
+import main.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_employer_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobseeker',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=main.storage.ContentAddressedStorage(), upload_to='resumes/'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.1.13 on 2026-10-18 20:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_fts_index(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends fall back to icontains search.
+    # The sync triggers are installed by the users app's post_migrate handler.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS users_resumetext_fts USING fts5(
+            text, content = 'users_resumetext', content_rowid = 'job_seeker_id',
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+        """
+    )
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for trigger in ('insert', 'update', 'delete'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS users_resumetext_fts_{trigger}')
+    schema_editor.execute('DROP TABLE IF EXISTS users_resumetext_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_resume_content_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeText',
+            fields=[
+                ('job_seeker', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resume_text', serialize=False, to='users.jobseeker')),
+                ('source', models.CharField(max_length=100)),
+                ('text', models.TextField(blank=True)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('extracted_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
@@ -1,30 +1,55 @@
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
+from main.locations import apply_location
+from main.models import ChangeTrackingModel
+from main.storage import content_storage
 
-class JobSeeker(models.Model):
+class JobSeeker(ChangeTrackingModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     full_name = models.CharField(max_length=100)
     phone = models.CharField(max_length=15)
     location = models.CharField(max_length=100, blank=True)
+    # Canonical gazetteer ID for the location text, see main.locations
+    location_code = models.CharField(max_length=50, blank=True, db_index=True)
     skills = models.TextField(blank=True)
     experience = models.TextField(blank=True)
     education = models.TextField(blank=True)
     bio = models.TextField(blank=True)
-    resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    # Stored once per distinct file, named by content hash
+    resume = models.FileField(upload_to='resumes/', storage=content_storage, blank=True, null=True)
     created_at = models.DateTimeField(default=timezone.now)
+    skill_set = models.ManyToManyField(
+        'Skill', through='JobSeekerSkill', related_name='job_seekers', blank=True
+    )
     
     def __str__(self):
         return self.full_name
     
+    def save(self, *args, **kwargs):
+        apply_location(self)
+        super().save(*args, **kwargs)
+    
     def get_applied_jobs(self):
         """Get all jobs applied by this job seeker"""
         from jobs.models import Application  # Import here to avoid circular import
         return Application.objects.filter(job_seeker=self).select_related('job')
     
+    def get_status_counts(self):
+        """Application count for every status, from one query per instance"""
+        if getattr(self, '_status_counts', None) is None:
+            from jobs.models import Application
+            from jobs.stats import status_counts
+            self._status_counts = status_counts(Application.objects.filter(job_seeker=self))
+        return self._status_counts
+    
     def get_applications_by_status(self, status):
         """Get applications by status"""
         from jobs.models import Application
+        counts = getattr(self, '_status_counts', None)
+        if counts is not None and not counts.get(status):
+            # Already known to be empty: skip the query
+            return Application.objects.none()
         return Application.objects.filter(job_seeker=self, status=status)
     
     def has_applied_to_job(self, job):
@@ -34,6 +59,10 @@ class JobSeeker(models.Model):
     
     @property
     def skills_list(self):
+        # Prefer the normalized skills when they were prefetched for a list
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('seeker_skills')
+        if prefetched:
+            return [seeker_skill.skill.name for seeker_skill in prefetched]
         if self.skills:
             return [skill.strip() for skill in self.skills.split(',') if skill.strip()]
         return []
@@ -52,7 +81,45 @@ class JobSeeker(models.Model):
             return self.education[:100] + '...' if len(self.education) > 100 else self.education
         return "No education provided"
 
-class Employer(models.Model):
+class Skill(models.Model):
+    """A skill from the normalized vocabulary shared by all job seekers"""
+    name = models.CharField(max_length=100)
+    normalized_name = models.CharField(max_length=100, unique=True)
+    
+    def __str__(self):
+        return self.name
+
+class JobSeekerSkill(models.Model):
+    """Maps a job seeker to a skill, keeping the order they listed it in"""
+    job_seeker = models.ForeignKey(JobSeeker, on_delete=models.CASCADE, related_name='seeker_skills')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
+    position = models.PositiveSmallIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.job_seeker} - {self.skill}"
+    
+    class Meta:
+        unique_together = ['job_seeker', 'skill']
+        ordering = ['position']
+        indexes = [
+            # "All seekers with skill X"
+            models.Index(fields=['skill', 'job_seeker'], name='seekerskill_skill_seeker_idx'),
+        ]
+
+class ResumeText(models.Model):
+    """Plain text of a job seeker's resume, extracted in the background by users.resume_extraction"""
+    job_seeker = models.OneToOneField(JobSeeker, on_delete=models.CASCADE, primary_key=True, related_name='resume_text')
+    # The resume file name the text came from; stale when it differs from JobSeeker.resume
+    source = models.CharField(max_length=100)
+    text = models.TextField(blank=True)
+    # Why no text could be extracted, e.g. an unsupported file type
+    error = models.CharField(max_length=255, blank=True)
+    extracted_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Resume text of {self.job_seeker_id}"
+
+class Employer(ChangeTrackingModel):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     company_name = models.CharField(max_length=100)
     contact_person = models.CharField(max_length=100)
@@ -60,6 +127,8 @@ class Employer(models.Model):
     company_address = models.TextField()
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(default=timezone.now)
+    # Bumped by every save(); versions the cached fragments showing the company
+    updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.company_name
@@ -81,12 +150,43 @@ class Employer(models.Model):
             return Application.objects.filter(job=job).select_related('job_seeker', 'job')
         return Application.objects.filter(job__employer=self).select_related('job_seeker', 'job')
     
+    def get_stats(self):
+        """This employer's stored counters"""
+        stats, _ = EmployerStats.objects.get_or_create(employer=self)
+        return stats
+    
     def get_applications_count(self):
         """Get total applications across all jobs"""
-        from jobs.models import Application
-        return Application.objects.filter(job__employer=self).count()
+        return self.get_stats().application_count
     
     def get_pending_applications_count(self):
         """Get pending applications across all jobs"""
-        from jobs.models import Application
-        return Application.objects.filter(job__employer=self, status='applied').count()
\ No newline at end of file
+        return self.get_stats().applied_count
+
+class EmployerStats(models.Model):
+    """Counters across all of an employer's jobs, maintained by jobs.counters"""
+    employer = models.OneToOneField(Employer, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    job_count = models.IntegerField(default=0)
+    active_job_count = models.IntegerField(default=0)
+    application_count = models.IntegerField(default=0)
+    applied_count = models.IntegerField(default=0)
+    viewed_count = models.IntegerField(default=0)
+    shortlisted_count = models.IntegerField(default=0)
+    rejected_count = models.IntegerField(default=0)
+    hired_count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"Stats for {self.employer}"
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not args and kwargs.get('update_fields') is None:
+            # Every field is a counter written with F() expressions by
+            # jobs.counters; a full save would put back stale values
+            raise ValueError(
+                'EmployerStats rows are only updated through jobs.counters; '
+                'run manage.py reconcile_counters to repair them.'
+            )
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        verbose_name_plural = 'employer stats'
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""Background text extraction from resumes, and full-text search over it.
+
+Saving a job seeker with a new resume queues the file for extraction once
+the transaction commits.  The work runs in a pool of
+``RESUME_EXTRACTION_WORKERS`` processes (see users.resume_parsers), so parsing
+a large PDF never holds up a request; the text lands in ``ResumeText``
+together with the resume name it came from, and is dropped when the resume
+is replaced.  ``manage.py extract_resume_text`` processes every resume that
+has no current text, in parallel and resumable from a checkpoint.
+
+On SQLite the text is indexed by the ``users_resumetext_fts`` FTS5 table,
+which reads the text from ``users_resumetext`` (external content) and is
+kept in sync by triggers, reinstalled after every ``migrate`` like the job
+search index.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from itertools import repeat
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.db.models.expressions import RawSQL
+
+from jobs.search import build_match_query, fts_enabled
+from main.storage import file_name
+from .models import JobSeeker, ResumeText
+from .resume_parsers import extract_text
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'users_resumetext_fts'
+
+_DELETE_ROW_SQL = (
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, text) VALUES ('delete', OLD.job_seeker_id, OLD.text);"
+)
+_INDEX_ROW_SQL = f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (NEW.job_seeker_id, NEW.text);'
+
+TRIGGERS_SQL = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON users_resumetext BEGIN
+        {_INDEX_ROW_SQL}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF text, job_seeker_id ON users_resumetext BEGIN
+        {_DELETE_ROW_SQL}
+        {_INDEX_ROW_SQL}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON users_resumetext BEGIN
+        {_DELETE_ROW_SQL}
+    END
+    """,
+]
+
+TRIGGER_NAMES = ('insert', 'update', 'delete')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def max_length():
+    return getattr(settings, 'RESUME_TEXT_MAX_LENGTH', 100000)
+
+
+def resume_path(name):
+    return JobSeeker._meta.get_field('resume').storage.path(name)
+
+
+def process_pool(workers):
+    """A pool of fresh interpreters; forking a threaded server is unsafe"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = process_pool(getattr(settings, 'RESUME_EXTRACTION_WORKERS', 2))
+        return _executor
+
+
+def reset_executor(executor):
+    """Forget a pool whose worker died; the next resume starts a new one"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+
+
+def save_results(results):
+    """Store ``(job_seeker_id, name, text, error)`` results.
+
+    Results for a resume that has been replaced in the meantime are
+    dropped.  Returns the number stored.
+    """
+    results = list(results)
+    current = set(JobSeeker.objects.filter(
+        pk__in=[job_seeker_id for job_seeker_id, *_ in results]
+    ).values_list('pk', 'resume'))
+    rows = [
+        ResumeText(job_seeker_id=job_seeker_id, source=name, text=text, error=error[:255])
+        for job_seeker_id, name, text, error in results
+        if (job_seeker_id, name) in current
+    ]
+    ResumeText.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=['job_seeker'],
+        update_fields=['source', 'text', 'error', 'extracted_at'],
+    )
+    return len(rows)
+
+
+def resume_changed(job_seeker):
+    """post_save: drop the text of a replaced resume and queue the new one"""
+    name = file_name(job_seeker.resume)
+    ResumeText.objects.filter(job_seeker=job_seeker).exclude(source=name).delete()
+    if name:
+        transaction.on_commit(partial(schedule, job_seeker.pk, name))
+
+
+def schedule(job_seeker_id, name):
+    """Extract one resume in the pool, or right here with no workers configured"""
+    path = resume_path(name)
+    if not getattr(settings, 'RESUME_EXTRACTION_WORKERS', 2):
+        save_results([(job_seeker_id, name, *extract_text(path, max_length()))])
+        return
+    executor = get_executor()
+    try:
+        future = executor.submit(extract_text, path, max_length())
+    except (BrokenProcessPool, RuntimeError):
+        # Left for the next extract_resume_text run
+        logger.warning('Resume extraction pool unavailable; skipped job seeker %s', job_seeker_id)
+        reset_executor(executor)
+        return
+    future.add_done_callback(partial(_finished, executor, job_seeker_id, name, threading.get_ident()))
+
+
+def _finished(executor, job_seeker_id, name, caller, future):
+    # Runs in the pool's result thread, unless the future was already done
+    try:
+        text, error = future.result()
+        save_results([(job_seeker_id, name, text, error)])
+    except BrokenProcessPool:
+        logger.warning('Resume extraction worker died on job seeker %s', job_seeker_id)
+        reset_executor(executor)
+    except Exception:
+        logger.exception('Could not store the resume text of job seeker %s', job_seeker_id)
+    finally:
+        # Threads get their own database connection; don't leak it
+        if threading.get_ident() != caller:
+            connection.close()
+
+
+def pending_job_seekers(everything=False, retry_failed=False):
+    """Job seekers whose resume has no current text (or all with a resume)"""
+    job_seekers = JobSeeker.objects.exclude(resume__isnull=True).exclude(resume='')
+    if everything:
+        return job_seekers
+    done = ResumeText.objects.filter(job_seeker=OuterRef('pk'), source=OuterRef('resume'))
+    if retry_failed:
+        done = done.filter(error='')
+    return job_seekers.filter(~Exists(done))
+
+
+def backfill(job_seekers, workers, batch_size, after_id=0, on_batch=None):
+    """Extract the resumes of ``job_seekers`` in ID order, after ``after_id``.
+
+    Each batch is spread over ``workers`` processes and stored in one
+    statement, then ``on_batch(last_id, stored, failed)`` is called, e.g. to
+    save a checkpoint.
+    """
+    job_seekers = job_seekers.order_by('id').values_list('id', 'resume')
+    last_id = after_id
+    with process_pool(workers) as executor:
+        while True:
+            batch = list(job_seekers.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                return
+            texts = executor.map(
+                extract_text, [resume_path(name) for _, name in batch], repeat(max_length()),
+                chunksize=max(1, len(batch) // (workers * 4)),
+            )
+            results = [(job_seeker_id, name, *result) for (job_seeker_id, name), result in zip(batch, texts)]
+            stored = save_results(results)
+            last_id = batch[-1][0]
+            if on_batch is not None:
+                on_batch(last_id, stored, sum(1 for *_, error in results if error))
+
+
+def matching_job_seeker_ids(search_query):
+    """IDs of job seekers whose resume matches, for a ``job_seeker_id__in`` filter"""
+    if not fts_enabled():
+        return ResumeText.objects.filter(text__icontains=search_query).values('job_seeker_id')
+    return RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [build_match_query(search_query)],
+    )
+
+
+def drop_triggers(using='default', **kwargs):
+    """pre_migrate handler: let migrations rebuild the resume text table."""
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        for name in TRIGGER_NAMES:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}')
+
+
+def install_triggers(using='default', **kwargs):
+    """post_migrate handler: make sure the sync triggers exist."""
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != 'sqlite' or FTS_TABLE not in conn.introspection.table_names():
+        return
+    with conn.cursor() as cursor:
+        for statement in TRIGGERS_SQL:
+            cursor.execute(statement)
@@ -0,0 +1,127 @@
+"""Parsers turning resume files into plain text.
+
+Runs in worker processes (see users.resume_extraction), so this module
+imports nothing from Django.  DOCX is read with zipfile and a streaming XML
+parse; PDF needs the optional ``pypdf`` package; plain text files are
+decoded as UTF-8.
+"""
+import os
+import re
+import zipfile
+from xml.etree.ElementTree import ParseError, iterparse
+
+try:
+    from pypdf import PdfReader
+    from pypdf.errors import PyPdfError
+except ImportError:  # pragma: no cover - optional dependency
+    PdfReader = PyPdfError = None
+
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+DOCX_BODY = 'word/document.xml'
+# Refuse documents whose XML inflates beyond this (zip bombs)
+DOCX_MAX_XML_SIZE = 50 * 1024 * 1024
+
+EXTRACTORS = {}
+
+_SPACES_RE = re.compile(r'[^\S\n]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+class ExtractionError(Exception):
+    """The file cannot be turned into text"""
+
+
+def extractor(*extensions):
+    def register(function):
+        for extension in extensions:
+            EXTRACTORS[extension] = function
+        return function
+    return register
+
+
+@extractor('.docx')
+def docx_text(path, max_length):
+    try:
+        with zipfile.ZipFile(path) as archive:
+            try:
+                info = archive.getinfo(DOCX_BODY)
+            except KeyError:
+                raise ExtractionError('Not a Word document.')
+            if info.file_size > DOCX_MAX_XML_SIZE:
+                raise ExtractionError('Document is too large.')
+            parts, length = [], 0
+            with archive.open(info) as body:
+                for _, element in iterparse(body):
+                    tag = element.tag
+                    if tag == WORD_NAMESPACE + 't':
+                        text = element.text or ''
+                    elif tag == WORD_NAMESPACE + 'tab':
+                        text = '\t'
+                    elif tag in (WORD_NAMESPACE + 'br', WORD_NAMESPACE + 'cr'):
+                        text = '\n'
+                    elif tag == WORD_NAMESPACE + 'p':
+                        text = '\n'
+                        # Paragraphs are done; drop their subtree
+                        element.clear()
+                    else:
+                        continue
+                    parts.append(text)
+                    length += len(text)
+                    if length >= max_length:
+                        break
+    except (zipfile.BadZipFile, ParseError) as exc:
+        raise ExtractionError(f'Unreadable Word document: {exc}')
+    return ''.join(parts)
+
+
+@extractor('.pdf')
+def pdf_text(path, max_length):
+    if PdfReader is None:
+        raise ExtractionError('PDF support needs the pypdf package.')
+    try:
+        reader = PdfReader(path)
+        parts, length = [], 0
+        for page in reader.pages:
+            text = page.extract_text() or ''
+            parts.append(text)
+            length += len(text)
+            if length >= max_length:
+                break
+    except (PyPdfError, ValueError) as exc:
+        raise ExtractionError(f'Unreadable PDF: {exc}')
+    return '\n'.join(parts)
+
+
+@extractor('.txt')
+def plain_text(path, max_length):
+    with open(path, encoding='utf-8', errors='replace') as text_file:
+        return text_file.read(max_length)
+
+
+def normalize(text, max_length):
+    """Collapse runs of spaces and blank lines and cut to ``max_length``"""
+    lines = (_SPACES_RE.sub(' ', line).strip() for line in text.split('\n'))
+    return _BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()[:max_length]
+
+
+def supported_extensions():
+    """Extensions whose text can be extracted with the installed packages"""
+    return [extension for extension in EXTRACTORS if extension != '.pdf' or PdfReader is not None]
+
+
+def extract_text(path, max_length=100000):
+    """``(text, error)`` for the file at ``path``; one of them is empty.
+
+    Never raises, so one bad file cannot stop a batch running in a pool.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTRACTORS:
+        return '', f'Unsupported file type "{extension or path}".'
+    try:
+        return normalize(EXTRACTORS[extension](path, max_length), max_length), ''
+    except ExtractionError as exc:
+        return '', str(exc)
+    except OSError as exc:
+        return '', f'Cannot read the file: {exc.strerror or exc}'
+    except Exception as exc:  # a malformed file can break any parser
+        return '', f'Extraction failed: {exc.__class__.__name__}: {exc}'
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from main.storage import file_changed, file_name
+
+from .models import Employer, EmployerStats, JobSeeker
+from .resume_extraction import resume_changed
+from .skills import sync_skills
+
+
+@receiver(post_save, sender=JobSeeker)
+def job_seeker_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_values = None if created else instance.stored_values
+    if old_values is None or old_values.get('skills') != instance.skills:
+        sync_skills([instance])
+    # Skipped when the resume was deferred: its previous name is unknown
+    if old_values is None or 'resume' in old_values:
+        old_resume = old_values and old_values['resume']
+        file_changed(old_resume, instance.resume)
+        if file_name(old_resume) != file_name(instance.resume):
+            resume_changed(instance)
+
+
+@receiver(post_delete, sender=JobSeeker)
+def job_seeker_deleted(sender, instance, **kwargs):
+    file_changed(instance.resume, None)
+
+
+@receiver(post_save, sender=Employer)
+def employer_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        EmployerStats.objects.get_or_create(employer=instance)
@@ -0,0 +1,63 @@
+"""Normalized skill vocabulary for job seekers.
+
+``JobSeeker.skills`` stays the free-text, comma-separated field users edit;
+``Skill`` and ``JobSeekerSkill`` are derived from it whenever a profile is
+saved, so skills can be queried with an index and rendered without parsing
+the text again.
+"""
+import re
+
+from django.db import transaction
+
+from .models import JobSeeker, JobSeekerSkill, Skill
+
+MAX_SKILL_LENGTH = 100
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_skill(name):
+    """Canonical form used to match skills: trimmed, single-spaced, lower-case"""
+    return _WHITESPACE_RE.sub(' ', name).strip().lower()[:MAX_SKILL_LENGTH]
+
+
+def parse_skills(text):
+    """Distinct ``(normalized, display)`` skill names in the order listed"""
+    skills = {}
+    for part in (text or '').split(','):
+        display = _WHITESPACE_RE.sub(' ', part).strip()[:MAX_SKILL_LENGTH]
+        normalized = normalize_skill(display)
+        if normalized and normalized not in skills:
+            skills[normalized] = display
+    return list(skills.items())
+
+
+def get_or_create_skills(parsed):
+    """Skill objects keyed by normalized name, creating missing ones in bulk"""
+    names = {normalized: display for normalized, display in parsed}
+    if not names:
+        return {}
+    Skill.objects.bulk_create(
+        [Skill(name=display, normalized_name=normalized) for normalized, display in names.items()],
+        ignore_conflicts=True,
+    )
+    return {skill.normalized_name: skill for skill in Skill.objects.filter(normalized_name__in=names)}
+
+
+def sync_skills(job_seekers):
+    """Rebuild the skill mappings of ``job_seekers`` from their skills text"""
+    job_seekers = list(job_seekers)
+    parsed = {job_seeker.pk: parse_skills(job_seeker.skills) for job_seeker in job_seekers}
+    with transaction.atomic():
+        skills = get_or_create_skills(pair for pairs in parsed.values() for pair in pairs)
+        JobSeekerSkill.objects.filter(job_seeker__in=job_seekers).delete()
+        JobSeekerSkill.objects.bulk_create([
+            JobSeekerSkill(job_seeker_id=seeker_id, skill=skills[normalized], position=position)
+            for seeker_id, pairs in parsed.items()
+            for position, (normalized, _) in enumerate(pairs)
+        ])
+
+
+def job_seekers_with_skill(name):
+    """Job seekers who listed ``name`` (case and spacing insensitive)"""
+    return JobSeeker.objects.filter(seeker_skills__skill__normalized_name=normalize_skill(name))
@@ -1,3 +1,264 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from jobs.counters import reconcile
+from jobs.models import Application, Job
+from main.models import StoredFile
+from main.storage import content_storage, is_content_name
+from . import resume_extraction
+from .models import Employer, JobSeeker, ResumeText, Skill
+from .skills import job_seekers_with_skill, parse_skills
+
+
+def docx(text):
+    body = io.BytesIO()
+    with zipfile.ZipFile(body, 'w') as archive:
+        archive.writestr('word/document.xml', (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>'
+        ))
+    return body.getvalue()
+
+
+class EmployerDashboardTests(TestCase):
+    """The dashboard numbers follow every write path without counting rows"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='employer', password='secret')
+        cls.employer = Employer.objects.create(
+            user=cls.user, company_name='Acme', contact_person='Ann',
+            phone='555', company_address='1 Main St',
+        )
+        cls.seekers = [
+            JobSeeker.objects.create(
+                user=User.objects.create_user(username=f'seeker{i}', password='secret'),
+                full_name=f'Seeker {i}', phone='555',
+            )
+            for i in range(2)
+        ]
+
+    def post_job(self, title):
+        self.client.force_login(self.user)
+        self.client.post(reverse('post_job'), {
+            'title': title, 'department': 'Engineering', 'location': 'Remote',
+            'job_type': 'full_time', 'experience_level': 'mid', 'salary': '',
+            'description': 'Description', 'requirements': 'Requirements',
+        })
+        return Job.objects.get(title=title)
+
+    def apply(self, seeker, job):
+        self.client.force_login(seeker.user)
+        self.client.post(reverse('apply_job', args=[job.id]), {'cover_letter': 'Hello'})
+
+    def dashboard(self):
+        self.client.force_login(self.user)
+        return self.client.get(reverse('employer_dashboard')).context
+
+    def assert_dashboard(self, **expected):
+        context = self.dashboard()
+        self.assertEqual({name: context[name] for name in expected}, expected)
+        self.assertEqual(reconcile(), (0, 0))
+
+    def test_stats_follow_the_write_paths(self):
+        first, second = self.post_job('First'), self.post_job('Second')
+        for seeker in self.seekers:
+            self.apply(seeker, first)
+        self.apply(self.seekers[0], second)
+        self.assert_dashboard(total_jobs=2, active_jobs=2, total_applications=3, new_applications=3)
+
+        self.client.force_login(self.user)
+        application = Application.objects.get(job=first, job_seeker=self.seekers[0])
+        self.client.get(reverse('update_application_status', args=[application.id, 'shortlisted']))
+        self.client.get(reverse('toggle_job_status', args=[second.id]))
+        self.assert_dashboard(
+            total_jobs=2, active_jobs=1, total_applications=3,
+            new_applications=2, shortlisted_applications=1,
+        )
+
+        first.delete()
+        self.assert_dashboard(total_jobs=1, active_jobs=0, total_applications=1, new_applications=1)
+
+    def test_post_time_is_not_cached(self):
+        job = self.post_job('First')
+        self.assertContains(self.client.get(reverse('employer_dashboard')), 'Posted 0\xa0minutes ago')
+        # Neither is a save, so the cached title stays while the age moves on
+        Job.objects.filter(pk=job.pk).update(title='Renamed', created_at=job.created_at - timedelta(days=3))
+        response = self.client.get(reverse('employer_dashboard'))
+        self.assertContains(response, 'Posted 3\xa0days ago')
+        self.assertContains(response, '<strong>First</strong>')
+
+
+class JobSeekerDashboardTests(TestCase):
+    """The dashboard takes every status count from one aggregate"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = Employer.objects.create(
+            user=User.objects.create_user(username='employer', password='secret'),
+            company_name='Acme', contact_person='Ann', phone='555', company_address='1 Main St',
+        )
+        cls.seeker = JobSeeker.objects.create(
+            user=User.objects.create_user(username='seeker', password='secret'),
+            full_name='Seeker', phone='555',
+        )
+
+    def setUp(self):
+        self.client.force_login(self.seeker.user)
+
+    def add_applications(self, statuses):
+        for status in statuses:
+            job = Job.objects.create(
+                employer=self.employer, title='Job', department='Engineering', location='Remote',
+                job_type='full_time', experience_level='mid', description='Description',
+                requirements='Requirements',
+            )
+            Application.objects.create(job=job, job_seeker=self.seeker, status=status)
+
+    def dashboard(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('job_seeker_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return response.context, len(queries)
+
+    def test_status_counts(self):
+        self.add_applications(['applied', 'applied', 'shortlisted', 'rejected'])
+        context, few_applications = self.dashboard()
+        self.assertEqual(
+            [context[name] for name in ('applied_count', 'shortlisted_count', 'hired_count', 'total_applications')],
+            [2, 1, 0, 4],
+        )
+        self.add_applications(['hired', 'viewed'] * 10)
+        context, many_applications = self.dashboard()
+        self.assertEqual(context['hired_count'], 10)
+        self.assertEqual(context['total_applications'], 24)
+        self.assertEqual(many_applications, few_applications)
+
+    def test_known_empty_statuses_skip_the_query(self):
+        self.add_applications(['applied'])
+        self.seeker.get_status_counts()
+        with self.assertNumQueries(0):
+            self.assertEqual(list(self.seeker.get_applications_by_status('hired')), [])
+        self.assertEqual(self.seeker.get_applications_by_status('applied').count(), 1)
+
+
+class SkillIndexTests(TestCase):
+    """The skills text is mirrored into the normalized skill tables"""
+
+    def add_seeker(self, username, skills):
+        return JobSeeker.objects.create(
+            user=User.objects.create_user(username=username, password='secret'),
+            full_name=username.title(), phone='555', skills=skills,
+        )
+
+    def test_parse_skills_normalizes_and_dedupes(self):
+        self.assertEqual(
+            parse_skills(' Python ,django,  Machine   Learning,python,, '),
+            [('python', 'Python'), ('django', 'django'), ('machine learning', 'Machine Learning')],
+        )
+        self.assertEqual(parse_skills(None), [])
+
+    def test_saved_skills_are_indexed(self):
+        ann = self.add_seeker('ann', 'Python, Django')
+        bob = self.add_seeker('bob', 'PYTHON,  Go')
+        self.assertEqual(Skill.objects.filter(normalized_name='python').count(), 1)
+        self.assertCountEqual(job_seekers_with_skill(' python '), [ann, bob])
+        bob.skills = 'Go'
+        bob.save()
+        self.assertEqual(list(job_seekers_with_skill('Python')), [ann])
+        self.assertEqual(list(job_seekers_with_skill('go')), [bob])
+
+    def test_skills_list_prefers_the_prefetched_skills(self):
+        self.add_seeker('ann', 'Python, Django')
+        JobSeeker.objects.update(skills='stale text')
+        seeker = JobSeeker.objects.prefetch_related('seeker_skills__skill').get()
+        self.assertEqual(seeker.skills_list, ['Python', 'Django'])
+        self.assertEqual(JobSeeker.objects.get().skills_list, ['stale text'])
+
+
+@override_settings(RESUME_EXTRACTION_WORKERS=0)
+class ResumeUploadTests(TestCase):
+    """Uploaded resumes are stored once and their text extracted inline"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seekers = [
+            JobSeeker.objects.create(
+                user=User.objects.create_user(username=f'seeker{i}', password='secret'),
+                full_name=f'Seeker {i}', phone='555',
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.media_root = media_root
+
+    def upload(self, seeker, content):
+        self.client.force_login(seeker.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('update_jobseeker_profile'), {
+                'full_name': seeker.full_name,
+                'resume': SimpleUploadedFile('resume.docx', content),
+            })
+        seeker.refresh_from_db()
+
+    def test_identical_uploads_share_one_file(self):
+        for seeker in self.seekers:
+            self.upload(seeker, docx('Django developer'))
+        self.assertEqual(self.seekers[0].resume.name, self.seekers[1].resume.name)
+        self.assertEqual(StoredFile.objects.get().references, 2)
+        self.upload(self.seekers[0], docx('Go developer'))
+        self.assertEqual(
+            dict(StoredFile.objects.values_list('name', 'references')),
+            {self.seekers[0].resume.name: 1, self.seekers[1].resume.name: 1},
+        )
+
+    def test_text_is_extracted_and_searchable(self):
+        self.upload(self.seekers[0], docx('Senior Django developer'))
+        self.assertIsNone(resume_extraction._executor)
+        resume_text = ResumeText.objects.get(job_seeker=self.seekers[0])
+        self.assertEqual(resume_text.text, 'Senior Django developer')
+        self.assertEqual(resume_text.source, self.seekers[0].resume.name)
+        self.assertEqual(
+            list(JobSeeker.objects.filter(
+                id__in=resume_extraction.matching_job_seeker_ids('django')
+            ).values_list('id', flat=True)),
+            [self.seekers[0].id],
+        )
+        self.upload(self.seekers[0], docx('Go developer'))
+        self.assertFalse(JobSeeker.objects.filter(
+            id__in=resume_extraction.matching_job_seeker_ids('django')
+        ).exists())
+
+    def test_legacy_files_are_adopted(self):
+        os.makedirs(os.path.join(self.media_root, 'resumes'))
+        with open(os.path.join(self.media_root, 'resumes', 'cv.docx'), 'wb') as legacy:
+            legacy.write(docx('Django developer'))
+        JobSeeker.objects.update(resume='resumes/cv.docx')
+        call_command('adopt_stored_files', stdout=io.StringIO())
+        names = set(JobSeeker.objects.values_list('resume', flat=True))
+        self.assertEqual(len(names), 1)
+        name = names.pop()
+        self.assertTrue(is_content_name(name))
+        self.assertTrue(content_storage.exists(name))
+        self.assertFalse(content_storage.exists('resumes/cv.docx'))
+        self.assertEqual(StoredFile.objects.get().references, 2)
+        self.upload(self.seekers[0], docx('Django developer'))
+        self.assertEqual(self.seekers[0].resume.name, name)
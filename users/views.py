@@ -6,6 +6,7 @@ from django.contrib import messages
 from django.http import JsonResponse
 from .models import JobSeeker, Employer
 from jobs.models import Job, Application  # Import Job model from jobs app
+from jobs.recommendations import recommend_jobs
 
 import os
 
@@ -278,18 +279,20 @@ def job_seeker_dashboard(request):
         job_seeker=job_seeker
     ).select_related('job', 'job__employer').order_by('-applied_date')[:5]  # Recent 5 applications
     
-    # Count applications by status
-    applied_count = Application.objects.filter(job_seeker=job_seeker, status='applied').count()
-    shortlisted_count = Application.objects.filter(job_seeker=job_seeker, status='shortlisted').count()
-    hired_count = Application.objects.filter(job_seeker=job_seeker, status='hired').count()
+    # Count applications by status in one query
+    counts = job_seeker.get_status_counts()
+    
+    # Jobs matching the seeker's skills, experience and bio
+    recommended_jobs = recommend_jobs([job_seeker], k=5)[job_seeker.id]
     
     context = {
         'job_seeker': job_seeker,
         'applications': applications,
-        'applied_count': applied_count,
-        'shortlisted_count': shortlisted_count,
-        'hired_count': hired_count,
-        'total_applications': applied_count + shortlisted_count + hired_count,
+        'applied_count': counts['applied'],
+        'shortlisted_count': counts['shortlisted'],
+        'hired_count': counts['hired'],
+        'total_applications': sum(counts.values()),
+        'recommended_jobs': recommended_jobs,
     }
     return render(request, 'users/job_seeker_dashboard.html', context)
 
@@ -375,20 +378,8 @@ def employer_dashboard(request):
     try:
         employer = request.user.employer
         
-        # Get job statistics
-        total_jobs = Job.objects.filter(employer=employer).count()
-        active_jobs = Job.objects.filter(employer=employer, is_active=True).count()
-        
-        # Get application statistics
-        total_applications = Application.objects.filter(job__employer=employer).count()
-        new_applications = Application.objects.filter(
-            job__employer=employer, 
-            status='applied'
-        ).count()
-        shortlisted_applications = Application.objects.filter(
-            job__employer=employer, 
-            status='shortlisted'
-        ).count()
+        # Job and application statistics, kept up to date by the write paths
+        stats = employer.get_stats()
         
         # Get recent jobs (last 5)
         recent_jobs = Job.objects.filter(employer=employer).order_by('-created_at')[:5]
@@ -400,11 +391,11 @@ def employer_dashboard(request):
         
         context = {
             'employer': employer,
-            'total_jobs': total_jobs,
-            'active_jobs': active_jobs,
-            'total_applications': total_applications,
-            'new_applications': new_applications,
-            'shortlisted_applications': shortlisted_applications,
+            'total_jobs': stats.job_count,
+            'active_jobs': stats.active_job_count,
+            'total_applications': stats.application_count,
+            'new_applications': stats.applied_count,
+            'shortlisted_applications': stats.shortlisted_count,
             'recent_jobs': recent_jobs,
             'recent_applications': recent_applications,
         }